@@ -3,6 +3,7 @@ from functools import lru_cache
 
 from free_vigilance_reduction.core import FreeVigilanceReduction
 from api.utils.task_manager import TaskManager
+from api.utils.job_queue import JobQueue
 
 @lru_cache()
 def get_engine() -> FreeVigilanceReduction:
@@ -22,3 +23,16 @@ def get_task_manager() -> TaskManager:
     Создаёт и кэширует менеджер задач.
     """
     return TaskManager()
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    """
+    Создаёт и кэширует очередь заданий на обработку документов.
+
+    Число рабочих потоков и размер очереди задаются переменными окружения
+    FVR_UPLOAD_WORKERS (по умолчанию 1) и FVR_UPLOAD_QUEUE_SIZE (по умолчанию 16).
+    """
+    workers = int(os.environ.get("FVR_UPLOAD_WORKERS", "1"))
+    max_size = int(os.environ.get("FVR_UPLOAD_QUEUE_SIZE", "16"))
+    return JobQueue(workers=workers, max_size=max_size)
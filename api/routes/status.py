@@ -38,7 +38,9 @@ def get_task_status(task_id: str, task_manager: TaskManager = Depends(get_task_m
         if os.path.exists(report_path_now) and os.path.exists(redacted_path_now):
             completed_now += 1
 
-    if completed_now == total_files_now:
+    if task_now.get("status") in ("failed", "cancelled"):
+        status_now = task_now["status"]
+    elif completed_now == total_files_now:
         status_now = "completed"
     elif completed_now > 0:
         status_now = "partial"
@@ -76,7 +78,9 @@ def list_all_tasks(task_manager: TaskManager = Depends(get_task_manager)) -> Dic
             if os.path.exists(report_path_now) and os.path.exists(redacted_path_now):
                 completed_now += 1
 
-        if completed_now == total_files_now:
+        if task_now.get("status") in ("failed", "cancelled"):
+            status_now = task_now["status"]
+        elif completed_now == total_files_now:
             status_now = "completed"
         elif completed_now > 0:
             status_now = "partial"
@@ -5,40 +5,101 @@ import tempfile
 import shutil
 import os
 
-from api.dependencies import get_engine, get_task_manager
+from api.dependencies import get_engine, get_job_queue, get_task_manager
+from api.utils.job_queue import JobQueue, QueueFullError
 from api.utils.task_manager import TaskManager
 from free_vigilance_reduction.core import FreeVigilanceReduction
+from free_vigilance_reduction.utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
 
-@router.post("/upload", tags=["Documents"], summary="Загрузка и запуск анонимизации")
+def process_task(
+    engine: FreeVigilanceReduction,
+    task_manager: TaskManager,
+    task_id: str,
+    saved_paths: list[str],
+    profile_id: str,
+) -> None:
+    """
+    Обрабатывает файлы задачи по одному, обновляя её состояние после каждого файла.
+
+    Выполняется рабочим потоком очереди. При ошибке задача помечается как
+    failed, а оставшиеся файлы не обрабатываются; отменённая задача
+    прерывается перед следующим файлом.
+
+    Args:
+        engine (FreeVigilanceReduction): Экземпляр движка анонимизации.
+        task_manager (TaskManager): Менеджер задач.
+        task_id (str): ID задачи.
+        saved_paths (list[str]): Пути к сохранённым файлам.
+        profile_id (str): Идентификатор профиля конфигурации.
+    """
+    for path in saved_paths:
+        task = task_manager.get_task(task_id)
+        if task is None or task["status"] == "cancelled":
+            return
+        task_manager.set_status(task_id, "processing")
+
+        try:
+            report = engine.process_file(path, profile_id=profile_id)
+
+            output_path = path + ".redacted.txt"
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(report.reduced_text)
+
+            report_path = path + ".report.json"
+            report.save_to_file(report_path)
+        except Exception as e:
+            logger.error(f"Ошибка обработки файла {path} задачи {task_id}: {e}")
+            task_manager.set_status(task_id, "failed", error=f"Ошибка обработки файла: {str(e)}")
+            return
+
+        task_manager.update_result(task_id, {
+            "original_file": path,
+            "redacted_file": output_path,
+            "report_file": report_path,
+        })
+
+    task_manager.set_status(task_id, "success")
+
+
+@router.post("/upload", tags=["Documents"], summary="Загрузка и постановка документов в очередь на анонимизацию")
 def upload_documents(
     files: list[UploadFile] = File(...),
     profile_id: str = Form(...),
     engine: FreeVigilanceReduction = Depends(get_engine),
     task_manager: TaskManager = Depends(get_task_manager),
+    job_queue: JobQueue = Depends(get_job_queue),
 ):
     """
-    Загружает один или несколько документов и запускает их обработку (анонимизацию).
+    Загружает один или несколько документов и ставит их обработку (анонимизацию) в очередь.
 
-    Сохраняет файлы во временную директорию и выполняет обработку каждого файла с использованием заданного профиля.
-    Результаты (оригинальный путь, редактированный файл, путь к отчёту) сохраняются в памяти в менеджере задач.
+    Сохраняет файлы во временную директорию, регистрирует задачу и сразу возвращает её task_id.
+    Файлы обрабатываются в фоне пулом рабочих потоков; ход обработки доступен через /status,
+    результаты — через /results. Если очередь заполнена, возвращается 429.
 
     Args:
         files (list[UploadFile]): Список загружаемых файлов.
         profile_id (str): Идентификатор профиля конфигурации.
         engine (FreeVigilanceReduction): Экземпляр движка анонимизации.
         task_manager (TaskManager): Менеджер задач.
+        job_queue (JobQueue): Очередь заданий на обработку.
 
     Returns:
-        JSONResponse: Статус задачи, список результатов и task_id.
+        JSONResponse: task_id и статус поставленной в очередь задачи.
     """
+    try:
+        engine.config_manager.get_profile(profile_id)
+    except KeyError as e:
+        raise HTTPException(status_code=500, detail=f"Ошибка обработки файла: {str(e)}")
+
     task_id = str(uuid4())
     temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_")
 
     saved_paths = []
-    results = []
 
     try:
         for file in files:
@@ -50,41 +111,20 @@ def upload_documents(
                 shutil.copyfileobj(file.file, out_file)
 
             saved_paths.append(file_path)
-
-        task_manager.save_task(task_id, saved_paths)
-        task_manager.set_status(task_id, "processing")
-
-        for path in saved_paths:
-            try:
-                report = engine.process_file(path, profile_id=profile_id)
-
-                output_path = path + ".redacted.txt"
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(report.reduced_text)
-
-                report_path = path + ".report.json"
-                report.save_to_file(report_path)
-
-                result_info = {
-                    "original_file": path,
-                    "redacted_file": output_path,
-                    "report_file": report_path,
-                }
-                results.append(result_info)
-                task_manager.update_result(task_id, result_info)
-
-            except Exception as e:
-                task_manager.set_status(task_id, "failed", error=str(e))
-                raise HTTPException(status_code=500, detail=f"Ошибка обработки файла: {str(e)}")
-
-        task_manager.set_status(task_id, "success")
-
-        return JSONResponse(content={
-            "task_id": task_id,
-            "status": "success",
-            "results": results,
-        })
-
     except Exception as e:
-        task_manager.set_status(task_id, "failed", error=str(e))
+        shutil.rmtree(temp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=f"Ошибка загрузки: {str(e)}")
+
+    task_manager.save_task(task_id, saved_paths)
+
+    try:
+        job_queue.submit(process_task, engine, task_manager, task_id, saved_paths, profile_id)
+    except QueueFullError as e:
+        task_manager.delete_task(task_id)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=429, detail=f"Сервер перегружен, повторите позже: {str(e)}")
+
+    return JSONResponse(status_code=202, content={
+        "task_id": task_id,
+        "status": "pending",
+    })
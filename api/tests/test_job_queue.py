@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from api.utils.job_queue import JobQueue, QueueFullError
+
+
+def test_jobs_run_in_background():
+    """
+    Проверка выполнения заданий рабочими потоками.
+    """
+    job_queue = JobQueue(workers=2, max_size=8)
+    done = []
+    lock = threading.Lock()
+
+    def job(i):
+        with lock:
+            done.append(i)
+
+    for i in range(8):
+        job_queue.submit(job, i)
+    job_queue.join()
+
+    assert sorted(done) == list(range(8))
+
+
+def test_concurrency_is_bounded():
+    """
+    Проверка, что одновременно выполняется не больше заданий, чем рабочих потоков.
+    """
+    job_queue = JobQueue(workers=2, max_size=16)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def job():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    for _ in range(10):
+        job_queue.submit(job)
+    job_queue.join()
+
+    assert peak <= 2
+
+
+def test_submit_raises_when_full():
+    """
+    Проверка отказа в приёме задания при заполненной очереди.
+    """
+    job_queue = JobQueue(workers=1, max_size=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(timeout=10)
+
+    job_queue.submit(blocking_job)
+    started.wait(timeout=10)
+    job_queue.submit(blocking_job)
+    job_queue.submit(blocking_job)
+
+    with pytest.raises(QueueFullError):
+        job_queue.submit(blocking_job)
+
+    release.set()
+    job_queue.join()
+
+
+def test_failing_job_does_not_stop_worker():
+    """
+    Проверка, что исключение в задании не останавливает рабочий поток.
+    """
+    job_queue = JobQueue(workers=1, max_size=4)
+    done = []
+
+    def failing_job():
+        raise RuntimeError("сбой")
+
+    job_queue.submit(failing_job)
+    job_queue.submit(done.append, 1)
+    job_queue.join()
+
+    assert done == [1]
@@ -1,12 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
 from api.main import app
-from api.dependencies import get_engine, get_task_manager
+from api.dependencies import get_engine, get_job_queue, get_task_manager
 from free_vigilance_reduction.core import FreeVigilanceReduction
 from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from api.utils.job_queue import JobQueue
 from api.utils.task_manager import TaskManager
 
 import tempfile
+import threading
 import os
 
 
@@ -61,19 +63,95 @@ def test_upload_text_file_success():
 
     os.unlink(temp_file_path)
 
-    assert response.status_code == 200
+    assert response.status_code == 202
     json_data = response.json()
 
     assert "task_id" in json_data
-    assert json_data["status"] == "success"
-    assert isinstance(json_data["results"], list)
-    assert len(json_data["results"]) == 1
+    assert json_data["status"] == "pending"
 
-    result_now = json_data["results"][0]
+    get_job_queue().join()
+    task = get_task_manager().get_task(json_data["task_id"])
+    assert task["status"] == "success"
+    assert isinstance(task["results"], list)
+    assert len(task["results"]) == 1
+
+    result_now = task["results"][0]
     assert result_now["original_file"].endswith(".txt")
     assert result_now["redacted_file"].endswith(".redacted.txt")
     assert result_now["report_file"].endswith(".report.json")
 
+    status_response = client.get(f"/status/{json_data['task_id']}")
+    assert status_response.json()["status"] == "completed"
+
+
+def test_upload_multiple_files_progress():
+    """
+    Проверка, что задача обновляется по мере обработки каждого файла.
+    """
+    files = [
+        ("files", (f"test{i}.txt", f"Документ номер {i}.".encode("utf-8"), "text/plain"))
+        for i in range(3)
+    ]
+    response = client.post("/upload", data={"profile_id": "upload_profile"}, files=files)
+    assert response.status_code == 202
+
+    get_job_queue().join()
+    task_id = response.json()["task_id"]
+    assert get_task_manager().get_status(task_id) == {
+        "status": "success",
+        "files_processed": 3,
+        "total_files": 3,
+        "error": None,
+    }
+
+
+def test_upload_processing_error_marks_task_failed():
+    """
+    Проверка, что ошибка обработки файла в фоне помечает задачу как failed.
+    """
+    response = client.post(
+        "/upload",
+        data={"profile_id": "upload_profile"},
+        files={"files": ("test.xyz", b"data", "application/octet-stream")}
+    )
+    assert response.status_code == 202
+
+    get_job_queue().join()
+    task = get_task_manager().get_task(response.json()["task_id"])
+    assert task["status"] == "failed"
+    assert "Ошибка обработки" in task["error"]
+
+
+def test_upload_queue_full():
+    """
+    Проверка отказа с кодом 429, когда очередь заданий заполнена.
+    """
+    job_queue = JobQueue(workers=1, max_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(timeout=10)
+
+    job_queue.submit(blocking_job)
+    started.wait(timeout=10)
+    job_queue.submit(blocking_job)
+
+    app.dependency_overrides[get_job_queue] = lambda: job_queue
+    try:
+        response = client.post(
+            "/upload",
+            data={"profile_id": "upload_profile"},
+            files={"files": ("test.txt", "Текст.".encode("utf-8"), "text/plain")}
+        )
+    finally:
+        app.dependency_overrides.pop(get_job_queue, None)
+        release.set()
+
+    assert response.status_code == 429
+    job_queue.join()
+
 
 def test_upload_invalid_profile():
     """
@@ -0,0 +1,97 @@
+import queue
+import threading
+from typing import Any, Callable, List
+
+from free_vigilance_reduction.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class QueueFullError(Exception):
+    """
+    Очередь заданий заполнена, новое задание не принято.
+    """
+
+
+class JobQueue:
+    """
+    Ограниченная очередь заданий с пулом рабочих потоков.
+
+    Задания выполняются в фоне не более чем в `workers` потоков. Если в
+    очереди уже ждут `max_size` заданий, новое отклоняется с QueueFullError,
+    чтобы вызывающий код мог сообщить клиенту о перегрузке.
+    """
+
+    def __init__(self, workers: int = 1, max_size: int = 16):
+        """
+        Args:
+            workers (int): Число рабочих потоков.
+            max_size (int): Максимальное число ожидающих заданий.
+        """
+        if workers < 1:
+            raise ValueError("Число рабочих потоков должно быть положительным.")
+        if max_size < 1:
+            raise ValueError("Размер очереди должен быть положительным.")
+
+        self.workers = workers
+        self.max_size = max_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        """
+        Запускает рабочие потоки при первом задании.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> None:
+        """
+        Ставит задание в очередь.
+
+        Args:
+            func (Callable): Функция задания.
+            *args: Аргументы функции.
+
+        Raises:
+            QueueFullError: Если очередь заполнена.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            raise QueueFullError(f"Очередь заданий заполнена ({self.max_size})")
+
+    def pending(self) -> int:
+        """
+        Число заданий, ожидающих выполнения.
+
+        Returns:
+            int: Размер очереди.
+        """
+        return self._queue.qsize()
+
+    def join(self) -> None:
+        """
+        Ожидает выполнения всех поставленных заданий.
+        """
+        self._queue.join()
+
+    def _worker(self) -> None:
+        """
+        Цикл рабочего потока.
+        """
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"Ошибка фонового задания: {e}")
+            finally:
+                self._queue.task_done()
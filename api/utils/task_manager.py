@@ -102,6 +102,16 @@ class TaskManager:
                 return True
             return False
 
+    def delete_task(self, task_id: str) -> None:
+        """
+        Удаляет задачу.
+
+        Args:
+            task_id (str): ID задачи.
+        """
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
     def get_status(self, task_id: str) -> Dict[str, Any]:
         """
         Возвращает краткий статус задачи.
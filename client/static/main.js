@@ -175,6 +175,8 @@ document.addEventListener("DOMContentLoaded", () => {
           if (status === "completed") {
             clearInterval(iv);
             loadResults(taskId);
+          } else if (status === "failed" || status === "cancelled") {
+            clearInterval(iv);
           }
         } catch(e) {
           console.error(e);
@@ -3,6 +3,7 @@
 """
 
 import os
+import copy
 import json
 from pathlib import Path
 from typing import List, Dict, Optional, Any
@@ -10,6 +11,14 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+LLM_OUTPUT_MODES = ("echo", "spans")
+
+LLM_DTYPES = ("float32", "bfloat16", "float16", "int8")
+
+LLM_BACKENDS = ("transformers", "onnx", "fake", "server")
+
+SPACY_DEFAULT_LABEL_MAP = {"PER": "PER", "LOC": "LOC", "ORG": "ORG"}
+
 
 class ConfigurationProfile:
     """
@@ -23,13 +32,60 @@ class ConfigurationProfile:
       - Флаги включения механизмов (regex, словарь, LLM)
       - Настройки языковой модели (llm_settings)
 
+    dictionary_paths задаётся в одном из двух видов:
+      - {entity_type: path} — словарь с именем типа сущности
+      - {name: {"path": str, "entity_type": str, "enabled": bool}}
+    Относительные пути разрешаются относительно файла конфигурации.
+
     llm_settings должен содержать ключи:
       - model_path (str): путь к локальной папке или файлу модели
       - device (str): 'cpu' или 'cuda'/'cuda:0'
+      - backend (str, необязательный): бэкенд вывода — "transformers" (по умолчанию),
+        "onnx" (ONNX Runtime на CPU, требует optimum[onnxruntime]), "fake"
+        (детерминированная разметка без модели для тестов и бенчмарков) или
+        "server" (вывод на локальном сервере free_vigilance_reduction.inference_server)
+      - server_address (str, необязательный): адрес сервера вывода для backend
+        "server" — "unix:///путь/к/сокету" (по умолчанию unix:///tmp/fvr-llm.sock)
+        или "http://хост:порт"
+      - server_backend (str, необязательный): бэкенд на стороне сервера
+        (по умолчанию "transformers")
+      - server_timeout (float, необязательный): таймаут запроса к серверу, с
+      - onnx_model_path (str, необязательный): директория, куда сохраняется и
+        откуда читается экспортированный граф ONNX
+      - dtype (str, необязательный): тип весов модели — "float32" (по умолчанию),
+        "bfloat16", "float16" или "int8" (динамическое квантование линейных слоёв,
+        только CPU); профили с одинаковыми model_path, device и dtype
+        используют одну загруженную модель
+      - quantized_model_path (str, необязательный): файл, в который сохраняется
+        и из которого читается модель, квантованная для dtype "int8"
       - max_input_tokens (int): максимальное число входных токенов
       - chunk_overlap_tokens (int): число токенов перекрытия при разбиении
       - max_new_tokens (int): максимальное число генерируемых токенов
-      - temperature (float): параметр температуры при генерации
+      - temperature (float): параметр температуры при генерации (0 — жадная генерация)
+      - batch_size (int): число чанков, генерируемых одним пакетом
+      - cache_prompt_prefix (bool, необязательный): кэшировать KV-состояние
+        общего префикса промпта (по умолчанию True)
+      - output_mode (str, необязательный): формат ответа модели — "echo" (весь
+        текст с тегами, по умолчанию) или "spans" (строки "ТИП: фрагмент")
+      - constrained_decoding (bool, необязательный): в режиме "echo" разрешать модели
+        только копировать текст чанка и вставлять теги (по умолчанию False)
+      - deterministic (bool, необязательный): жадная генерация независимо от temperature
+      - result_cache_path (str, необязательный): файл SQLite для кэша результатов
+        по чанкам; используется только при детерминированной генерации
+      - result_cache_max_bytes (int, необязательный): лимит размера этого кэша
+      - prefilter (bool, необязательный): не передавать в модель чанки без
+        признаков сущностей (по умолчанию False, см. ChunkPrefilter)
+      - prefilter_threshold (float, необязательный): минимальная оценка чанка (по умолчанию 1.0)
+      - prefilter_audit_rate (float, необязательный): доля пропускаемых чанков,
+        всё же отправляемых в модель для оценки потери полноты (по умолчанию 0.05)
+
+    spacy_settings (для use_spacy_ner) содержит ключи:
+      - model (str): имя или путь модели spaCy (по умолчанию "ru_core_news_sm")
+      - label_map (dict): {метка spaCy: тип сущности профиля}
+        (по умолчанию PER, LOC и ORG в одноимённые типы)
+      - batch_size (int): число текстов в пакете nlp.pipe (по умолчанию 64)
+      - n_process (int): число процессов nlp.pipe (по умолчанию 1)
+      - segment_chars (int): длина сегментов, на которые делится документ (по умолчанию 10000)
     """
 
     def __init__(
@@ -42,7 +98,9 @@ class ConfigurationProfile:
         use_regex: bool = True,
         use_dictionary: bool = True,
         use_language_model: bool = True,
-        llm_settings: Optional[Dict[str, Any]] = None
+        llm_settings: Optional[Dict[str, Any]] = None,
+        use_spacy_ner: bool = False,
+        spacy_settings: Optional[Dict[str, Any]] = None
     ):
         """
         Инициализация профиля конфигурации.
@@ -57,11 +115,15 @@ class ConfigurationProfile:
             use_dictionary (bool): Включить ли поиск по словарю.
             use_language_model (bool): Включить ли LLM.
             llm_settings (Dict[str, Any], optional): Настройки языковой модели.
+            use_spacy_ner (bool): Включить ли NER spaCy.
+            spacy_settings (Dict[str, Any], optional): Настройки NER spaCy.
         """
         self.profile_id = profile_id
         self.entity_types = entity_types or []
         self.replacement_rules = replacement_rules or {}
         self.dictionary_paths = dictionary_paths or {}
+        self._dictionary_settings: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dictionary_settings_source: Optional[Dict[str, Any]] = None
         self.custom_entity_prompts = custom_entity_prompts or {}
 
         self.use_regex = use_regex
@@ -74,10 +136,61 @@ class ConfigurationProfile:
         self.llm_settings.setdefault("chunk_overlap_tokens", 0)
         self.llm_settings.setdefault("max_new_tokens", 256)
         self.llm_settings.setdefault("temperature", 0.5)
+        self.llm_settings.setdefault("batch_size", 1)
+        self.use_spacy_ner = use_spacy_ner
+        self.spacy_settings = spacy_settings.copy() if spacy_settings else {}
+        self.spacy_settings.setdefault("model", "ru_core_news_sm")
+        self.spacy_settings.setdefault("label_map", dict(SPACY_DEFAULT_LABEL_MAP))
+        self.spacy_settings.setdefault("batch_size", 64)
+        self.spacy_settings.setdefault("n_process", 1)
+        self.spacy_settings.setdefault("segment_chars", 10000)
 
         self.created_at = None
         self.updated_at = None
 
+    @property
+    def dictionary_settings(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Нормализованные настройки словарей профиля.
+
+        Если настройки не заданы явно, они строятся из dictionary_paths один
+        раз и сохраняются, поэтому изменения возвращённого словаря не теряются.
+        Настройки перестраиваются, только если изменился сам dictionary_paths.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {имя словаря: {"path", "entity_type", "enabled"}}.
+        """
+        if self._dictionary_settings is not None and (
+            self._dictionary_settings_source is None
+            or self._dictionary_settings_source == self.dictionary_paths
+        ):
+            return self._dictionary_settings
+
+        settings: Dict[str, Dict[str, Any]] = {}
+        for name, value in self.dictionary_paths.items():
+            if isinstance(value, dict):
+                settings[name] = {
+                    "path": value.get("path", ""),
+                    "entity_type": value.get("entity_type", name),
+                    "enabled": value.get("enabled", True),
+                }
+            else:
+                settings[name] = {"path": value, "entity_type": name, "enabled": True}
+        self._dictionary_settings = settings
+        self._dictionary_settings_source = copy.deepcopy(self.dictionary_paths)
+        return settings
+
+    @dictionary_settings.setter
+    def dictionary_settings(self, value: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Явное задание настроек словарей.
+
+        Args:
+            value (Dict[str, Dict[str, Any]]): {имя словаря: настройки}.
+        """
+        self._dictionary_settings = value
+        self._dictionary_settings_source = None
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Преобразует профиль в словарь для сериализации.
@@ -95,6 +208,8 @@ class ConfigurationProfile:
             "use_dictionary": self.use_dictionary,
             "use_language_model": self.use_language_model,
             "llm_settings": self.llm_settings,
+            "use_spacy_ner": self.use_spacy_ner,
+            "spacy_settings": self.spacy_settings,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
@@ -139,7 +254,9 @@ class ConfigurationProfile:
             use_regex=data.get("use_regex", True),
             use_dictionary=data.get("use_dictionary", True),
             use_language_model=data.get("use_language_model", True),
-            llm_settings=data.get("llm_settings", {})
+            llm_settings=data.get("llm_settings", {}),
+            use_spacy_ner=data.get("use_spacy_ner", False),
+            spacy_settings=data.get("spacy_settings", {})
         )
         profile.created_at = data.get("created_at")
         profile.updated_at = data.get("updated_at")
@@ -171,6 +288,7 @@ class ConfigurationProfile:
         Проверяет целостность профиля:
          - Наличие правил замены для всех типов сущностей
          - Корректность LLM-настроек (непустой model_path и неотрицательные токены)
+         - Корректность настроек NER spaCy (положительные размеры пакета и сегмента)
         """
         missing = [t for t in self.entity_types if t not in self.replacement_rules]
         if missing:
@@ -179,8 +297,14 @@ class ConfigurationProfile:
             raise ValueError(msg)
 
         if self.use_language_model:
+            backend = self.llm_settings.get("backend", "transformers")
+            if backend not in LLM_BACKENDS:
+                msg = f"LLM-настройка 'backend' должна быть одной из {LLM_BACKENDS}, получено: {backend}"
+                logger.error(msg)
+                raise ValueError(msg)
             path = self.llm_settings.get("model_path", "")
-            if not path or not Path(path).exists():
+            # Бэкенду "fake" модель не нужна, для "server" путь проверяет сервер.
+            if backend not in ("fake", "server") and (not path or not Path(path).exists()):
                 msg = f"Некорректный путь до модели LLM: '{path}'"
                 logger.error(msg)
                 raise ValueError(msg)
@@ -190,12 +314,44 @@ class ConfigurationProfile:
                     msg = f"LLM-настройка '{key}' должна быть неотрицательным целым, получено: {val}"
                     logger.error(msg)
                     raise ValueError(msg)
+            batch_size = self.llm_settings.get("batch_size", 1)
+            if not isinstance(batch_size, int) or batch_size < 1:
+                msg = f"LLM-настройка 'batch_size' должна быть положительным целым, получено: {batch_size}"
+                logger.error(msg)
+                raise ValueError(msg)
+            output_mode = self.llm_settings.get("output_mode", "echo")
+            if output_mode not in LLM_OUTPUT_MODES:
+                msg = f"LLM-настройка 'output_mode' должна быть одной из {LLM_OUTPUT_MODES}, получено: {output_mode}"
+                logger.error(msg)
+                raise ValueError(msg)
+            dtype = self.llm_settings.get("dtype", "float32")
+            if dtype not in LLM_DTYPES:
+                msg = f"LLM-настройка 'dtype' должна быть одной из {LLM_DTYPES}, получено: {dtype}"
+                logger.error(msg)
+                raise ValueError(msg)
+            audit_rate = self.llm_settings.get("prefilter_audit_rate", 0.05)
+            if not isinstance(audit_rate, (int, float)) or not (0.0 <= audit_rate <= 1.0):
+                msg = f"LLM-настройка 'prefilter_audit_rate' должна быть от 0.0 до 1.0, получено: {audit_rate}"
+                logger.error(msg)
+                raise ValueError(msg)
             temp = self.llm_settings.get("temperature")
             if not isinstance(temp, (int, float)) or not (0.0 <= temp <= 1.0):
                 msg = f"LLM-настройка 'temperature' должна быть от 0.0 до 1.0, получено: {temp}"
                 logger.error(msg)
                 raise ValueError(msg)
 
+        if self.use_spacy_ner:
+            if not isinstance(self.spacy_settings.get("label_map"), dict):
+                msg = "spaCy-настройка 'label_map' должна быть словарём {метка: тип сущности}"
+                logger.error(msg)
+                raise ValueError(msg)
+            for key in ("batch_size", "n_process", "segment_chars"):
+                val = self.spacy_settings.get(key)
+                if not isinstance(val, int) or val < 1:
+                    msg = f"spaCy-настройка '{key}' должна быть положительным целым, получено: {val}"
+                    logger.error(msg)
+                    raise ValueError(msg)
+
     def _current_timestamp(self) -> str:
         """
         Возвращает текущее время в формате ISO.
@@ -228,7 +384,10 @@ class ConfigurationProfile:
         Returns:
             Optional[str]: Путь к словарю или None.
         """
-        return self.dictionary_paths.get(entity_type)
+        value = self.dictionary_paths.get(entity_type)
+        if isinstance(value, dict):
+            return value.get("path")
+        return value
 
     def get_custom_prompt(self, entity_type: str) -> Optional[str]:
         """
@@ -2,9 +2,11 @@
 Основной модуль библиотеки FreeVigilanceReduction, координирующий анонимизацию текста.
 """
 
-from typing import Optional, List
+from pathlib import Path
+from typing import Optional, List, Set
 from .config.configuration import ConfigurationManager, ConfigurationProfile
 from .documents.document_factory import DocumentFactory
+from .entity_recognition.chunk_prefilter import PrefilterStats
 from .entity_recognition.entity_recognizer import EntityRecognizer
 from .data_replacement.data_replacer import DataReplacer
 from .reporting.reduction_report import ReductionReport
@@ -38,13 +40,67 @@ class FreeVigilanceReduction:
         logger.info("Инициализация FreeVigilanceReduction")
 
         self.config_manager = ConfigurationManager(config_path)
+        self.config_dir = Path(config_path).resolve().parent if config_path else Path.cwd()
         self.document_factory = DocumentFactory()
         self.entity_recognizer = EntityRecognizer(regex_path)
         self.data_replacer = DataReplacer()
         self.observers: List[ProcessingObserver] = []
+        self._prepared_profiles: Set[str] = set()
+
+        for profile in self.config_manager.profiles.values():
+            self._prepare_dictionaries(profile)
 
         logger.info("FreeVigilanceReduction успешно инициализирована")
 
+    def _prepare_dictionaries(self, profile: ConfigurationProfile) -> None:
+        """
+        Однократная загрузка включённых словарей профиля.
+
+        Относительные пути разрешаются относительно файла конфигурации. Сами
+        словари берутся из общего реестра, поэтому профили, ссылающиеся на один
+        файл, используют один экземпляр словаря, а имена словарей действуют
+        только в пределах профиля.
+
+        Args:
+            profile (ConfigurationProfile): Профиль конфигурации.
+        """
+        if not profile.use_dictionary or profile.profile_id in self._prepared_profiles:
+            return
+
+        manager = self.entity_recognizer.dictionary_manager
+        manager.profile_dictionaries.setdefault(profile.profile_id, {})
+        for name, settings in profile.dictionary_settings.items():
+            if not settings.get("enabled", True):
+                continue
+            path = settings.get("path")
+            if not path:
+                logger.warning(f"Для словаря '{name}' профиля '{profile.profile_id}' не указан путь")
+                continue
+            resolved = Path(path)
+            if not resolved.is_absolute():
+                resolved = self.config_dir / resolved
+            manager.load_dictionary(
+                name,
+                str(resolved),
+                settings.get("entity_type", name),
+                profile.profile_id
+            )
+
+        self._prepared_profiles.add(profile.profile_id)
+
+    @staticmethod
+    def _prefilter_summary(stats: PrefilterStats) -> Optional[dict]:
+        """
+        Статистика предварительного отбора чанков LLM для отчёта.
+
+        Args:
+            stats (PrefilterStats): Статистика распознавания документа.
+
+        Returns:
+            dict | None: Статистика или None, если отбор не выполнялся.
+        """
+        return stats.to_dict() if stats.chunks else None
+
     def add_observer(self, observer_now: ProcessingObserver) -> None:
         """
         Добавление наблюдателя для получения событий обработки.
@@ -85,12 +141,14 @@ class FreeVigilanceReduction:
 
 
         profile_now: ConfigurationProfile = self.config_manager.get_profile(profile_id)
+        self._prepare_dictionaries(profile_now)
         document_now = self.document_factory.create_document(file_path_now)
         text_now = document_now.get_text()
         self._notify("text_extracted", {"text": text_now})
 
 
-        entities_now = self.entity_recognizer.detect_entities(text_now, profile_now)
+        prefilter_stats_now = PrefilterStats()
+        entities_now = self.entity_recognizer.detect_entities(text_now, profile_now, prefilter_stats_now)
         self._notify("entities_detected", {"entities": entities_now})
 
         reduced_text_now, replacements_now = self.data_replacer.reduce_text(
@@ -107,7 +165,8 @@ class FreeVigilanceReduction:
             text_now,
             reduced_text_now,
             entities_now,
-            replacements_now
+            replacements_now,
+            self._prefilter_summary(prefilter_stats_now)
         )
         self._notify("report_generated", {"report": report_now})
 
@@ -128,26 +187,55 @@ class FreeVigilanceReduction:
         Returns:
             ReductionReport: Отчёт об анонимизации текста.
         """
-        profile_now: ConfigurationProfile = self.config_manager.get_profile(profile_id)
-        logger.info(f"Анонимизация текста с профилем '{profile_now.profile_id}'")
-        self._notify("start", {"text": text_now, "profile_id": profile_now.profile_id})
+        return self.reduce_texts([text_now], profile_id)[0]
 
-        entities_now = self.entity_recognizer.detect_entities(text_now, profile_now)
-        self._notify("entities_detected", {"entities": entities_now})
+    def reduce_texts(
+        self,
+        texts_now: List[str],
+        profile_id: Optional[str] = None
+    ) -> List[ReductionReport]:
+        """
+        Анонимизация нескольких текстов одним проходом распознавания.
 
-        reduced_text_now, replacements_now = self.data_replacer.reduce_text(
-            text_now,
-            entities_now,
-            profile_now
-        )
-        self._notify("text_reduced", {"reduced_text": reduced_text_now, "replacements": replacements_now})
+        spaCy NER и языковая модель обрабатывают все тексты пакетно
+        (см. EntityRecognizer.detect_entities_batch), замена выполняется для
+        каждого текста отдельно.
 
-        report_now = ReductionReport(
-            original_text=text_now,
-            anonymized_text=reduced_text_now,
-            entities=entities_now,
-            replacements=replacements_now
-        )
-        self._notify("report_generated", {"report": report_now})
+        Args:
+            texts_now (List[str]): Тексты для анонимизации.
+            profile_id (str | None): Идентификатор профиля (по умолчанию — default).
 
-        return report_now
+        Returns:
+            List[ReductionReport]: Отчёты в порядке текстов.
+        """
+        profile_now: ConfigurationProfile = self.config_manager.get_profile(profile_id)
+        self._prepare_dictionaries(profile_now)
+        logger.info(f"Анонимизация {len(texts_now)} текстов с профилем '{profile_now.profile_id}'")
+        for text_now in texts_now:
+            self._notify("start", {"text": text_now, "profile_id": profile_now.profile_id})
+
+        prefilter_stats_now = [PrefilterStats() for _ in texts_now]
+        entities_batch = self.entity_recognizer.detect_entities_batch(texts_now, profile_now, prefilter_stats_now)
+
+        reports_now: List[ReductionReport] = []
+        for text_now, entities_now, stats_now in zip(texts_now, entities_batch, prefilter_stats_now):
+            self._notify("entities_detected", {"entities": entities_now})
+
+            reduced_text_now, replacements_now = self.data_replacer.reduce_text(
+                text_now,
+                entities_now,
+                profile_now
+            )
+            self._notify("text_reduced", {"reduced_text": reduced_text_now, "replacements": replacements_now})
+
+            report_now = ReductionReport(
+                original_text=text_now,
+                reduced_text=reduced_text_now,
+                entities=entities_now,
+                replacements=replacements_now,
+                llm_prefilter=self._prefilter_summary(stats_now)
+            )
+            self._notify("report_generated", {"report": report_now})
+            reports_now.append(report_now)
+
+        return reports_now
@@ -21,6 +21,17 @@ class DataReplacer:
         """
         Выполняет замену сущностей в тексте в соответствии с настройками профиля.
 
+        Текст собирается за один проход: неизменённые фрагменты и замены
+        добавляются в список и склеиваются одним join. Если сразу за
+        непустой заменой следует не пробел, между ними вставляется пробел.
+        Пересекающиеся сущности пропускаются: применяется та, что начинается
+        раньше, а при одинаковом начале — самая длинная, чтобы часть сущности
+        не осталась незамененной.
+
+        Каждая запись о замене содержит позиции в исходном тексте (start_pos,
+        end_pos) и в результирующем (output_start_pos, output_end_pos).
+        Записи возвращаются в порядке убывания позиций.
+
         Args:
             text (str): Исходный текст.
             entities (List[Entity]): Список сущностей для замены.
@@ -29,10 +40,29 @@ class DataReplacer:
         Returns:
             Tuple[str, List[Dict]]: Текст после замены и список замен.
         """
-        entities_sorted = sorted(entities, key=lambda e: e.start_pos, reverse=True)
-        replacements = []
+        entities_sorted = sorted(entities, key=lambda e: (e.start_pos, -e.end_pos))
+
+        pieces: List[str] = []
+        replacements: List[Dict] = []
+        out_len = 0
+        cursor = 0
+        pending_space = False
+
+        def emit(piece: str) -> None:
+            nonlocal out_len, pending_space
+            if not piece:
+                return
+            if pending_space and piece[0] != " ":
+                pieces.append(" ")
+                out_len += 1
+            pending_space = False
+            pieces.append(piece)
+            out_len += len(piece)
 
         for entity in entities_sorted:
+            if entity.start_pos < cursor:
+                continue
+
             rule = profile.replacement_rules.get(entity.entity_type)
             if not rule:
                 continue
@@ -46,20 +76,25 @@ class DataReplacer:
                 replacement = ""
             else:
                 continue
-            space = ""
-            if entity.end_pos < len(text) and text[entity.end_pos] != ' ' and replacement:
-                space = " "
 
-            prefix = text[:entity.start_pos]
-            suffix = text[entity.end_pos:]
-            text = prefix + replacement + space + suffix
+            emit(text[cursor:entity.start_pos])
+            emit(replacement)
+            output_start = out_len - len(replacement)
+            if replacement:
+                pending_space = True
+            cursor = entity.end_pos
 
             replacements.append({
                 "original": entity.text,
                 "replacement": replacement,
                 "entity_type": entity.entity_type,
                 "start_pos": entity.start_pos,
-                "end_pos": entity.end_pos
+                "end_pos": entity.end_pos,
+                "output_start_pos": output_start,
+                "output_end_pos": output_start + len(replacement)
             })
 
-        return text, replacements
+        emit(text[cursor:])
+        replacements.reverse()
+
+        return "".join(pieces), replacements
@@ -0,0 +1,236 @@
+"""
+Модуль с автоматом Ахо–Корасик для одновременного поиска множества терминов.
+
+Автомат хранится в виде плоских массивов (переходы в формате CSR, ссылки
+неудач и словарные ссылки), что позволяет держать в памяти словари на сотни
+тысяч терминов и находить все вхождения за один проход по тексту.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def fold_case(text: str) -> str:
+    """
+    Приведение текста к нижнему регистру с сохранением длины.
+
+    Символы, у которых нижний регистр занимает больше одного символа,
+    остаются без изменений, чтобы позиции совпадали с исходным текстом.
+
+    Args:
+        text (str): Исходный текст.
+
+    Returns:
+        str: Текст в нижнем регистре той же длины.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+def select_leftmost_longest(
+    text: str,
+    candidates: Iterable[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    """
+    Выбор непересекающихся вхождений по правилу «самое левое, самое длинное».
+
+    Учитываются только вхождения, окружённые границами слов.
+
+    Args:
+        text (str): Текст, в котором искались вхождения.
+        candidates (Iterable[Tuple[int, int]]): Пары (start, end) всех вхождений.
+
+    Returns:
+        List[Tuple[int, int]]: Отобранные вхождения в порядке возрастания start.
+    """
+    text_len = len(text)
+    longest: Dict[int, int] = {}
+    for start, end in candidates:
+        if end <= longest.get(start, start):
+            continue
+        if start > 0 and text[start - 1].isalnum():
+            continue
+        if end < text_len and text[end].isalnum():
+            continue
+        longest[start] = end
+
+    selected: List[Tuple[int, int]] = []
+    pos = 0
+    for start in sorted(longest):
+        if start >= pos:
+            end = longest[start]
+            selected.append((start, end))
+            pos = end
+    return selected
+
+
+class AhoCorasickAutomaton:
+    """
+    Скомпилированный автомат Ахо–Корасик.
+
+    Узлы пронумерованы, корень имеет номер 0. Для каждого узла хранятся:
+      - диапазон исходящих рёбер (edge_start), отсортированных по коду символа
+      - ссылка неудачи (fail)
+      - словарная ссылка на ближайший терминальный суффикс (link, 0 — нет)
+      - длина термина, оканчивающегося в узле (length, 0 — узел не терминальный)
+
+    Каждому терминальному узлу может соответствовать полезная нагрузка (payload).
+    """
+
+    def __init__(
+        self,
+        edge_start: Sequence[int],
+        edge_char: Sequence[int],
+        edge_target: Sequence[int],
+        fail: Sequence[int],
+        link: Sequence[int],
+        length: Sequence[int],
+        payloads: Optional[Dict[int, Any]] = None
+    ):
+        """
+        Инициализация автомата из готовых массивов.
+
+        Args:
+            edge_start (Sequence[int]): Начало списка рёбер каждого узла (n_nodes + 1).
+            edge_char (Sequence[int]): Коды символов рёбер.
+            edge_target (Sequence[int]): Узлы, в которые ведут рёбра.
+            fail (Sequence[int]): Ссылки неудачи.
+            link (Sequence[int]): Словарные ссылки.
+            length (Sequence[int]): Длины терминов в терминальных узлах.
+            payloads (Dict[int, Any], optional): Нагрузка терминальных узлов.
+        """
+        self.edge_start = edge_start
+        self.edge_char = edge_char
+        self.edge_target = edge_target
+        self.fail = fail
+        self.link = link
+        self.length = length
+        self.payloads: Dict[int, Any] = payloads or {}
+        self._root: Dict[int, int] = {
+            edge_char[j]: edge_target[j] for j in range(edge_start[0], edge_start[1])
+        } if len(edge_start) > 1 else {}
+
+    @property
+    def node_count(self) -> int:
+        """
+        Количество узлов автомата.
+
+        Returns:
+            int: Число узлов, включая корень.
+        """
+        return len(self.fail)
+
+    @classmethod
+    def build(cls, patterns: Iterable[Tuple[str, Any]]) -> "AhoCorasickAutomaton":
+        """
+        Построение автомата по набору шаблонов.
+
+        Одинаковые шаблоны объединяются в один терминальный узел, а их нагрузки
+        собираются в кортеж в порядке добавления.
+
+        Args:
+            patterns (Iterable[Tuple[str, Any]]): Пары (шаблон, нагрузка).
+
+        Returns:
+            AhoCorasickAutomaton: Готовый автомат.
+        """
+        children: List[Dict[int, int]] = [{}]
+        depth: List[int] = [0]
+        terminal: Dict[int, List[Any]] = {}
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                code = ord(ch)
+                nxt = children[node].get(code)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][code] = nxt
+                    children.append({})
+                    depth.append(depth[node] + 1)
+                node = nxt
+            terminal.setdefault(node, []).append(payload)
+
+        n_nodes = len(children)
+        fail = array("I", bytes(4 * n_nodes))
+        link = array("I", bytes(4 * n_nodes))
+        length = array("I", bytes(4 * n_nodes))
+        for node in terminal:
+            length[node] = depth[node]
+
+        queue = deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and code not in children[f]:
+                    f = fail[f]
+                target = children[f].get(code, 0)
+                fail[child] = target
+                link[child] = target if length[target] else link[target]
+
+        edge_start = array("I", [0])
+        edge_char = array("I")
+        edge_target = array("I")
+        for node in range(n_nodes):
+            for code in sorted(children[node]):
+                edge_char.append(code)
+                edge_target.append(children[node][code])
+            edge_start.append(len(edge_char))
+
+        payloads = {node: tuple(values) for node, values in terminal.items()}
+        return cls(edge_start, edge_char, edge_target, fail, link, length, payloads)
+
+    def _next(self, node: int, code: int) -> int:
+        """
+        Переход по ребру без учёта ссылок неудачи.
+
+        Args:
+            node (int): Текущий узел.
+            code (int): Код символа.
+
+        Returns:
+            int: Номер следующего узла или -1, если ребра нет.
+        """
+        if node == 0:
+            return self._root.get(code, -1)
+        lo = self.edge_start[node]
+        hi = self.edge_start[node + 1]
+        j = bisect_left(self.edge_char, code, lo, hi)
+        if j < hi and self.edge_char[j] == code:
+            return self.edge_target[j]
+        return -1
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Поиск всех (в том числе перекрывающихся) вхождений шаблонов за один проход.
+
+        Args:
+            text (str): Текст для поиска.
+
+        Yields:
+            Tuple[int, int, int]: (start, end, терминальный узел) для каждого вхождения.
+        """
+        fail = self.fail
+        link = self.link
+        length = self.length
+        node = 0
+        for i, ch in enumerate(text):
+            code = ord(ch)
+            nxt = self._next(node, code)
+            while nxt < 0 and node:
+                node = fail[node]
+                nxt = self._next(node, code)
+            node = nxt if nxt > 0 else 0
+
+            out = node if length[node] else link[node]
+            while out:
+                yield i + 1 - length[out], i + 1, out
+                out = link[out]
@@ -0,0 +1,52 @@
+"""
+Бэкенды вывода языковой модели, выбираемые настройкой llm_settings["backend"].
+"""
+
+from typing import Dict, Optional, Type
+
+from ..model_registry import ModelRegistry
+from .base import InferenceBackend, is_deterministic
+from .fake_backend import FakeBackend
+from .onnx_backend import OnnxBackend
+from .server_backend import ServerBackend
+from .transformers_backend import TransformersBackend
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    "transformers": TransformersBackend,
+    "onnx": OnnxBackend,
+    "fake": FakeBackend,
+    "server": ServerBackend,
+}
+
+
+def create_backend(name: str, registry: Optional[ModelRegistry] = None) -> InferenceBackend:
+    """
+    Создание бэкенда по имени.
+
+    Args:
+        name (str): Имя бэкенда ("transformers", "onnx", "fake" или "server").
+        registry (ModelRegistry, optional): Реестр моделей для бэкенда transformers.
+
+    Returns:
+        InferenceBackend: Бэкенд.
+
+    Raises:
+        ValueError: Если бэкенд с таким именем не существует.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный backend LLM: {name}")
+    if name == "transformers":
+        return TransformersBackend(registry)
+    return BACKENDS[name]()
+
+
+__all__ = [
+    "BACKENDS",
+    "FakeBackend",
+    "InferenceBackend",
+    "OnnxBackend",
+    "ServerBackend",
+    "TransformersBackend",
+    "create_backend",
+    "is_deterministic",
+]
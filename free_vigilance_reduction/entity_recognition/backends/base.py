@@ -0,0 +1,97 @@
+"""
+Абстрактный базовый класс бэкенда вывода языковой модели.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def is_deterministic(llm_settings: Dict[str, Any]) -> bool:
+    """
+    Проверка, что генерация детерминирована (жадная).
+
+    Args:
+        llm_settings (dict): Настройки генерации.
+
+    Returns:
+        bool: True при deterministic=True или нулевой температуре.
+    """
+    return bool(llm_settings.get("deterministic", False)) or llm_settings.get("temperature", 0.5) <= 0
+
+
+class InferenceBackend(ABC):
+    """
+    Интерфейс бэкенда вывода: токенизация, подсчёт токенов и пакетная генерация.
+
+    Бэкенд ведёт счётчик generated_tokens — число токенов, сгенерированных
+    за всё время, — по которому LanguageModel считает производительность.
+    """
+
+    name: str = ""
+
+    def __init__(self):
+        self.generated_tokens: int = 0
+
+    def load(self, llm_settings: Dict[str, Any]) -> None:
+        """
+        Подготовка модели по настройкам профиля перед работой.
+
+        Args:
+            llm_settings (dict): Настройки LLM профиля.
+        """
+
+    def release(self) -> None:
+        """
+        Завершение работы с моделью: после этого она может быть выгружена.
+        """
+
+    @abstractmethod
+    def tokenize(self, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        Токенизация текста без специальных токенов.
+
+        Args:
+            text (str): Текст.
+
+        Returns:
+            Tuple[List[int], List[Tuple[int, int]]]: Токены и их границы в тексте (в символах).
+        """
+        pass
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Число токенов в тексте.
+
+        Args:
+            text (str): Текст.
+
+        Returns:
+            int: Число токенов без специальных.
+        """
+        return len(self.tokenize(text)[0])
+
+    @abstractmethod
+    def generate_batch(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Генерация ответов для списка промптов.
+
+        Args:
+            prompts (List[str]): Промпты (суффиксы после prefix).
+            llm_settings (dict): Настройки генерации.
+            prefix (str): Общее начало всех промптов.
+            cache_key (str): Ключ для кэширования состояния префикса (идентификатор профиля).
+            sources (List[str], optional): Исходные чанки, соответствующие промптам.
+            entity_types (List[str], optional): Типы сущностей профиля.
+
+        Returns:
+            List[str]: Ответ модели для каждого промпта без текста промпта.
+        """
+        pass
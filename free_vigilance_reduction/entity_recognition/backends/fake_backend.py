@@ -0,0 +1,66 @@
+"""
+Детерминированный бэкенд без модели для тестов и бенчмарков конвейера.
+
+Вместо генерации бэкенд размечает в каждом исходном чанке слова с заглавной
+буквы первым типом сущности профиля и возвращает ответ в формате output_mode
+("echo" — чанк с тегами, "spans" — строки "ТИП: фрагмент"). Токен — один
+символ. При заданном llm_settings["fake_tokens_per_second"] бэкенд
+выдерживает паузу, соответствующую этой скорости генерации.
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .base import InferenceBackend
+
+_CAPITALIZED = re.compile(r"\b[А-ЯЁA-Z][а-яёa-z]+\b")
+
+
+class FakeBackend(InferenceBackend):
+    """
+    Бэкенд с детерминированными ответами.
+    """
+
+    name = "fake"
+
+    def __init__(self, reply: Optional[Callable[[str, List[str], Dict[str, Any]], str]] = None):
+        """
+        Args:
+            reply (Callable, optional): Функция (чанк, типы сущностей, настройки) -> ответ
+                вместо разметки слов с заглавной буквы.
+        """
+        super().__init__()
+        self.reply = reply or self._default_reply
+        self.calls: List[int] = []
+
+    @staticmethod
+    def _default_reply(source: str, entity_types: List[str], llm_settings: Dict[str, Any]) -> str:
+        if not entity_types:
+            return source if llm_settings.get("output_mode", "echo") == "echo" else ""
+        etype = entity_types[0]
+        if llm_settings.get("output_mode", "echo") == "spans":
+            return "\n".join(f"{etype}: {m.group()}" for m in _CAPITALIZED.finditer(source))
+        return _CAPITALIZED.sub(lambda m: f"<{etype}>{m.group()}</{etype}>", source)
+
+    def tokenize(self, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        return [ord(ch) for ch in text], [(i, i + 1) for i in range(len(text))]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        self.calls.append(len(prompts))
+        sources = sources if sources is not None else prompts
+        outputs = [self.reply(source, list(entity_types or []), llm_settings) for source in sources]
+        tokens = sum(len(out) for out in outputs)
+        self.generated_tokens += tokens
+        rate = llm_settings.get("fake_tokens_per_second", 0)
+        if rate:
+            time.sleep(tokens / rate)
+        return outputs
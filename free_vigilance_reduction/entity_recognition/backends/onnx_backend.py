@@ -0,0 +1,154 @@
+"""
+Бэкенд вывода на ONNX Runtime (CPUExecutionProvider) через optimum.
+
+Граф модели экспортируется из локальной модели transformers при первой
+загрузке и, если задан llm_settings["onnx_model_path"], сохраняется туда,
+чтобы последующие запуски читали готовый граф. Пакетная генерация и
+ограниченное декодирование работают так же, как в TransformersBackend;
+KV-кэш префикса промпта не используется, так как формат past_key_values
+ONNX-модели отличается.
+
+Требуется пакет optimum[onnxruntime]; он импортируется только при загрузке.
+"""
+
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..model_registry import LoadedModel, ModelKey, ModelRegistry
+from ...utils.logging import get_logger
+from .transformers_backend import TransformersBackend
+
+logger = get_logger(__name__)
+
+
+def _graph_size(model: Any, onnx_path: Optional[str], model_path: str) -> int:
+    """
+    Оценка объёма загруженного графа ONNX.
+
+    Берётся размер файлов директории, из которой сессия читает граф
+    (onnx_model_path или временная директория экспорта optimum). Если она
+    недоступна, объём оценивается по файлам весов исходной модели.
+
+    Args:
+        model (ORTModelForCausalLM): Загруженная модель.
+        onnx_path (str | None): Путь сохранения графа из настроек.
+        model_path (str): Путь к исходной модели transformers.
+
+    Returns:
+        int: Объём в байтах.
+    """
+    save_dir = getattr(model, "model_save_dir", None)
+    for directory in (onnx_path, getattr(save_dir, "name", save_dir)):
+        if directory and Path(directory).is_dir():
+            size = sum(f.stat().st_size for f in Path(directory).iterdir() if f.is_file())
+            if size:
+                return size
+    return ModelRegistry._estimate_size(model_path)
+
+
+def _load_onnx(key: ModelKey, llm_settings: Dict[str, Any]) -> LoadedModel:
+    """
+    Загрузка ONNX-модели и токенизатора.
+
+    Args:
+        key (Tuple[str, str, str]): Ключ (model_path, device, dtype).
+        llm_settings (dict): Настройки LLM профиля (onnx_model_path).
+
+    Returns:
+        LoadedModel: Загруженная модель.
+
+    Raises:
+        ValueError: Если путь к модели не указан или не существует.
+        ImportError: Если не установлен optimum[onnxruntime].
+    """
+    model_path = key[0]
+    if not model_path or not Path(model_path).exists():
+        msg = f"LLM: указанный путь до модели не найден: '{model_path}'"
+        logger.error(msg)
+        raise ValueError(msg)
+    try:
+        from optimum.onnxruntime import ORTModelForCausalLM
+    except ImportError as e:
+        msg = "LLM: для backend 'onnx' установите пакет optimum[onnxruntime]"
+        logger.error(msg)
+        raise ImportError(msg) from e
+
+    import torch
+    from transformers import AutoTokenizer
+
+    started = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_path, use_fast=True, local_files_only=True)
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    onnx_path = llm_settings.get("onnx_model_path")
+    if onnx_path and list(Path(onnx_path).glob("*.onnx")):
+        model = ORTModelForCausalLM.from_pretrained(onnx_path, provider="CPUExecutionProvider")
+    else:
+        model = ORTModelForCausalLM.from_pretrained(
+            model_path, export=True, local_files_only=True, provider="CPUExecutionProvider"
+        )
+        if onnx_path:
+            model.save_pretrained(onnx_path)
+            logger.info(f"LLM: граф ONNX сохранён в {onnx_path}")
+
+    size = _graph_size(model, onnx_path, model_path)
+    elapsed = time.perf_counter() - started
+    logger.info(f"LLM (ONNX Runtime) загружена из {onnx_path or model_path} за {elapsed:.2f} с")
+    return LoadedModel(key, tokenizer, model, torch.device("cpu"), size, elapsed)
+
+
+@lru_cache()
+def get_onnx_registry() -> ModelRegistry:
+    """
+    Общий для процесса реестр ONNX-моделей.
+
+    Бюджет памяти задаётся той же переменной FVR_LLM_MEMORY_BUDGET_MB, что и
+    для моделей transformers, и действует отдельно.
+
+    Returns:
+        ModelRegistry: Реестр.
+    """
+    budget_mb = os.getenv("FVR_LLM_MEMORY_BUDGET_MB")
+    return ModelRegistry(int(budget_mb) * 1024 * 1024 if budget_mb else None, loader=_load_onnx)
+
+
+class OnnxBackend(TransformersBackend):
+    """
+    Бэкенд на ONNX Runtime для CPU.
+    """
+
+    name = "onnx"
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        """
+        Args:
+            registry (ModelRegistry, optional): Реестр ONNX-моделей (по умолчанию общий для процесса).
+        """
+        super().__init__(registry if registry is not None else get_onnx_registry())
+
+    def load(self, llm_settings: Dict[str, Any]) -> None:
+        # Граф экспортируется в float32 и исполняется на CPU.
+        super().load(dict(llm_settings, device="cpu", dtype="float32"))
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        return super().generate_batch(
+            prompts,
+            dict(llm_settings, cache_prompt_prefix=False),
+            prefix,
+            cache_key,
+            sources,
+            entity_types
+        )
@@ -0,0 +1,137 @@
+"""
+Клиентский бэкенд: вывод на локальном сервере (free_vigilance_reduction.inference_server).
+
+Модель загружается один раз в процессе сервера, а приложения отправляют ему
+чанки по Unix-сокету или HTTP. Сервер объединяет одновременные запросы
+разных процессов в общие пакеты. Адрес задаётся llm_settings["server_address"]
+("unix:///путь/к/сокету" или "http://хост:порт"), бэкенд на стороне сервера —
+llm_settings["server_backend"] (по умолчанию "transformers").
+"""
+
+import http.client
+import json
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from ...utils.logging import get_logger
+from .base import InferenceBackend
+
+logger = get_logger(__name__)
+
+DEFAULT_SERVER_ADDRESS = "unix:///tmp/fvr-llm.sock"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP-соединение через Unix-сокет.
+    """
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class ServerBackend(InferenceBackend):
+    """
+    Бэкенд, передающий токенизацию и генерацию серверу вывода.
+    """
+
+    name = "server"
+
+    def __init__(self):
+        super().__init__()
+        self._settings: Dict[str, Any] = {}
+
+    def load(self, llm_settings: Dict[str, Any]) -> None:
+        """
+        Запоминание настроек: модель загружается на стороне сервера.
+
+        Args:
+            llm_settings (dict): Настройки LLM профиля.
+        """
+        self._settings = dict(llm_settings)
+
+    def _remote_settings(self, llm_settings: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(llm_settings, backend=llm_settings.get("server_backend", "transformers"))
+
+    def _request(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Отправка запроса серверу вывода.
+
+        Args:
+            path (str): Путь запроса ("/generate" или "/tokenize").
+            payload (dict): Тело запроса.
+
+        Returns:
+            dict: Ответ сервера.
+
+        Raises:
+            ConnectionError: Если сервер недоступен.
+            RuntimeError: Если сервер вернул ошибку или некорректный ответ.
+        """
+        address = self._settings.get("server_address", DEFAULT_SERVER_ADDRESS)
+        timeout = float(self._settings.get("server_timeout", 600))
+        parsed = urlparse(address)
+        if parsed.scheme == "unix":
+            conn: http.client.HTTPConnection = _UnixHTTPConnection(parsed.path, timeout)
+        else:
+            conn = http.client.HTTPConnection(parsed.hostname or "127.0.0.1", parsed.port or 8765, timeout=timeout)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            conn.request("POST", path, body, {"Content-Type": "application/json; charset=utf-8"})
+            response = conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            msg = f"LLM: сервер вывода недоступен по адресу {address}: {e}"
+            logger.error(msg)
+            raise ConnectionError(msg) from e
+        finally:
+            conn.close()
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except ValueError as e:
+            msg = f"LLM: некорректный ответ сервера вывода (HTTP {response.status}): {e}"
+            logger.error(msg)
+            raise RuntimeError(msg) from e
+        if not isinstance(data, dict):
+            msg = f"LLM: некорректный ответ сервера вывода (HTTP {response.status}): ожидался объект JSON"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        if response.status != 200:
+            msg = f"LLM: ошибка сервера вывода: {data.get('error', response.status)}"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        return data
+
+    def tokenize(self, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        data = self._request("/tokenize", {"text": text, "llm_settings": self._remote_settings(self._settings)})
+        return data["ids"], [tuple(span) for span in data["offsets"]]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        if not prompts:
+            return []
+        data = self._request("/generate", {
+            "prompts": prompts,
+            "llm_settings": self._remote_settings(llm_settings),
+            "prefix": prefix,
+            "cache_key": cache_key,
+            "sources": sources,
+            "entity_types": entity_types,
+        })
+        self.generated_tokens += int(data.get("generated_tokens", 0))
+        return data["outputs"]
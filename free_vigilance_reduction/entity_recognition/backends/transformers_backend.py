@@ -0,0 +1,302 @@
+"""
+Бэкенд вывода на transformers: AutoModelForCausalLM.generate.
+
+Модель берётся из реестра моделей. Промпты генерируются пакетами с
+дополнением слева, KV-кэш общего префикса промпта вычисляется один раз, а в
+режиме echo доступно ограниченное декодирование «копируй или размечай».
+"""
+
+import copy
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..model_registry import LoadedModel, ModelRegistry, get_model_registry
+from ...utils.logging import get_logger
+from .base import InferenceBackend, is_deterministic
+
+if TYPE_CHECKING:
+    import torch
+    from transformers import PreTrainedModel, PreTrainedTokenizerBase
+
+logger = get_logger(__name__)
+
+# Число префиксов промптов, чей KV-кэш хранится одновременно.
+_PREFIX_CACHE_SIZE = 8
+
+
+class TransformersBackend(InferenceBackend):
+    """
+    Бэкенд на transformers с моделью из реестра.
+
+    Компоненты (tokenizer, model, device) можно подставить явно: тогда
+    бэкенд отвязывается от реестра и использует их как есть.
+    """
+
+    name = "transformers"
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        """
+        Args:
+            registry (ModelRegistry, optional): Реестр моделей (по умолчанию общий для процесса).
+        """
+        super().__init__()
+        self.registry = registry if registry is not None else get_model_registry()
+        self._loaded = LoadedModel()
+        self._prefix_cache: "OrderedDict[Tuple[str, str, str], Tuple[Any, Any]]" = OrderedDict()
+
+    @property
+    def tokenizer(self) -> Optional["PreTrainedTokenizerBase"]:
+        return self._loaded.tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value: Optional["PreTrainedTokenizerBase"]) -> None:
+        self._detached().tokenizer = value
+
+    @property
+    def model(self) -> Optional["PreTrainedModel"]:
+        return self._loaded.model
+
+    @model.setter
+    def model(self, value: Optional["PreTrainedModel"]) -> None:
+        self._detached().model = value
+
+    @property
+    def device(self) -> Optional["torch.device"]:
+        return self._loaded.device
+
+    @device.setter
+    def device(self, value: Optional["torch.device"]) -> None:
+        self._detached().device = value
+
+    def _detached(self) -> LoadedModel:
+        """
+        Модель, не принадлежащая реестру, для явной подстановки компонентов.
+
+        Returns:
+            LoadedModel: Текущая модель, отвязанная от реестра при необходимости.
+        """
+        if self._loaded.key is not None:
+            self._loaded = LoadedModel(None, self._loaded.tokenizer, self._loaded.model, self._loaded.device)
+        return self._loaded
+
+    def load(self, llm_settings: Dict[str, Any]) -> None:
+        """
+        Получение модели из реестра по (model_path, device, dtype).
+
+        Модель остаётся занятой (не выгружается реестром) до вызова release.
+        Явно подставленные компоненты не заменяются.
+
+        Args:
+            llm_settings (dict): Настройки LLM профиля.
+
+        Raises:
+            ValueError: Если путь к модели не указан или не существует.
+        """
+        if self._loaded.key is None and self._loaded.model is not None:
+            return
+        loaded = self.registry.acquire(llm_settings)
+        if loaded is not self._loaded:
+            self._prefix_cache.clear()
+        self._loaded = loaded
+
+    def release(self) -> None:
+        if self._loaded.key is not None:
+            self.registry.release(self._loaded)
+
+    def tokenize(self, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        Токенизация текста с границами токенов.
+
+        Для токенизаторов без return_offsets_mapping границы восстанавливаются
+        поиском декодированных токенов в тексте.
+
+        Args:
+            text (str): Текст.
+
+        Returns:
+            Tuple[List[int], List[Tuple[int, int]]]: Токены и их границы в тексте.
+        """
+        try:
+            encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        except NotImplementedError:
+            token_ids = self.tokenizer.encode(text, add_special_tokens=False)
+            offsets: List[Tuple[int, int]] = []
+            cursor = 0
+            for token_id in token_ids:
+                piece = self.tokenizer.decode([token_id]).strip()
+                found = text.find(piece, cursor) if piece else -1
+                if found < 0:
+                    offsets.append((cursor, cursor))
+                else:
+                    cursor = found + len(piece)
+                    offsets.append((found, cursor))
+            return list(token_ids), offsets
+        return list(encoded["input_ids"]), [tuple(span) for span in encoded["offset_mapping"]]
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _get_prefix_cache(
+        self,
+        cache_key: str,
+        model_path: str,
+        prefix: str
+    ) -> Tuple["torch.Tensor", Any]:
+        """
+        Получение закэшированных past_key_values для префикса промпта.
+
+        Кэш хранится по ключу (профиль, модель, текст префикса), поэтому
+        изменение инструкции или списка тегов профиля приводит к пересчёту.
+
+        Args:
+            cache_key (str): Идентификатор профиля.
+            model_path (str): Путь к модели.
+            prefix (str): Текст префикса.
+
+        Returns:
+            Tuple[torch.Tensor, Cache]: Токены префикса (1 x P) и их KV-кэш.
+        """
+        import torch
+
+        key = (cache_key, model_path, prefix)
+        cached = self._prefix_cache.get(key)
+        if cached is not None:
+            self._prefix_cache.move_to_end(key)
+            return cached
+
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"].to(self.device)
+        with torch.no_grad():
+            past = self.model(input_ids=prefix_ids, use_cache=True).past_key_values
+        self._prefix_cache[key] = (prefix_ids, past)
+        if len(self._prefix_cache) > _PREFIX_CACHE_SIZE:
+            self._prefix_cache.popitem(last=False)
+        logger.info(f"LLM: закэширован префикс промпта профиля '{cache_key}' ({prefix_ids.shape[1]} токенов)")
+        return prefix_ids, past
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Генерация ответов модели для списка промптов пакетами.
+
+        Промпты группируются в пакеты по batch_size, внутри пакета дополняются
+        слева до общей длины с маской внимания. Для уменьшения дополнения
+        промпты упорядочиваются по длине, а ответы возвращаются в исходном порядке.
+        Декодируются только сгенерированные токены, без промпта.
+
+        Если задан общий префикс и включён cache_prompt_prefix, KV-кэш префикса
+        вычисляется один раз на профиль и модель, а для каждого пакета
+        прогоняются только суффиксы. Дополнение в этом случае ставится между
+        префиксом и суффиксом, чтобы позиции префикса совпадали с кэшем.
+
+        Если переданы исходные чанки, output_mode равен "echo" и включён
+        constrained_decoding, модель может только копировать чанк и вставлять
+        теги entity_types, а генерация строки прекращается, как только чанк
+        воспроизведён полностью.
+
+        Args:
+            prompts (List[str]): Промпты (суффиксы после prefix).
+            llm_settings (dict): Настройки генерации (batch_size, max_new_tokens, temperature).
+            prefix (str): Общее начало всех промптов.
+            cache_key (str): Идентификатор профиля для ключа кэша префикса.
+            sources (List[str], optional): Исходные чанки, соответствующие промптам.
+            entity_types (List[str], optional): Типы сущностей для тегов.
+
+        Returns:
+            List[str]: Ответ модели для каждого промпта.
+        """
+        import torch
+
+        if not prompts:
+            return []
+
+        batch_size = max(1, int(llm_settings.get("batch_size", 1)))
+        max_new = llm_settings.get("max_new_tokens", 256)
+        if is_deterministic(llm_settings):
+            sampling = {"do_sample": False}
+        else:
+            sampling = {"do_sample": True, "temperature": llm_settings.get("temperature", 0.5)}
+
+        use_prefix_cache = bool(prefix) and llm_settings.get("cache_prompt_prefix", True)
+        constrained = (
+            sources is not None
+            and llm_settings.get("constrained_decoding", False)
+            and llm_settings.get("output_mode", "echo") == "echo"
+        )
+        if use_prefix_cache:
+            prefix_ids, prefix_past = self._get_prefix_cache(
+                cache_key, llm_settings.get("model_path", ""), prefix
+            )
+
+        order = sorted(range(len(prompts)), key=lambda k: len(prompts[k]))
+        outputs: List[str] = [""] * len(prompts)
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            if use_prefix_cache:
+                inputs = self.tokenizer(
+                    [prompts[k] for k in batch],
+                    return_tensors="pt",
+                    padding=True,
+                    add_special_tokens=False
+                )
+                suffix_ids = inputs["input_ids"].to(self.device)
+                suffix_mask = inputs["attention_mask"].to(self.device)
+                input_ids = torch.cat([prefix_ids.expand(len(batch), -1), suffix_ids], dim=1)
+                attn_mask = torch.cat([torch.ones_like(input_ids[:, :prefix_ids.shape[1]]), suffix_mask], dim=1)
+                past = copy.deepcopy(prefix_past)
+                past.batch_repeat_interleave(len(batch))
+                cache_kwargs = {"past_key_values": past}
+            else:
+                inputs = self.tokenizer(
+                    [prefix + prompts[k] for k in batch],
+                    return_tensors="pt",
+                    padding=True
+                )
+                input_ids = inputs["input_ids"].to(self.device)
+                attn_mask = inputs.get("attention_mask")
+                if attn_mask is not None:
+                    attn_mask = attn_mask.to(self.device)
+                cache_kwargs = {}
+
+            if constrained:
+                from transformers import LogitsProcessorList, StoppingCriteriaList
+                from ..constrained_decoding import (
+                    CopyOrTagDecoder,
+                    CopyOrTagLogitsProcessor,
+                    SourceReproducedCriteria,
+                )
+                decoder = CopyOrTagDecoder.from_tokenizer(
+                    self.tokenizer, [sources[k] for k in batch], entity_types or [], input_ids.shape[1]
+                )
+                constraint_kwargs = {
+                    "logits_processor": LogitsProcessorList([CopyOrTagLogitsProcessor(decoder)]),
+                    "stopping_criteria": StoppingCriteriaList([SourceReproducedCriteria(decoder)]),
+                }
+            else:
+                constraint_kwargs = {}
+
+            with torch.no_grad():
+                out_ids = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=attn_mask,
+                    max_new_tokens=max_new,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    **cache_kwargs,
+                    **constraint_kwargs,
+                    **sampling
+                )
+
+            new_ids = out_ids[:, input_ids.shape[1]:]
+            self.generated_tokens += int((new_ids != self.tokenizer.pad_token_id).sum())
+            for k, ids in zip(batch, new_ids):
+                outputs[k] = self.tokenizer.decode(ids, skip_special_tokens=True).strip()
+                logger.debug(f"LLM ответ для чанка {k}:\n{outputs[k]}")
+
+        return outputs
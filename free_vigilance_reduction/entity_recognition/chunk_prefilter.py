@@ -0,0 +1,213 @@
+"""
+Модуль предварительного отбора чанков перед языковой моделью.
+
+Каждый чанк получает дешёвую эвристическую оценку: слова с заглавной буквы
+(в начале предложения — с меньшим весом), аббревиатуры, названия в кавычках
+«» и сущности, уже найденные другими методами (словари, regex, spaCy)
+(попадания в справочники). Чанки с оценкой ниже порога в модель не
+передаются: так пропускаются таблицы чисел и шаблонный текст без имён.
+
+Чтобы оценить, сколько сущностей теряется, часть пропускаемых чанков
+(audit_rate) всё равно отправляется в модель; по доле сущностей в них
+экстраполируется число пропущенных.
+"""
+
+import re
+import zlib
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .entity import Entity
+
+# Слово с заглавной буквы и предшествующий ему контекст (начало предложения).
+_CAPITALIZED = re.compile(r"(^|[.!?…\n]\s*|)\b([А-ЯЁA-Z][\w-]*)")
+_QUOTED = re.compile(r"«[^«»\n]{1,80}»")
+
+
+class PrefilterStats:
+    """
+    Статистика отбора чанков для отчёта.
+    """
+
+    def __init__(self):
+        self.chunks = 0
+        self.skipped = 0
+        self.audited = 0
+        self.audited_tags = 0
+        self.generated_tags = 0
+
+    @property
+    def skip_rate(self) -> float:
+        """
+        Доля чанков, не переданных в модель.
+
+        Returns:
+            float: Доля от 0 до 1.
+        """
+        return self.skipped / self.chunks if self.chunks else 0.0
+
+    @property
+    def estimated_missed(self) -> Optional[float]:
+        """
+        Оценка числа сущностей в пропущенных чанках по контрольной выборке.
+
+        Returns:
+            float | None: Оценка или None, если выборки не было, а пропуски есть.
+        """
+        if not self.skipped:
+            return 0.0
+        if not self.audited:
+            return None
+        return self.audited_tags / self.audited * self.skipped
+
+    @property
+    def estimated_recall_loss(self) -> Optional[float]:
+        """
+        Оценка доли сущностей, потерянных из-за пропуска чанков.
+
+        Returns:
+            float | None: Доля от 0 до 1 или None, если оценить нельзя.
+        """
+        missed = self.estimated_missed
+        if missed is None:
+            return None
+        total = self.generated_tags + self.audited_tags + missed
+        return missed / total if total else 0.0
+
+    def merge(self, other: "PrefilterStats") -> None:
+        """
+        Добавление статистики другого запуска.
+
+        Args:
+            other (PrefilterStats): Статистика.
+        """
+        self.chunks += other.chunks
+        self.skipped += other.skipped
+        self.audited += other.audited
+        self.audited_tags += other.audited_tags
+        self.generated_tags += other.generated_tags
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Преобразование статистики в словарь.
+
+        Returns:
+            dict: Статистика отбора.
+        """
+        return {
+            "chunks": self.chunks,
+            "skipped": self.skipped,
+            "audited": self.audited,
+            "skip_rate": self.skip_rate,
+            "estimated_missed_entities": self.estimated_missed,
+            "estimated_recall_loss": self.estimated_recall_loss,
+        }
+
+
+class ChunkPrefilter:
+    """
+    Эвристический отбор чанков, в которых могут быть сущности.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        audit_rate: float = 0.05,
+        sentence_start_weight: float = 0.5,
+        gazetteer_weight: float = 2.0
+    ):
+        """
+        Args:
+            threshold (float): Минимальная оценка чанка для передачи в модель.
+            audit_rate (float): Доля пропускаемых чанков, всё же отправляемых в модель для оценки потерь.
+            sentence_start_weight (float): Вес слова с заглавной буквы в начале предложения.
+            gazetteer_weight (float): Вес уже найденной в чанке сущности.
+        """
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.sentence_start_weight = sentence_start_weight
+        self.gazetteer_weight = gazetteer_weight
+
+    @classmethod
+    def from_settings(cls, llm_settings: Dict[str, Any]) -> Optional["ChunkPrefilter"]:
+        """
+        Создание фильтра по настройкам LLM профиля.
+
+        Args:
+            llm_settings (dict): Настройки (prefilter, prefilter_threshold, prefilter_audit_rate).
+
+        Returns:
+            ChunkPrefilter | None: Фильтр или None, если отбор выключен.
+        """
+        if not llm_settings.get("prefilter", False):
+            return None
+        return cls(
+            float(llm_settings.get("prefilter_threshold", 1.0)),
+            float(llm_settings.get("prefilter_audit_rate", 0.05)),
+        )
+
+    def score(self, chunk: str, known_hits: int = 0) -> float:
+        """
+        Оценка чанка.
+
+        Args:
+            chunk (str): Текст чанка.
+            known_hits (int): Число уже найденных сущностей в чанке.
+
+        Returns:
+            float: Оценка (0 — признаков сущностей нет).
+        """
+        score = self.gazetteer_weight * known_hits + len(_QUOTED.findall(chunk))
+        for m in _CAPITALIZED.finditer(chunk):
+            word = m.group(2)
+            if len(word) > 1 and word.isupper():
+                score += 1
+            elif m.start(2) == 0 or m.group(1):
+                score += self.sentence_start_weight
+            else:
+                score += 1
+        return score
+
+    def select(
+        self,
+        chunks: Sequence[Tuple[int, str]],
+        known: Sequence[Entity] = ()
+    ) -> Tuple[List[bool], List[bool], PrefilterStats]:
+        """
+        Отбор чанков документа для передачи в модель.
+
+        Контрольная выборка детерминирована: пропускаемый чанк попадает в неё,
+        если CRC32 его текста делится на k = 1 / audit_rate, поэтому выбор не
+        зависит от порядка документов и совпадает при повторных запусках.
+        Попаданием в справочник считается известная сущность, начинающаяся в чанке.
+
+        Args:
+            chunks (Sequence[Tuple[int, str]]): Пары (смещение чанка в тексте, текст чанка).
+            known (Sequence[Entity]): Сущности, уже найденные другими методами.
+
+        Returns:
+            Tuple[List[bool], List[bool], PrefilterStats]: Признак передачи в
+                модель и признак контрольной выборки для каждого чанка, а
+                также статистика (без числа сущностей).
+        """
+        stats = PrefilterStats()
+        every = max(1, round(1 / self.audit_rate)) if self.audit_rate > 0 else 0
+        known_starts = sorted(e.start_pos for e in known)
+        keep: List[bool] = []
+        audit: List[bool] = []
+        for start, chunk in chunks:
+            end = start + len(chunk)
+            hits = bisect_left(known_starts, end) - bisect_left(known_starts, start)
+            stats.chunks += 1
+            if self.score(chunk, hits) >= self.threshold:
+                keep.append(True)
+                audit.append(False)
+                continue
+            sampled = bool(every) and zlib.crc32(chunk.encode("utf-8")) % every == 0
+            if sampled:
+                stats.audited += 1
+            else:
+                stats.skipped += 1
+            keep.append(sampled)
+            audit.append(sampled)
+        return keep, audit, stats
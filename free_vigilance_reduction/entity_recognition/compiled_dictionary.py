@@ -0,0 +1,258 @@
+"""
+Модуль для компиляции словарей в бинарный формат и их загрузки через mmap.
+
+Скомпилированный словарь (файл с расширением .fvd рядом с исходным .txt)
+содержит отсортированную таблицу строк и готовый автомат Ахо–Корасик в виде
+плоских массивов uint32. Файл отображается в память только для чтения, поэтому
+загрузка почти мгновенна, а процессы, открывшие один и тот же файл, разделяют
+его страницы.
+
+Компиляция из командной строки:
+
+    python -m free_vigilance_reduction.entity_recognition.compiled_dictionary dict.txt [...]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .automaton import AhoCorasickAutomaton
+from .dictionary import Dictionary
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+COMPILED_SUFFIX = ".fvd"
+
+_MAGIC = b"FVDC"
+_FORMAT_VERSION = 1
+_BYTE_ORDERS = {"little": 1, "big": 2}
+# magic, версия, порядок байт, число терминов, размер блока строк, число узлов, число рёбер
+_HEADER = struct.Struct("<4sHHIIII")
+
+
+class StringTable:
+    """
+    Отсортированная таблица строк поверх буфера в памяти.
+
+    Строки хранятся подряд в UTF-8, их границы — в массиве смещений. Порядок
+    байт UTF-8 совпадает с порядком кодовых точек, поэтому проверка вхождения
+    выполняется двоичным поиском без декодирования всей таблицы.
+    """
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        """
+        Инициализация таблицы.
+
+        Args:
+            offsets (memoryview): Смещения строк (uint32, n + 1 элемент).
+            blob (memoryview): Байты строк в UTF-8.
+        """
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _raw(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("StringTable index out of range")
+        return self._raw(i).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._raw(i).decode("utf-8")
+
+    def __contains__(self, term: object) -> bool:
+        if not isinstance(term, str):
+            return False
+        raw = term.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) < raw:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(self) and self._raw(lo) == raw
+
+
+def compiled_path_for(file_path: str) -> str:
+    """
+    Путь к скомпилированному словарю для исходного файла.
+
+    Args:
+        file_path (str): Путь к текстовому словарю.
+
+    Returns:
+        str: Путь к файлу .fvd.
+    """
+    return str(Path(file_path).with_suffix(COMPILED_SUFFIX))
+
+
+def is_compiled_fresh(file_path: str, compiled_path: Optional[str] = None) -> bool:
+    """
+    Проверка, что скомпилированный словарь существует и новее исходного файла.
+
+    Args:
+        file_path (str): Путь к текстовому словарю.
+        compiled_path (str, optional): Путь к .fvd (по умолчанию рядом с исходным).
+
+    Returns:
+        bool: True, если можно использовать скомпилированный словарь.
+    """
+    compiled_path = compiled_path or compiled_path_for(file_path)
+    try:
+        return os.stat(compiled_path).st_mtime_ns > os.stat(file_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def save_compiled(dictionary: Dictionary, output_path: str) -> None:
+    """
+    Запись словаря в бинарный формат.
+
+    Args:
+        dictionary (Dictionary): Словарь для сохранения.
+        output_path (str): Путь к выходному файлу.
+    """
+    encoded = sorted({term.encode("utf-8") for term in dictionary.terms})
+    offsets = array("I", [0])
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    blob = b"".join(encoded)
+
+    automaton = dictionary.automaton
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        _BYTE_ORDERS[sys.byteorder],
+        len(encoded),
+        len(blob),
+        automaton.node_count,
+        len(automaton.edge_char),
+    )
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(offsets.tobytes())
+        f.write(blob)
+        f.write(b"\0" * (-len(blob) % 4))
+        for section in (
+            automaton.edge_start,
+            automaton.edge_char,
+            automaton.edge_target,
+            automaton.fail,
+            automaton.link,
+            automaton.length,
+        ):
+            f.write(array("I", section).tobytes())
+    os.replace(tmp_path, output_path)
+
+
+def load_compiled(file_path: str, entity_type: str) -> Dictionary:
+    """
+    Загрузка скомпилированного словаря через mmap.
+
+    Args:
+        file_path (str): Путь к файлу .fvd.
+        entity_type (str): Тип сущности словаря.
+
+    Returns:
+        Dictionary: Словарь, работающий поверх отображённого в память файла.
+
+    Raises:
+        ValueError: Если файл повреждён или записан в несовместимом формате.
+    """
+    with open(file_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if len(view) < _HEADER.size:
+        raise ValueError(f"Файл словаря повреждён: {file_path}")
+    magic, version, byte_order, n_terms, blob_size, n_nodes, n_edges = _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise ValueError(f"Неизвестный формат скомпилированного словаря: {file_path}")
+    if byte_order != _BYTE_ORDERS[sys.byteorder]:
+        raise ValueError(f"Словарь {file_path} скомпилирован с другим порядком байт")
+
+    blob_padded = blob_size + (-blob_size % 4)
+    expected_size = (
+        _HEADER.size + 4 * (n_terms + 1) + blob_padded + 4 * (n_nodes + 1 + 2 * n_edges + 3 * n_nodes)
+    )
+    if len(view) != expected_size:
+        raise ValueError(f"Файл словаря повреждён: {file_path}")
+
+    pos = _HEADER.size
+
+    def take_uint32(count: int) -> memoryview:
+        nonlocal pos
+        section = view[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        return section
+
+    offsets = take_uint32(n_terms + 1)
+    blob = view[pos:pos + blob_size]
+    pos += blob_padded
+    edge_start = take_uint32(n_nodes + 1)
+    edge_char = take_uint32(n_edges)
+    edge_target = take_uint32(n_edges)
+    fail = take_uint32(n_nodes)
+    link = take_uint32(n_nodes)
+    length = take_uint32(n_nodes)
+
+    automaton = AhoCorasickAutomaton(edge_start, edge_char, edge_target, fail, link, length)
+    return Dictionary.from_compiled(entity_type, StringTable(offsets, blob), automaton)
+
+
+def compile_dictionary(file_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Компиляция текстового словаря в бинарный формат.
+
+    Args:
+        file_path (str): Путь к текстовому словарю.
+        output_path (str, optional): Путь к результату (по умолчанию рядом с исходным).
+
+    Returns:
+        str: Путь к скомпилированному словарю.
+
+    Raises:
+        FileNotFoundError: Если исходный файл не найден.
+    """
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"Файл словаря не найден: {file_path}")
+
+    output_path = output_path or compiled_path_for(file_path)
+    dictionary = Dictionary("").load_from_file(file_path)
+    save_compiled(dictionary, output_path)
+    logger.info(f"Словарь {file_path} скомпилирован в {output_path} ({len(dictionary.terms)} терминов)")
+    return output_path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Точка входа для компиляции словарей из командной строки.
+
+    Args:
+        argv (List[str], optional): Аргументы командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Компиляция словарей в бинарный формат .fvd")
+    parser.add_argument("paths", nargs="+", help="Пути к текстовым словарям")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        compile_dictionary(path)
+
+
+if __name__ == "__main__":
+    main()
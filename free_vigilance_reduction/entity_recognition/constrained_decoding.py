@@ -0,0 +1,214 @@
+"""
+Модуль ограниченного декодирования «копируй или размечай» для режима echo.
+
+На каждом шаге модели разрешается выдать только следующий токен исходного
+чанка либо очередной токен открывающего или закрывающего тега из типов
+сущностей профиля. Как только чанк воспроизведён полностью и все теги
+закрыты, генерация останавливается. Ответ модели поэтому совпадает с чанком
+с точностью до вставленных тегов, а его длина ограничена длиной чанка и тегов.
+
+Теги вставляются только на границах символов: если токенизатор возвращает
+смещения, тег не может разрезать символ, закодированный несколькими токенами.
+
+Состояние строки пакета — множество гипотез: токен тега может совпасть с
+токеном исходного текста (например, "<"), и тогда обе трактовки
+отслеживаются, пока не разойдутся.
+
+Модуль импортирует transformers и загружается только при генерации.
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+import torch
+from transformers import LogitsProcessor, StoppingCriteria
+
+# Гипотеза: (позиция в исходных токенах, открытый тег (тип, есть ли внутри текст) или None,
+#            выводимый тег (вид, тип) или None, позиция внутри выводимого тега).
+Hypothesis = Tuple[int, Optional[Tuple[str, bool]], Optional[Tuple[str, str]], int]
+
+_START: Hypothesis = (0, None, None, 0)
+
+
+class CopyOrTagDecoder:
+    """
+    Автомат допустимых продолжений для пакета чанков.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Sequence[int]],
+        tag_ids: Dict[Tuple[str, str], List[int]],
+        prompt_length: int,
+        end_token_id: int,
+        boundaries: Optional[Sequence[Optional[FrozenSet[int]]]] = None
+    ):
+        """
+        Args:
+            sources (Sequence[Sequence[int]]): Токены исходного чанка для каждой строки пакета.
+            tag_ids (Dict[Tuple[str, str], List[int]]): Токены тегов по ключу ("open" | "close", тип).
+            prompt_length (int): Длина промпта (с дополнением) в токенах.
+            end_token_id (int): Токен, разрешаемый после завершения строки.
+            boundaries (Sequence[FrozenSet[int] | None], optional): Для каждой строки —
+                позиции в исходных токенах, где допустим тег (None — любые).
+        """
+        self.sources = [list(src) for src in sources]
+        self.boundaries = list(boundaries) if boundaries is not None else [None] * len(self.sources)
+        self.tag_ids = tag_ids
+        self.entity_types = sorted({etype for _, etype in tag_ids})
+        self.end_token_id = end_token_id
+        self.hypotheses: List[Set[Hypothesis]] = [{_START} for _ in self.sources]
+        self.finished: List[bool] = [False] * len(self.sources)
+        self._consumed = prompt_length
+
+    @classmethod
+    def from_tokenizer(
+        cls,
+        tokenizer,
+        chunks: Sequence[str],
+        entity_types: Sequence[str],
+        prompt_length: int
+    ) -> "CopyOrTagDecoder":
+        """
+        Построение автомата по тексту чанков.
+
+        Args:
+            tokenizer: Токенизатор модели.
+            chunks (Sequence[str]): Исходные чанки строк пакета.
+            entity_types (Sequence[str]): Типы сущностей профиля.
+            prompt_length (int): Длина промпта в токенах.
+
+        Returns:
+            CopyOrTagDecoder: Автомат.
+        """
+        tag_ids: Dict[Tuple[str, str], List[int]] = {}
+        for etype in entity_types:
+            tag_ids[("open", etype)] = tokenizer.encode(f"<{etype}>", add_special_tokens=False)
+            tag_ids[("close", etype)] = tokenizer.encode(f"</{etype}>", add_special_tokens=False)
+        sources: List[List[int]] = []
+        boundaries: List[Optional[FrozenSet[int]]] = []
+        for chunk in chunks:
+            try:
+                encoded = tokenizer(chunk, add_special_tokens=False, return_offsets_mapping=True)
+            except NotImplementedError:
+                sources.append(tokenizer.encode(chunk, add_special_tokens=False))
+                boundaries.append(None)
+                continue
+            ids, offsets = encoded["input_ids"], encoded["offset_mapping"]
+            sources.append(list(ids))
+            boundaries.append(frozenset(
+                p for p in range(len(ids) + 1)
+                if p in (0, len(ids)) or offsets[p][0] >= offsets[p - 1][1]
+            ))
+        end_token_id = tokenizer.eos_token_id
+        if end_token_id is None:
+            end_token_id = tokenizer.pad_token_id
+        return cls(sources, tag_ids, prompt_length, end_token_id, boundaries)
+
+    def _transitions(self, row: int, hyp: Hypothesis) -> Dict[int, List[Hypothesis]]:
+        """
+        Допустимые токены для гипотезы и гипотезы после каждого из них.
+        """
+        source = self.sources[row]
+        boundaries = self.boundaries[row]
+        pos, open_tag, pending, index = hyp
+        at_boundary = boundaries is None or pos in boundaries
+        moves: Dict[int, List[Hypothesis]] = {}
+
+        def emit_tag(key: Tuple[str, str], at: int) -> None:
+            seq = self.tag_ids[key]
+            if not seq:
+                return
+            if at + 1 < len(seq):
+                nxt: Hypothesis = (pos, open_tag, key, at + 1)
+            elif key[0] == "open":
+                nxt = (pos, (key[1], False), None, 0)
+            else:
+                nxt = (pos, None, None, 0)
+            moves.setdefault(seq[at], []).append(nxt)
+
+        if pending is not None:
+            emit_tag(pending, index)
+            return moves
+
+        if pos < len(source):
+            inner = (open_tag[0], True) if open_tag is not None else None
+            moves.setdefault(source[pos], []).append((pos + 1, inner, None, 0))
+            if open_tag is None and at_boundary:
+                for etype in self.entity_types:
+                    emit_tag(("open", etype), 0)
+        if open_tag is not None and open_tag[1] and at_boundary:
+            emit_tag(("close", open_tag[0]), 0)
+        return moves
+
+    @staticmethod
+    def _is_complete(source_length: int, hyp: Hypothesis) -> bool:
+        pos, open_tag, pending, _ = hyp
+        return pos == source_length and open_tag is None and pending is None
+
+    def sync(self, input_ids: torch.Tensor) -> None:
+        """
+        Продвижение автомата по токенам, выбранным с прошлого вызова.
+
+        Args:
+            input_ids (torch.Tensor): Текущие последовательности пакета.
+        """
+        while self._consumed < input_ids.shape[1]:
+            column = input_ids[:, self._consumed].tolist()
+            for row, token in enumerate(column):
+                if self.finished[row]:
+                    continue
+                advanced: Set[Hypothesis] = set()
+                for hyp in self.hypotheses[row]:
+                    advanced.update(self._transitions(row, hyp).get(token, ()))
+                self.hypotheses[row] = advanced
+                source_length = len(self.sources[row])
+                if not advanced or any(self._is_complete(source_length, h) for h in advanced):
+                    self.finished[row] = True
+            self._consumed += 1
+
+    def allowed_tokens(self, row: int) -> FrozenSet[int]:
+        """
+        Токены, которые строка может выдать следующими.
+
+        Args:
+            row (int): Номер строки пакета.
+
+        Returns:
+            FrozenSet[int]: Допустимые токены.
+        """
+        if self.finished[row]:
+            return frozenset((self.end_token_id,))
+        allowed: Set[int] = set()
+        for hyp in self.hypotheses[row]:
+            allowed.update(self._transitions(row, hyp))
+        return frozenset(allowed or (self.end_token_id,))
+
+
+class CopyOrTagLogitsProcessor(LogitsProcessor):
+    """
+    Обработчик логитов, запрещающий всё, кроме копирования чанка и тегов.
+    """
+
+    def __init__(self, decoder: CopyOrTagDecoder):
+        self.decoder = decoder
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        self.decoder.sync(input_ids)
+        mask = torch.full_like(scores, float("-inf"))
+        for row in range(scores.shape[0]):
+            allowed = torch.tensor(sorted(self.decoder.allowed_tokens(row)), device=scores.device)
+            mask[row, allowed] = 0.0
+        return scores + mask
+
+
+class SourceReproducedCriteria(StoppingCriteria):
+    """
+    Критерий остановки: чанк воспроизведён полностью и теги закрыты.
+    """
+
+    def __init__(self, decoder: CopyOrTagDecoder):
+        self.decoder = decoder
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        self.decoder.sync(input_ids)
+        return torch.tensor(self.decoder.finished, dtype=torch.bool, device=input_ids.device)
@@ -2,13 +2,17 @@
 Модуль для работы со словарями терминов.
 """
 
-from typing import Dict, List
+from typing import Collection, List, Optional, Sequence
 from .entity import Entity
+from .automaton import AhoCorasickAutomaton, fold_case, select_leftmost_longest
 
 
 class Dictionary:
     """
     Класс для хранения и поиска терминов в тексте.
+
+    Поиск выполняется автоматом Ахо–Корасик, который строится лениво при первом
+    поиске после изменения набора терминов.
     """
 
     def __init__(self, entity_type: str):
@@ -19,8 +23,34 @@ class Dictionary:
             entity_type (str): Тип сущности, для которого создаётся словарь (например, PER).
         """
         self.entity_type: str = entity_type
-        self.terms: List[str] = []
-        self.index: Dict[str, List[str]] = {}
+        self.terms: Sequence[str] = []
+        self.version: int = 0
+        self._term_set: Collection[str] = set()
+        self._automaton: Optional[AhoCorasickAutomaton] = None
+
+    @classmethod
+    def from_compiled(
+        cls,
+        entity_type: str,
+        terms: Sequence[str],
+        automaton: AhoCorasickAutomaton
+    ) -> "Dictionary":
+        """
+        Создание словаря из готовой таблицы терминов и автомата.
+
+        Args:
+            entity_type (str): Тип сущности словаря.
+            terms (Sequence[str]): Отсортированная таблица терминов с быстрой проверкой вхождения.
+            automaton (AhoCorasickAutomaton): Автомат, построенный по этим терминам.
+
+        Returns:
+            Dictionary: Словарь, готовый к поиску.
+        """
+        dictionary = cls(entity_type)
+        dictionary.terms = terms
+        dictionary._term_set = terms
+        dictionary._automaton = automaton
+        return dictionary
 
     def add_term(self, term: str) -> None:
         """
@@ -32,48 +62,54 @@ class Dictionary:
         term = term.strip()
         if not term:
             return
-        if term in self.terms:
+        if term in self._term_set:
             return
 
+        if not isinstance(self.terms, list):
+            # Словарь загружен из скомпилированного файла: переходим к изменяемым структурам.
+            self.terms = list(self.terms)
+            self._term_set = set(self.terms)
         self.terms.append(term)
-        first = term[0].lower()
-        if first not in self.index:
-            self.index[first] = []
-        self.index[first].append(term)
+        self._term_set.add(term)
+        self._automaton = None
+        self.version += 1
+
+    @property
+    def automaton(self) -> AhoCorasickAutomaton:
+        """
+        Скомпилированный автомат по текущему набору терминов.
+
+        Returns:
+            AhoCorasickAutomaton: Автомат для поиска терминов.
+        """
+        if self._automaton is None:
+            self._automaton = AhoCorasickAutomaton.build(
+                (fold_case(term), None) for term in self.terms
+            )
+        return self._automaton
 
     def find_matches(self, text: str) -> List[Entity]:
         """
         Поиск всех вхождений сущностий в тексте.
 
+        Вхождения ищутся без учёта регистра по границам слов; из пересекающихся
+        выбирается самое левое, а из начинающихся в одной позиции — самое длинное.
+
         Args:
             text (str): Текст для анализа.
 
         Returns:
             list: Найденные сущности.
         """
-        if not text:
+        if not text or not self.terms:
             return []
 
-        matches: List[Entity] = []
-        text_lower = text.lower()
-        i = 0
-        while i < len(text):
-            char = text_lower[i]
-            if char in self.index:
-                for term in self.index[char]:
-                    term_len = len(term)
-                    if i + term_len <= len(text):
-                        fragment = text_lower[i:i + term_len]
-                        if fragment == term.lower():
-                            before_ok = i == 0 or not text_lower[i - 1].isalnum()
-                            after_ok = i + term_len == len(text) or not text_lower[i + term_len].isalnum()
-                            if before_ok and after_ok:
-                                original = text[i:i + term_len]
-                                matches.append(Entity(original, self.entity_type, i, i + term_len))
-                                i += term_len - 1
-                                break
-            i += 1
-        return matches
+        text_lower = fold_case(text)
+        candidates = ((start, end) for start, end, _ in self.automaton.iter_matches(text_lower))
+        return [
+            Entity(text[start:end], self.entity_type, start, end)
+            for start, end in select_leftmost_longest(text_lower, candidates)
+        ]
 
     def load_from_file(self, file_path: str) -> "Dictionary":
         """
@@ -2,59 +2,216 @@
 Модуль для управления словарями.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from .automaton import AhoCorasickAutomaton, fold_case, select_leftmost_longest
 from .dictionary import Dictionary
+from .dictionary_registry import DictionaryRegistry, get_dictionary_registry
+from .entity import Entity
 from ..config.configuration import ConfigurationProfile
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+IndexKey = Tuple[Tuple[str, int, int], ...]
+
+
+class CombinedDictionaryIndex:
+    """
+    Общий автомат для набора словарей.
+
+    Нагрузка каждого терминального узла — номера словарей, содержащих термин,
+    поэтому один проход по тексту даёт совпадения сразу для всех словарей.
+    """
+
+    def __init__(self, dictionaries: List[Tuple[str, Dictionary]]):
+        """
+        Построение общего автомата.
+
+        Args:
+            dictionaries (List[Tuple[str, Dictionary]]): Пары (имя, словарь) в порядке выдачи результатов.
+        """
+        self.names: List[str] = [name for name, _ in dictionaries]
+        self.entity_types: List[str] = [d.entity_type for _, d in dictionaries]
+        self.automaton = AhoCorasickAutomaton.build(
+            (fold_case(term), number)
+            for number, (_, dictionary) in enumerate(dictionaries)
+            for term in dictionary.terms
+        )
+        for node, numbers in self.automaton.payloads.items():
+            self.automaton.payloads[node] = tuple(sorted(set(numbers)))
+
+    def find_matches(self, text: str) -> List[Entity]:
+        """
+        Поиск совпадений всех словарей за один проход.
+
+        Для каждого словаря совпадения отбираются так же, как в Dictionary.find_matches.
+
+        Args:
+            text (str): Текст для анализа.
+
+        Returns:
+            List[Entity]: Найденные сущности, сгруппированные по словарям.
+        """
+        text_lower = fold_case(text)
+        candidates: List[List[Tuple[int, int]]] = [[] for _ in self.names]
+        payloads = self.automaton.payloads
+        for start, end, node in self.automaton.iter_matches(text_lower):
+            for number in payloads[node]:
+                candidates[number].append((start, end))
+
+        matches: List[Entity] = []
+        for number, spans in enumerate(candidates):
+            entity_type = self.entity_types[number]
+            for start, end in select_leftmost_longest(text_lower, spans):
+                matches.append(Entity(text[start:end], entity_type, start, end))
+        return matches
+
+
 class DictionaryManager:
     """
     Класс для управления несколькими словарями.
+
+    Словари загружаются через общий для процесса реестр, поэтому один и тот же
+    файл разделяется всеми менеджерами. Словари, загруженные для профиля,
+    хранятся в пространстве имён этого профиля: профили могут называть
+    одинаково разные файлы, и find_matches использует только словари
+    текущего профиля. Для каждого набора включённых словарей
+    лениво строится общий автомат, который кэшируется: профили с одинаковым
+    набором словарей используют один и тот же индекс.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, registry: Optional[DictionaryRegistry] = None) -> None:
         """
         Инициализация менеджера словарей.
+
+        Args:
+            registry (DictionaryRegistry, optional): Реестр словарей (по умолчанию общий для процесса).
         """
+        self.registry = registry or get_dictionary_registry()
         self.dictionaries: Dict[str, Dictionary] = {}
+        self.sources: Dict[str, str] = {}
+        self.profile_dictionaries: Dict[str, Dict[str, Dictionary]] = {}
+        self._indexes: Dict[IndexKey, CombinedDictionaryIndex] = {}
         logger.info("Менеджер словарей инициализирован")
 
-    def load_dictionary(self, name: str, file_path: str, entity_type: str) -> bool:
+    def load_dictionary(
+        self,
+        name: str,
+        file_path: str,
+        entity_type: str,
+        profile_id: Optional[str] = None
+    ) -> bool:
         """
-        Загрузка словаря из файла.
+        Загрузка словаря из файла через реестр.
+
+        Если рядом с файлом лежит скомпилированный словарь (.fvd), который новее
+        исходного, он отображается в память вместо разбора текстового файла.
 
         Args:
             name (str): Имя словаря.
             file_path (str): Путь к файлу.
             entity_type (str): Тип сущности, связанный со словарём.
+            profile_id (str, optional): Профиль, в пространство имён которого
+                загружается словарь; без него словарь попадает в общий набор.
 
         Returns:
             bool: True, если успешно, иначе False.
         """
         try:
-            dictionary = Dictionary(entity_type)
-            dictionary.load_from_file(file_path)
+            dictionary = self.registry.get(file_path, entity_type)
+            previous = self.sources.get(name)
+            if profile_id is None and previous is not None and previous != file_path:
+                logger.warning(f"Словарь '{name}' переопределён: {previous} -> {file_path}")
+            if profile_id is not None:
+                self.profile_dictionaries.setdefault(profile_id, {})[name] = dictionary
             self.dictionaries[name] = dictionary
+            self.sources[name] = file_path
+            self._prune_indexes()
             logger.info(f"Словарь '{name}' загружен из {file_path} (тип: {entity_type})")
             return True
         except Exception as e:
             logger.error(f"Ошибка при загрузке словаря '{name}' из {file_path}: {e}")
             return False
 
-    def get_dictionary(self, name: str) -> Optional[Dictionary]:
+    def get_dictionary(self, name: str, profile_id: Optional[str] = None) -> Optional[Dictionary]:
         """
         Получение словаря по имени.
 
         Args:
             name (str): Имя словаря.
+            profile_id (str, optional): Профиль, в пространстве имён которого ищется словарь.
 
         Returns:
             Dictionary | None: Объект словаря или None, если не найден.
         """
-        return self.dictionaries.get(name)
+        return self._scope(profile_id).get(name)
+
+    def _scope(self, profile_id: Optional[str]) -> Dict[str, Dictionary]:
+        """
+        Словари профиля или общий набор, если для профиля словари не загружались.
+
+        Args:
+            profile_id (str | None): Идентификатор профиля.
+
+        Returns:
+            Dict[str, Dictionary]: {имя словаря: словарь}.
+        """
+        if profile_id is not None and profile_id in self.profile_dictionaries:
+            return self.profile_dictionaries[profile_id]
+        return self.dictionaries
+
+    def _prune_indexes(self) -> None:
+        """
+        Удаление закэшированных индексов, построенных по устаревшим словарям.
+        """
+        scopes = [self.dictionaries, *self.profile_dictionaries.values()]
+        current = {(name, id(d), d.version) for scope in scopes for name, d in scope.items()}
+        self._indexes = {
+            key: index for key, index in self._indexes.items()
+            if all(item in current for item in key)
+        }
+
+    def _get_index(self, dictionaries: List[Tuple[str, Dictionary]]) -> CombinedDictionaryIndex:
+        """
+        Получение общего индекса для набора словарей.
+
+        Индекс перестраивается, если изменился состав набора, сам словарь
+        был перезагружен или в него добавлены термины.
+
+        Args:
+            dictionaries (List[Tuple[str, Dictionary]]): Пары (имя, словарь).
+
+        Returns:
+            CombinedDictionaryIndex: Общий индекс.
+        """
+        key: IndexKey = tuple((name, id(d), d.version) for name, d in dictionaries)
+        index = self._indexes.get(key)
+        if index is None:
+            self._prune_indexes()
+            index = CombinedDictionaryIndex(dictionaries)
+            self._indexes[key] = index
+            logger.info(
+                f"Построен общий индекс словарей {index.names} ({index.automaton.node_count} узлов)"
+            )
+        return index
+
+    def _scan(self, text: str, dictionaries: List[Tuple[str, Dictionary]]) -> List[Entity]:
+        """
+        Поиск совпадений набора словарей за один проход по тексту.
+
+        Args:
+            text (str): Текст для анализа.
+            dictionaries (List[Tuple[str, Dictionary]]): Пары (имя, словарь).
+
+        Returns:
+            List[Entity]: Найденные сущности.
+        """
+        if not dictionaries or not text:
+            return []
+        if len(dictionaries) == 1:
+            return dictionaries[0][1].find_matches(text)
+        return self._get_index(dictionaries).find_matches(text)
 
     def find_matches(self, text: str, profile: Optional[ConfigurationProfile]) -> List:
         """
@@ -67,44 +224,30 @@ class DictionaryManager:
         Returns:
             List[Entity]: Найденные сущности.
         """
-        matches = []
-
         if profile is None or not hasattr(profile, 'dictionary_settings'):
             logger.warning("Профиль не задан или не содержит настроек словарей")
-            for name, dictionary in self.dictionaries.items():
-                logger.debug(f"Поиск с использованием словаря '{name}' (без фильтрации)")
-                matches_from_dict = dictionary.find_matches(text)
-                for match in matches_from_dict:
-                    matches.append(match)
-            return matches
+            logger.debug(f"Поиск с использованием словарей {list(self.dictionaries)} (без фильтрации)")
+            return self._scan(text, list(self.dictionaries.items()))
 
+        scope = self._scope(getattr(profile, "profile_id", None))
+        enabled: List[Tuple[str, Dictionary]] = []
         for dict_name, settings in profile.dictionary_settings.items():
             if not settings.get("enabled", True):
                 continue
 
-            dictionary = self.dictionaries.get(dict_name)
+            dictionary = scope.get(dict_name)
             if dictionary is None:
                 logger.warning(f"Словарь '{dict_name}' не загружен")
                 continue
 
-            dict_matches = dictionary.find_matches(text)
-
-            if hasattr(profile, 'entity_types'):
-                filtered = []
-                for m in dict_matches:
-                    if m.entity_type in profile.entity_types:
-                        filtered.append(m)
-
-                if len(filtered) < len(dict_matches):
-                    logger.debug(
-                        f"Отфильтровано {len(dict_matches) - len(filtered)} сущностей из словаря '{dict_name}'"
-                    )
+            if hasattr(profile, 'entity_types') and dictionary.entity_type not in profile.entity_types:
+                logger.debug(
+                    f"Словарь '{dict_name}' пропущен: тип {dictionary.entity_type} не включён в профиле"
+                )
+                continue
 
-                for match in filtered:
-                    matches.append(match)
-            else:
-                for match in dict_matches:
-                    matches.append(match)
+            enabled.append((dict_name, dictionary))
 
+        matches = self._scan(text, enabled)
         logger.info(f"Обнаружено {len(matches)} сущностей с помощью словарей")
         return matches
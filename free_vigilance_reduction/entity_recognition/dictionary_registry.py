@@ -0,0 +1,117 @@
+"""
+Модуль с общим для процесса реестром загруженных словарей.
+
+Реестр гарантирует, что один и тот же файл словаря загружается в память один
+раз: все профили и менеджеры словарей получают общий экземпляр Dictionary.
+Экземпляр перечитывается, только если файл изменился (по времени модификации).
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from .compiled_dictionary import compiled_path_for, is_compiled_fresh, load_compiled
+from .dictionary import Dictionary
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+RegistryKey = Tuple[str, int, str]
+
+
+class DictionaryRegistry:
+    """
+    Потокобезопасный реестр словарей с ключом (путь, mtime, тип сущности).
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация пустого реестра.
+        """
+        self._entries: Dict[RegistryKey, Dictionary] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str, entity_type: str) -> Dictionary:
+        """
+        Получение словаря из реестра с загрузкой при необходимости.
+
+        Если рядом с файлом лежит скомпилированный словарь (.fvd), который новее
+        исходного, он отображается в память вместо разбора текстового файла.
+
+        Args:
+            file_path (str): Путь к текстовому словарю.
+            entity_type (str): Тип сущности словаря.
+
+        Returns:
+            Dictionary: Общий экземпляр словаря.
+
+        Raises:
+            FileNotFoundError: Если файл словаря не найден.
+        """
+        path = os.path.realpath(file_path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Файл словаря не найден: {file_path}")
+        key: RegistryKey = (path, os.stat(path).st_mtime_ns, entity_type)
+
+        with self._lock:
+            dictionary = self._entries.get(key)
+            if dictionary is not None:
+                return dictionary
+
+            stale = [k for k in self._entries if k[0] == path and k[2] == entity_type]
+            for k in stale:
+                del self._entries[k]
+
+            dictionary = self._load_compiled(path, entity_type)
+            if dictionary is None:
+                dictionary = Dictionary(entity_type).load_from_file(path)
+            self._entries[key] = dictionary
+            return dictionary
+
+    @staticmethod
+    def _load_compiled(file_path: str, entity_type: str) -> Optional[Dictionary]:
+        """
+        Загрузка актуального скомпилированного словаря, если он есть.
+
+        Args:
+            file_path (str): Путь к текстовому словарю.
+            entity_type (str): Тип сущности словаря.
+
+        Returns:
+            Dictionary | None: Словарь или None, если скомпилированной версии нет.
+        """
+        compiled_path = compiled_path_for(file_path)
+        if not is_compiled_fresh(file_path, compiled_path):
+            return None
+        try:
+            dictionary = load_compiled(compiled_path, entity_type)
+            logger.debug(f"Использован скомпилированный словарь {compiled_path}")
+            return dictionary
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось загрузить скомпилированный словарь {compiled_path}: {e}")
+            return None
+
+    def clear(self) -> None:
+        """
+        Очистка реестра.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_default_registry = DictionaryRegistry()
+
+
+def get_dictionary_registry() -> DictionaryRegistry:
+    """
+    Получение общего для процесса реестра словарей.
+
+    Returns:
+        DictionaryRegistry: Реестр по умолчанию.
+    """
+    return _default_registry
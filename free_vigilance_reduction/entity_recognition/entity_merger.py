@@ -0,0 +1,55 @@
+"""
+Модуль для объединения сущностей, найденных разными методами.
+"""
+
+from typing import Iterable, List
+
+from .entity import Entity
+
+
+def overlaps(a: Entity, b: Entity) -> bool:
+    """
+    Проверка перекрытия двух сущностей.
+
+    Args:
+        a (Entity), b (Entity)
+
+    Returns:
+        bool: True, если сущности перекрываются.
+    """
+    return not (a.end_pos <= b.start_pos or a.start_pos >= b.end_pos)
+
+
+def deduplicate_entities(entities: Iterable[Entity]) -> List[Entity]:
+    """
+    Удаление перекрывающихся и дублирующихся сущностей.
+
+    Приоритет отдается более длинным сущностям при совпадающих границах.
+
+    После сортировки по началу принятые сущности не пересекаются и идут по
+    возрастанию, поэтому новую сущность достаточно сравнить с принятой
+    сущностью с наибольшим концом: сортировка O(n log n) и один линейный проход.
+
+    Args:
+        entities (Iterable[Entity]): Сырые найденные сущности.
+
+    Returns:
+        List[Entity]: Фильтрованный список сущностей.
+    """
+    sorted_ents = sorted(
+        entities,
+        key=lambda e: (e.start_pos, -(e.end_pos - e.start_pos))
+    )
+    result: List[Entity] = []
+    max_end = None
+    max_end_start = None
+    for ent in sorted_ents:
+        if max_end is not None and ent.start_pos < max_end:
+            # Пустая сущность пересекается только с той, что строго её накрывает.
+            if ent.end_pos > ent.start_pos or max_end_start < ent.start_pos:
+                continue
+        result.append(ent)
+        if max_end is None or ent.end_pos > max_end:
+            max_end = ent.end_pos
+            max_end_start = ent.start_pos
+    return result
@@ -1,17 +1,20 @@
 """
 Модуль для распознавания сущностей с использованием регулярных выражений,
-словари и языковой модели.
+словари, NER spaCy и языковой модели.
 """
 
-import re
 import json
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from ..entity_recognition.chunk_prefilter import PrefilterStats
 from ..entity_recognition.entity import Entity
 from ..config.configuration import ConfigurationProfile
 from ..entity_recognition.dictionary_manager import DictionaryManager
+from ..entity_recognition.entity_merger import deduplicate_entities, overlaps
 from ..entity_recognition.language_model import LanguageModel
+from ..entity_recognition.regex_scanner import RegexScanner
+from ..entity_recognition.spacy_recognizer import SpacyRecognizer
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,9 +24,10 @@ class EntityRecognizer:
     """
     Класс для распознавания сущностей в тексте на основе заданного профиля.
 
-    Поддерживает три источника для обнаружения сущностей:
+    Поддерживает четыре источника для обнаружения сущностей:
       - регулярные выражения (regex)
       - пользовательские словари (dictionary)
+      - NER spaCy (spacy_ner)
       - языковую модель (LLM)
 
     Для каждого профиля выполняет последовательное применение включённых
@@ -40,7 +44,9 @@ class EntityRecognizer:
         """
         self.dictionary_manager = DictionaryManager()
         self.language_model = LanguageModel()
+        self.spacy_recognizer = SpacyRecognizer()
         self.regex_patterns = self._load_regex_patterns(regex_path)
+        self._regex_scanners: Dict[Tuple[str, ...], RegexScanner] = {}
 
     def _load_regex_patterns(self, path: str) -> dict:
         """
@@ -67,7 +73,8 @@ class EntityRecognizer:
     def detect_entities(
         self,
         text: str,
-        profile: ConfigurationProfile
+        profile: ConfigurationProfile,
+        prefilter_stats: Optional[PrefilterStats] = None
     ) -> List[Entity]:
         """
         Обнаружение сущностей в тексте согласно профилю.
@@ -75,29 +82,69 @@ class EntityRecognizer:
         Args:
             text (str): Исходный текст для анализа.
             profile (ConfigurationProfile): Профиль конфигурации.
+            prefilter_stats (PrefilterStats, optional): Статистика отбора чанков
+                этого вызова.
 
         Returns:
             List[Entity]: Список найденных сущностей без перекрытий.
         """
-        entities: List[Entity] = []
+        stats = None if prefilter_stats is None else [prefilter_stats]
+        return self.detect_entities_batch([text], profile, stats)[0]
+
+    def detect_entities_batch(
+        self,
+        texts: List[str],
+        profile: ConfigurationProfile,
+        prefilter_stats: Optional[List[PrefilterStats]] = None
+    ) -> List[List[Entity]]:
+        """
+        Обнаружение сущностей сразу в нескольких документах.
+
+        Словари и regex применяются к каждому документу отдельно, а spaCy NER
+        и языковая модель обрабатывают все документы одним вызовом
+        (nlp.pipe и общие пакеты генерации). Языковая модель запускается
+        последней: найденные словарями, regex и spaCy сущности используются её
+        предварительным отбором чанков (llm_settings["prefilter"]), а
+        статистика отбора документа добавляется в его элемент prefilter_stats.
+
+        Args:
+            texts (List[str]): Тексты документов.
+            profile (ConfigurationProfile): Профиль конфигурации.
+            prefilter_stats (List[PrefilterStats], optional): Для каждого
+                документа — статистика отбора чанков.
+
+        Returns:
+            List[List[Entity]]: Найденные сущности без перекрытий для каждого документа.
+        """
+        found: List[List[Entity]] = [[] for _ in texts]
 
         if profile.use_dictionary:
-            dict_entities = self.dictionary_manager.find_matches(text, profile)
-            logger.info(f"Найдено словарных сущностей: {len(dict_entities)}")
-            entities.extend(dict_entities)
+            for entities, text in zip(found, texts):
+                entities.extend(self.dictionary_manager.find_matches(text, profile))
+            logger.info(f"Найдено словарных сущностей: {sum(len(e) for e in found)}")
 
         if profile.use_regex:
-            regex_entities = self._apply_regex(text, profile)
-            logger.info(f"Найдено сущностей по regex: {len(regex_entities)}")
-            entities.extend(regex_entities)
+            regex_count = 0
+            for entities, text in zip(found, texts):
+                regex_entities = self._apply_regex(text, profile)
+                regex_count += len(regex_entities)
+                entities.extend(regex_entities)
+            logger.info(f"Найдено сущностей по regex: {regex_count}")
+
+        if profile.use_spacy_ner:
+            spacy_results = self.spacy_recognizer.find_entities_batch(texts, profile)
+            for entities, spacy_entities in zip(found, spacy_results):
+                entities.extend(spacy_entities)
+            logger.info(f"Найдено сущностей spaCy NER: {sum(len(e) for e in spacy_results)}")
 
         if profile.use_language_model:
-            llm_entities = self.language_model.search_entities(text, profile)
-            logger.info(f"Найдено сущностей LLM: {len(llm_entities)}")
-            entities.extend(llm_entities)
+            llm_results = self.language_model.search_entities_batch(texts, profile, found, prefilter_stats)
+            for entities, llm_entities in zip(found, llm_results):
+                entities.extend(llm_entities)
+            logger.info(f"Найдено сущностей LLM: {sum(len(e) for e in llm_results)}")
 
-        unique = self._deduplicate_entities(entities)
-        logger.info(f"Всего после дедупликации: {len(unique)}")
+        unique = [self._deduplicate_entities(entities) for entities in found]
+        logger.info(f"Всего после дедупликации: {sum(len(e) for e in unique)}")
         return unique
 
     def _apply_regex(
@@ -108,6 +155,8 @@ class EntityRecognizer:
         """
         Применение регулярных выражений для поиска сущностей.
 
+        Скомпилированные шаблоны кэшируются по набору типов сущностей профиля.
+
         Args:
             text (str): Текст для поиска.
             profile (ConfigurationProfile): Профиль с enabled_entity_types.
@@ -115,15 +164,12 @@ class EntityRecognizer:
         Returns:
             List[Entity]: Найденные сущности.
         """
-        found: List[Entity] = []
-        for etype in profile.entity_types:
-            pattern = self.regex_patterns.get(etype)
-            if not pattern:
-                continue
-            for m in re.finditer(pattern, text):
-                ent = Entity(m.group(), etype, m.start(), m.end())
-                found.append(ent)
-        return found
+        key = tuple(profile.entity_types)
+        scanner = self._regex_scanners.get(key)
+        if scanner is None:
+            scanner = RegexScanner(self.regex_patterns, key)
+            self._regex_scanners[key] = scanner
+        return scanner.find_matches(text)
 
     def _deduplicate_entities(
         self,
@@ -132,23 +178,13 @@ class EntityRecognizer:
         """
         Удаление перекрывающихся и дублирующихся сущностей.
 
-        Приоритет отдается более длинным сущностям при совпадающих границах.
-
         Args:
             entities (List[Entity]): Сырые найденные сущности.
 
         Returns:
             List[Entity]: Фильтрованный список сущностей.
         """
-        sorted_ents = sorted(
-            entities,
-            key=lambda e: (e.start_pos, -(e.end_pos - e.start_pos))
-        )
-        result: List[Entity] = []
-        for ent in sorted_ents:
-            if not any(self._overlaps(ent, ex) for ex in result):
-                result.append(ent)
-        return result
+        return deduplicate_entities(entities)
 
     @staticmethod
     def _overlaps(a: Entity, b: Entity) -> bool:
@@ -161,4 +197,4 @@ class EntityRecognizer:
         Returns:
             bool: True, если сущности перекрываются.
         """
-        return not (a.end_pos <= b.start_pos or a.start_pos >= b.end_pos)
+        return overlaps(a, b)
@@ -0,0 +1,91 @@
+"""
+Модуль нечеткого поиска строк, возвращённых моделью, в окне текста.
+
+Кандидаты — только фрагменты, начинающиеся и заканчивающиеся на границах
+слов: для строки из n слов рассматриваются последовательности из n - 1, n и
+n + 1 слов окна. Кандидаты, чья длина не позволяет достичь порога
+fuzz.ratio, отбрасываются заранее, а оставшиеся оцениваются против всех
+строк с тем же числом слов одним вызовом rapidfuzz.process.cdist.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .automaton import fold_case
+
+_WORD = re.compile(r"\w+")
+
+
+def fuzzy_locate(
+    queries: Sequence[str],
+    text: str,
+    start: int = 0,
+    end: int = -1,
+    threshold: float = 85
+) -> List[Optional[Tuple[int, int]]]:
+    """
+    Поиск наиболее похожего фрагмента текста для каждой строки.
+
+    Args:
+        queries (Sequence[str]): Искомые строки.
+        text (str): Исходный текст.
+        start (int): Начало окна поиска в символах.
+        end (int): Конец окна поиска в символах (-1 — до конца текста).
+        threshold (float): Минимальная оценка fuzz.ratio (0–100).
+
+    Returns:
+        List[Tuple[int, int] | None]: Для каждой строки — (начало, конец) лучшего
+            фрагмента (при равенстве оценок — самого левого) или None.
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process
+
+    if end < 0:
+        end = len(text)
+    found: List[Optional[Tuple[int, int]]] = [None] * len(queries)
+    bounds = [m.span() for m in _WORD.finditer(text, start, end)]
+    if not bounds or not queries or threshold <= 0:
+        return found
+    word_starts = np.fromiter((b[0] for b in bounds), dtype=np.int64, count=len(bounds))
+    word_ends = np.fromiter((b[1] for b in bounds), dtype=np.int64, count=len(bounds))
+    lowered = fold_case(text[start:end])
+
+    groups: Dict[int, List[int]] = {}
+    for q, query in enumerate(queries):
+        groups.setdefault(max(1, len(_WORD.findall(query))), []).append(q)
+
+    for n, members in groups.items():
+        span_starts: List[np.ndarray] = []
+        span_ends: List[np.ndarray] = []
+        for k in range(max(1, n - 1), n + 2):
+            if k <= len(bounds):
+                span_starts.append(word_starts[: len(bounds) - k + 1])
+                span_ends.append(word_ends[k - 1:])
+        if not span_starts:
+            continue
+        starts = np.concatenate(span_starts)
+        ends = np.concatenate(span_ends)
+
+        # ratio = 2·M / (|a| + |b|) не достигает порога, если длины слишком различаются.
+        lengths = ends - starts
+        query_lengths = [len(queries[q]) for q in members]
+        keep = (lengths * (200 - threshold) >= min(query_lengths) * threshold) & (
+            lengths * threshold <= max(query_lengths) * (200 - threshold)
+        )
+        starts, ends = starts[keep], ends[keep]
+        if not len(starts):
+            continue
+        order = np.lexsort((ends, starts))
+        starts, ends = starts[order] - start, ends[order] - start
+
+        scores = process.cdist(
+            [fold_case(queries[q]) for q in members],
+            [lowered[a:b] for a, b in zip(starts.tolist(), ends.tolist())],
+            scorer=fuzz.ratio,
+            score_cutoff=threshold,
+        )
+        for q, row in zip(members, scores):
+            best = int(np.argmax(row))
+            if row[best] > 0:
+                found[q] = (int(starts[best]) + start, int(ends[best]) + start)
+    return found
@@ -4,22 +4,37 @@
 Загрузка модели происходит ТОЛЬКО из локального пути, указанного в llm_settings
 JSON-профиля. Текст разбивается на токен-чанки в соответствии с настройками
 max_input_tokens и chunk_overlap_tokens.
+
+Генерация выполняется бэкендом вывода (см. пакет backends), выбранным в
+llm_settings["backend"]. torch, transformers и spaCy импортируются только при
+первом обращении к модели, поэтому профили без языковой модели не платят за
+их загрузку.
 """
 
 import re
-from typing import List, Dict, Any
-from pathlib import Path
-
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import spacy
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
+from ..entity_recognition.automaton import AhoCorasickAutomaton
+from ..entity_recognition.chunk_prefilter import ChunkPrefilter, PrefilterStats
 from ..entity_recognition.entity import Entity
+from ..entity_recognition.entity_merger import deduplicate_entities
+from ..entity_recognition.fuzzy_matcher import fuzzy_locate
+from ..entity_recognition.lemma_index import LemmaIndex
+from ..entity_recognition.llm_cache import LLMResultCache
+from ..entity_recognition.backends import InferenceBackend, create_backend, is_deterministic
+from ..entity_recognition.model_registry import ModelRegistry
 from ..config.configuration import ConfigurationProfile
 from ..utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from spacy.language import Language
+
 logger = get_logger(__name__)
 
+# Компоненты spaCy, не нужные для лемматизации.
+_LEMMA_DISABLED_PIPES = ("parser", "ner", "senter")
+
 
 class LanguageModel:
     """
@@ -27,124 +42,174 @@ class LanguageModel:
 
     Методы:
       - search_entities(text, profile)
+      - search_entities_batch(texts, profile)
       - _initialize(llm_settings)
       - _chunk_text(text, max_tokens, overlap)
       - _generate_prompt(text, profile)
     """
 
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelRegistry] = None):
         """
         Конструктор инициализирует атрибуты без загрузки модели.
-        spaCy загружается сразу.
-        """
-        self.tokenizer: AutoTokenizer = None
-        self.model: AutoModelForCausalLM = None
-        self.device: torch.device = None
-        self.initialized: bool = False
-        try:
-            self.nlp = spacy.load("ru_core_news_sm")
-        except OSError:
-            logger.warning("spaCy модель 'ru_core_news_sm' не найдена, попробуйте установить её через 'python -m spacy download ru_core_news_sm'")
-            self.nlp = None
+        spaCy загружается при первом обращении к nlp.
+
+        Args:
+            registry (ModelRegistry, optional): Реестр моделей бэкенда transformers
+                (по умолчанию общий для процесса).
+        """
+        self.registry = registry
+        self.backend: Optional[InferenceBackend] = None
+        self.generated_tokens: int = 0
+        self._result_caches: Dict[str, LLMResultCache] = {}
+        self._nlp: Optional["Language"] = None
+        self._nlp_loaded: bool = False
+        # Бэкенд общий для вызовов: загрузка, генерация и возврат модели
+        # выполняются под блокировкой, чтобы параллельные задания с разными
+        # профилями не подменяли модель друг другу.
+        self._lock = threading.Lock()
+
+    @property
+    def nlp(self) -> Optional["Language"]:
+        """
+        Конвейер spaCy для лемматизации, загружаемый при первом обращении.
+
+        Returns:
+            Language | None: Конвейер spaCy или None, если модель не установлена.
+        """
+        if not self._nlp_loaded:
+            self._nlp_loaded = True
+            try:
+                import spacy
+                self._nlp = spacy.load("ru_core_news_sm")
+            except (ImportError, OSError):
+                logger.warning("spaCy модель 'ru_core_news_sm' не найдена, попробуйте установить её через 'python -m spacy download ru_core_news_sm'")
+                self._nlp = None
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, value: Optional["Language"]) -> None:
+        self._nlp = value
+        self._nlp_loaded = True
 
     def _initialize(self, llm_settings: Dict[str, Any]) -> None:
         """
-        Локальная загрузка модели и токенизатора по настройкам.
+        Выбор бэкенда вывода и подготовка модели по настройкам.
+
+        Бэкенд задаётся llm_settings["backend"] ("transformers" по умолчанию,
+        "onnx", "fake" или "server" — клиент локального сервера вывода). Бэкенд transformers берёт модель из реестра
+        моделей, который загружает её при первом обращении и отдаёт уже
+        загруженную при совпадении (model_path, device, dtype). Модель остаётся
+        занятой (не выгружается реестром) до вызова _release_model.
 
         Args:
             llm_settings (dict): Словарь с настройками:
                 - model_path (str): локальный путь к модели
+                - backend (str): 'transformers', 'onnx', 'fake' или 'server'
                 - device (str): 'cpu' или 'cuda'/'cuda:0'
+                - dtype (str): 'float32', 'bfloat16', 'float16' или 'int8'
+                - quantized_model_path (str)
+                - onnx_model_path (str)
                 - max_input_tokens (int)
                 - chunk_overlap_tokens (int)
                 - max_new_tokens (int)
                 - temperature (float)
+                - batch_size (int)
+                - cache_prompt_prefix (bool)
+                - constrained_decoding (bool)
+                - deterministic (bool)
+                - result_cache_path (str)
+                - result_cache_max_bytes (int)
+
+        Raises:
+            ValueError: Если путь к модели не указан или не существует.
         """
-        model_path = llm_settings.get("model_path", "")
-        if not model_path:
-            msg = "LLM: не указан путь 'model_path' в настройках."
-            logger.error(msg)
-            raise ValueError(msg)
-
-        path = Path(model_path)
-        if not path.exists():
-            msg = f"LLM: указанный путь до модели не найден: '{model_path}'"
-            logger.error(msg)
-            raise ValueError(msg)
-
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            model_path,
-            use_fast=True,
-            local_files_only=True
-        )
-        self.model = AutoModelForCausalLM.from_pretrained(
-            model_path,
-            local_files_only=True
-        )
-
-        device_cfg = llm_settings.get("device", "cpu").lower()
-        if device_cfg.startswith("cuda") and torch.cuda.is_available():
-            gpu_device = device_cfg if device_cfg.startswith("cuda:") else "cuda:0"
-            self.device = torch.device(gpu_device)
-        else:
-            self.device = torch.device("cpu")
-        self.model.to(self.device)
+        name = llm_settings.get("backend", "transformers")
+        if self.backend is None or self.backend.name != name:
+            self.backend = create_backend(name, self.registry)
+        self.backend.load(llm_settings)
 
-        logger.info(f"LLM загружена на устройство {self.device} из {model_path}")
-        self.initialized = True
+    def _release_model(self) -> None:
+        """
+        Возврат модели реестру: после этого она может быть выгружена.
+        """
+        if self.backend is not None:
+            self.backend.release()
 
     def _chunk_text(
         self,
         text: str,
         max_tokens: int,
         overlap: int
-    ) -> List[str]:
+    ) -> List[Tuple[int, str]]:
         """
         Разбивка текста на фрагменты по токенам с указанным перекрытием.
 
+        Границы чанков берутся из границ токенов, которые возвращает бэкенд,
+        поэтому чанк — это срез исходного текста, и известна его позиция в
+        документе.
+
         Args:
             text (str): Исходный текст.
             max_tokens (int): Максимальное число токенов в чанке.
             overlap (int): Число токенов пересечения между чанками.
 
         Returns:
-            List[str]: Список текстовых чанков.
+            List[Tuple[int, str]]: Пары (начало чанка в тексте, текст чанка).
         """
-        token_ids = self.tokenizer.encode(text, add_special_tokens=False)
+        token_ids, offsets = self.backend.tokenize(text)
         total = len(token_ids)
         if total <= max_tokens:
-            return [text]
+            return [(0, text)]
 
-        chunks: List[str] = []
+        chunks: List[Tuple[int, str]] = []
         start = 0
         while start < total:
-            end = start + max_tokens
-            slice_ids = token_ids[start:end]
-            chunk_text = self.tokenizer.decode(
-                slice_ids,
-                clean_up_tokenization_spaces=True
-            )
-            chunks.append(chunk_text)
+            end = min(start + max_tokens, total)
+            char_start = offsets[start][0]
+            char_end = offsets[end - 1][1] if end < total else len(text)
+            chunks.append((char_start, text[char_start:char_end]))
             if end >= total:
                 break
             start = end - overlap
         return chunks
 
-    def _generate_prompt(
-        self,
-        text: str,
-        profile: ConfigurationProfile
-    ) -> str:
+    def _prompt_prefix(self, profile: ConfigurationProfile) -> str:
         """
-        Формирование промпта для генерации в формате chunk tagging.
+        Статическая часть промпта профиля: инструкция и список тегов.
+
+        Вид инструкции зависит от llm_settings["output_mode"]: в режиме "echo"
+        модель возвращает весь текст с тегами, в режиме "spans" — только
+        список строк вида "ТИП: фрагмент".
 
         Args:
-            text (str): Текст для анализа.
             profile (ConfigurationProfile): Настройки профиля.
 
         Returns:
-            str: Готовый промпт для подачи в модель.
+            str: Начало промпта, одинаковое для всех чанков профиля.
         """
+        if self._output_mode(profile) == "spans":
+            lines = [
+                "Ты — алгоритм для анонимизации текста. Выпиши из текста персональные данные.",
+                "",
+                "Типы сущностей, которые нужно найти:"
+            ]
+            for etype in profile.entity_types:
+                desc = profile.custom_entity_prompts.get(etype, f"Тип {etype}")
+                lines.append(f"- {etype} — {desc}")
+            lines += [
+                "",
+                "ВАЖНО:",
+                "- Выписывай точные подстроки из текста, не изменяя форму слов.",
+                "- Одна строка — одна сущность в формате ТИП: фрагмент.",
+                "- Не объединяй разные сущности. Одна сущность - одно или всего пару слов, не больше!",
+                "- Каждую сущность выпиши один раз, даже если она встречается в тексте несколько раз.",
+                "- Не объясняй свои действия. Если сущностей нет, ничего не пиши.",
+                "",
+                "Текст для анализа:",
+                "",
+            ]
+            return "\n".join(lines) + "\n"
+
         lines = [
             "Ты — алгоритм для анонимизации текста. Обозначь в тексте персональные данные, обернув их в соответствующие теги.",
             "",
@@ -163,103 +228,519 @@ class LanguageModel:
             "",
             "Текст для анализа:",
             "",
-            text,
-            "",
-            "Размеченный текст (верни текст для анализа целиком, но с размеченными сущностями):"
         ]
-        return "\n".join(lines)
+        return "\n".join(lines) + "\n"
+
+    def _prompt_suffix(self, text: str, profile: ConfigurationProfile) -> str:
+        """
+        Часть промпта, зависящая от чанка.
+
+        Args:
+            text (str): Текст для анализа.
+            profile (ConfigurationProfile): Настройки профиля.
+
+        Returns:
+            str: Окончание промпта.
+        """
+        if self._output_mode(profile) == "spans":
+            request = "Найденные сущности (по одной на строке, в формате ТИП: фрагмент):"
+        else:
+            request = "Размеченный текст (верни текст для анализа целиком, но с размеченными сущностями):"
+        return "\n".join([text, "", request])
+
+    @staticmethod
+    def _output_mode(profile: ConfigurationProfile) -> str:
+        """
+        Формат ответа модели для профиля.
+
+        Args:
+            profile (ConfigurationProfile): Настройки профиля.
+
+        Returns:
+            str: "echo" или "spans".
+        """
+        return profile.llm_settings.get("output_mode", "echo")
+
+    def _generate_prompt(
+        self,
+        text: str,
+        profile: ConfigurationProfile
+    ) -> str:
+        """
+        Формирование промпта для генерации в формате chunk tagging.
+
+        Args:
+            text (str): Текст для анализа.
+            profile (ConfigurationProfile): Настройки профиля.
+
+        Returns:
+            str: Готовый промпт для подачи в модель.
+        """
+        return self._prompt_prefix(profile) + self._prompt_suffix(text, profile)
+
+    def _generate(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        profile_id: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Генерация ответов модели для списка промптов через бэкенд.
+
+        Args:
+            prompts (List[str]): Промпты (суффиксы после prefix).
+            llm_settings (dict): Настройки генерации.
+            prefix (str): Общее начало всех промптов.
+            profile_id (str): Идентификатор профиля для ключа кэша префикса.
+            sources (List[str], optional): Исходные чанки, соответствующие промптам.
+            entity_types (List[str], optional): Типы сущностей для тегов.
+
+        Returns:
+            List[str]: Ответ модели для каждого промпта.
+        """
+        if not prompts:
+            return []
+        before = self.backend.generated_tokens
+        outputs = self.backend.generate_batch(prompts, llm_settings, prefix, profile_id, sources, entity_types)
+        self.generated_tokens += self.backend.generated_tokens - before
+        return outputs
+
+    @staticmethod
+    def _is_deterministic(llm_settings: Dict[str, Any]) -> bool:
+        """
+        Проверка, что генерация детерминирована (жадная).
+
+        Args:
+            llm_settings (dict): Настройки генерации.
+
+        Returns:
+            bool: True при deterministic=True или нулевой температуре.
+        """
+        return is_deterministic(llm_settings)
+
+    def _get_result_cache(self, llm_settings: Dict[str, Any]) -> Optional[LLMResultCache]:
+        """
+        Получение постоянного кэша результатов по чанкам.
+
+        Кэш используется только при детерминированной генерации и заданном
+        result_cache_path.
+
+        Args:
+            llm_settings (dict): Настройки генерации.
+
+        Returns:
+            LLMResultCache | None: Кэш или None, если он не используется.
+        """
+        path = llm_settings.get("result_cache_path")
+        if not path or not self._is_deterministic(llm_settings):
+            return None
+        cache = self._result_caches.get(path)
+        if cache is None:
+            cache = LLMResultCache(path, llm_settings.get("result_cache_max_bytes", 64 * 1024 * 1024))
+            self._result_caches[path] = cache
+        return cache
+
+    @staticmethod
+    def _parse_tags(tagged: str, entity_types: List[str]) -> List[Tuple[str, str]]:
+        """
+        Извлечение тегов из размеченного ответа модели.
+
+        Пробелы по краям текста внутри тега отбрасываются: у токенизаторов
+        Metaspace/SentencePiece пробел входит в токен слова ("▁Иван"), поэтому
+        при ограниченном декодировании тег открывается перед ним. Позиции
+        сущностей затем ищутся в документе по очищенному тексту.
+
+        Args:
+            tagged (str): Ответ модели с тегами.
+            entity_types (List[str]): Типы сущностей профиля.
+
+        Returns:
+            List[Tuple[str, str]]: Пары (тип сущности, текст).
+        """
+        tags: List[Tuple[str, str]] = []
+        for et in entity_types:
+            pattern = re.compile(f"<{et}>(.+?)</{et}>")
+            for m in pattern.finditer(tagged):
+                ent_text = m.group(1).strip()
+                if ent_text:
+                    tags.append((et, ent_text))
+        return tags
+
+    @staticmethod
+    def _parse_spans(output: str, entity_types: List[str]) -> List[Tuple[str, str]]:
+        """
+        Разбор ответа в компактном формате: по строке "ТИП: фрагмент" на сущность.
+
+        Маркеры списков и кавычки вокруг фрагмента отбрасываются, строки с
+        неизвестным типом пропускаются. Фрагменты затем ищутся в тексте так же,
+        как теги в режиме "echo".
+
+        Args:
+            output (str): Ответ модели.
+            entity_types (List[str]): Типы сущностей профиля.
+
+        Returns:
+            List[Tuple[str, str]]: Пары (тип сущности, текст) без повторов.
+        """
+        if not entity_types:
+            return []
+        types = "|".join(re.escape(et) for et in entity_types)
+        line_re = re.compile(rf"^\s*(?:[-*•]\s*|\d+[.)]\s*)?({types})\s*:\s*(.+?)\s*$")
+        tags: List[Tuple[str, str]] = []
+        for line in output.splitlines():
+            m = line_re.match(line)
+            if not m:
+                continue
+            span = m.group(2).strip("\"'«»“” ")
+            if span and (m.group(1), span) not in tags:
+                tags.append((m.group(1), span))
+        return tags
+
+    def _locate_entities(
+        self,
+        chunk_results: List[Tuple[Optional[Tuple[int, int]], List[Tuple[str, str]]]],
+        text: str,
+        profile: ConfigurationProfile
+    ) -> List[Entity]:
+        """
+        Поиск в документе сущностей, отмеченных моделью во всех его чанках.
+
+        Все различные строки из ответов модели собираются в один автомат
+        Ахо–Корасик, и документ сканируется один раз: находятся все вхождения,
+        в том числе повторы в чанках, где модель их не отметила. Строки, не
+        найденные точно, передаются в _locate_fallback в пределах своего чанка;
+        для них документ один раз разбирается spaCy и строится индекс лемм.
+
+        Args:
+            chunk_results (List[Tuple[Tuple[int, int] | None, List[Tuple[str, str]]]]):
+                Для каждого чанка — его границы в тексте (None — весь текст) и
+                пары (тип сущности, текст) из ответа модели.
+            text (str): Исходный текст документа.
+            profile (ConfigurationProfile): Конфигурационный профиль.
+
+        Returns:
+            List[Entity]: Найденные сущности с позициями в исходном тексте.
+        """
+        patterns: Dict[Tuple[str, str], None] = {}
+        for _, tags in chunk_results:
+            for et, ent_text in tags:
+                if ent_text:
+                    patterns[(ent_text, et)] = None
+        if not patterns:
+            return []
+
+        automaton = AhoCorasickAutomaton.build(patterns)
+        entities: List[Entity] = []
+        found = set()
+        for start, end, node in automaton.iter_matches(text):
+            ent_text = text[start:end]
+            for et in automaton.payloads[node]:
+                entities.append(Entity(ent_text, et, start, end))
+                found.add((ent_text, et))
+
+        residue = 0
+        lemma_index: Optional[LemmaIndex] = None
+        for window, tags in chunk_results:
+            missing = [(et, ent_text) for et, ent_text in tags if ent_text and (ent_text, et) not in found]
+            if missing:
+                residue += len(missing)
+                if lemma_index is None and self.nlp:
+                    lemma_index = LemmaIndex.from_doc(self._parse_for_lemmas(text))
+                entities.extend(self._locate_fallback(missing, text, profile, window, lemma_index))
+        logger.debug(f"LLM: строк в автомате {len(patterns)}, без точного совпадения {residue}")
+        return entities
+
+    def _parse_for_lemmas(self, text: str) -> Any:
+        """
+        Разбор текста spaCy только компонентами, нужными для лемматизации.
+
+        Args:
+            text (str): Текст для разбора.
+
+        Returns:
+            Doc: Разобранный текст.
+        """
+        disable = [name for name in getattr(self.nlp, "pipe_names", ()) if name in _LEMMA_DISABLED_PIPES]
+        if disable:
+            return self.nlp(text, disable=disable)
+        return self.nlp(text)
+
+    def _locate_fallback(
+        self,
+        tags: List[Tuple[str, str]],
+        text: str,
+        profile: ConfigurationProfile,
+        window: Optional[Tuple[int, int]] = None,
+        lemma_index: Optional[LemmaIndex] = None
+    ) -> List[Entity]:
+        """
+        Поиск сущностей, не найденных точным совпадением.
+
+        Поиск ведётся только внутри окна чанка, из ответа на который взяты
+        теги, поэтому его стоимость пропорциональна длине чанка, а не документа.
+        Сначала последовательность лемм сущности ищется в индексе лемм
+        документа, затем оставшиеся строки ищутся нечетко среди фрагментов
+        окна, ограниченных границами слов (fuzzy_locate).
+
+        Args:
+            tags (List[Tuple[str, str]]): Пары (тип сущности, текст) из ответа модели.
+            text (str): Исходный текст документа.
+            profile (ConfigurationProfile): Конфигурационный профиль.
+            window (Tuple[int, int], optional): Границы чанка в тексте (по умолчанию весь текст).
+            lemma_index (LemmaIndex, optional): Индекс лемм документа.
+
+        Returns:
+            List[Entity]: Найденные сущности с позициями в исходном тексте.
+        """
+        fuzzy_thr = profile.llm_settings.get("fuzzy_threshold", 85)
+        win_start, win_end = window if window is not None else (0, len(text))
+        entities: List[Entity] = []
+        unmatched: List[Tuple[str, str]] = []
+
+        for et, ent_text in tags:
+            matched = False
+            if lemma_index is not None:
+                lemmas = [tok.lemma_.lower() for tok in self._parse_for_lemmas(ent_text) if tok.text.strip()]
+                for start, end in lemma_index.find(lemmas, win_start, win_end):
+                    entities.append(Entity(text[start:end], et, start, end))
+                    matched = True
+            if not matched:
+                unmatched.append((et, ent_text))
+
+        if unmatched:
+            spans = fuzzy_locate([ent_text for _, ent_text in unmatched], text, win_start, win_end, fuzzy_thr)
+            for (et, _), span in zip(unmatched, spans):
+                if span is not None:
+                    entities.append(Entity(text[span[0]:span[1]], et, *span))
+
+        return entities
 
     def search_entities(
-        self, text: str, profile: ConfigurationProfile
+        self,
+        text: str,
+        profile: ConfigurationProfile,
+        known: Optional[List[Entity]] = None,
+        prefilter_stats: Optional[PrefilterStats] = None
     ) -> List[Entity]:
         """
         Поиск сущностей в тексте с использованием LLM и chunk tagging.
 
         Разбивает текст на чанки, формирует для каждого промпт через _generate_prompt,
         генерирует размеченный текст, затем извлекает теги и возвращает объекты Entity.
-        При невозможности точного совпадения применяется spaCy для лемматизации и
-        нечеткий поиск через RapidFuzz.
 
         Args:
             text (str): Исходный текст для анализа.
             profile (ConfigurationProfile): Конфигурационный профиль.
+            known (List[Entity], optional): Сущности, уже найденные другими методами
+                (учитываются при предварительном отборе чанков).
+            prefilter_stats (PrefilterStats, optional): Статистика вызова, в
+                которую добавляются результаты предварительного отбора.
 
         Returns:
             List[Entity]: Список найденных сущностей.
         """
-        from rapidfuzz import fuzz
-        from .entity_recognizer import EntityRecognizer
+        stats = None if prefilter_stats is None else [prefilter_stats]
+        return self.search_entities_batch([text], profile, [known or []], stats)[0]
+
+    def search_entities_batch(
+        self,
+        texts: List[str],
+        profile: ConfigurationProfile,
+        known: Optional[List[List[Entity]]] = None,
+        prefilter_stats: Optional[List[PrefilterStats]] = None
+    ) -> List[List[Entity]]:
+        """
+        Поиск сущностей сразу в нескольких документах.
+
+        Чанки всех документов генерируются общими пакетами размера
+        llm_settings["batch_size"], после чего ответ каждого чанка
+        сопоставляется с его документом.
 
+        При включённом llm_settings["prefilter"] чанки без признаков сущностей
+        (см. ChunkPrefilter) в модель не передаются; статистика отбора каждого
+        документа добавляется в его элемент prefilter_stats. Объекты статистики
+        создаёт вызывающий: модель общая для параллельных заданий, поэтому
+        статистика не хранится в её атрибутах.
+
+        Args:
+            texts (List[str]): Тексты документов.
+            profile (ConfigurationProfile): Конфигурационный профиль.
+            known (List[List[Entity]], optional): Для каждого документа — сущности,
+                уже найденные другими методами.
+            prefilter_stats (List[PrefilterStats], optional): Для каждого документа —
+                статистика, в которую добавляются результаты предварительного отбора.
+
+        Returns:
+            List[List[Entity]]: Список найденных сущностей для каждого документа.
+        """
         if not profile.use_language_model:
-            return []
+            return [[] for _ in texts]
 
-        if not self.initialized:
+        with self._lock:
             self._initialize(profile.llm_settings)
+            try:
+                return self._search_loaded(texts, profile, known, prefilter_stats)
+            finally:
+                self._release_model()
+
+    def _search_loaded(
+        self,
+        texts: List[str],
+        profile: ConfigurationProfile,
+        known: Optional[List[List[Entity]]] = None,
+        prefilter_stats: Optional[List[PrefilterStats]] = None
+    ) -> List[List[Entity]]:
+        """
+        Поиск сущностей в документах загруженной моделью (см. search_entities_batch).
 
-        max_tok   = profile.llm_settings.get("max_input_tokens", 512)
-        overlap   = profile.llm_settings.get("chunk_overlap_tokens", 0)
-        max_new   = profile.llm_settings.get("max_new_tokens", 256)
-        temp      = profile.llm_settings.get("temperature", 0.5)
-        fuzzy_thr = profile.llm_settings.get("fuzzy_threshold", 85) 
+        Args:
+            texts (List[str]): Тексты документов.
+            profile (ConfigurationProfile): Конфигурационный профиль.
+            known (List[List[Entity]], optional): Уже найденные сущности документов.
+            prefilter_stats (List[PrefilterStats], optional): Статистика отбора документов.
 
-        entities: List[Entity] = []
+        Returns:
+            List[List[Entity]]: Список найденных сущностей для каждого документа.
+        """
+        max_tok = profile.llm_settings.get("max_input_tokens", 512)
+        overlap = profile.llm_settings.get("chunk_overlap_tokens", 0)
+
+        prefilter = ChunkPrefilter.from_settings(profile.llm_settings)
+        doc_stats: List[PrefilterStats] = []
+
+        chunk_docs: List[int] = []
+        chunk_starts: List[int] = []
+        chunks: List[str] = []
+        chunk_tags: List[Optional[List[Tuple[str, str]]]] = []
+        audited: List[bool] = []
+        for doc_index, text in enumerate(texts):
+            doc_chunks = self._chunk_text(text, max_tok, overlap)
+            if prefilter is not None:
+                keep, audit, selected = prefilter.select(doc_chunks, known[doc_index] if known else ())
+                doc_stats.append(selected)
+            else:
+                keep, audit = [True] * len(doc_chunks), [False] * len(doc_chunks)
+            for (start, chunk), passed, sampled in zip(doc_chunks, keep, audit):
+                chunk_docs.append(doc_index)
+                chunk_starts.append(start)
+                chunks.append(chunk)
+                chunk_tags.append(None if passed else [])
+                audited.append(sampled)
+
+        prefix = self._prompt_prefix(profile)
+        requested = chunk_tags.count(None)
+        cache = self._get_result_cache(profile.llm_settings)
+        keys: List[str] = []
+        if cache is not None:
+            template = prefix + self._prompt_suffix("", profile)
+            backend = profile.llm_settings.get("backend", "transformers")
+            generation = {
+                "backend": backend,
+                "server_backend": (
+                    profile.llm_settings.get("server_backend", "transformers") if backend == "server" else None
+                ),
+                "max_new_tokens": profile.llm_settings.get("max_new_tokens", 256),
+                "greedy": True,
+                "constrained_decoding": bool(profile.llm_settings.get("constrained_decoding", False)),
+                "precision": list(ModelRegistry.make_key(profile.llm_settings)[1:]),
+            }
+            for k, chunk in enumerate(chunks):
+                if chunk_tags[k] is not None:
+                    keys.append("")
+                    continue
+                keys.append(LLMResultCache.make_key(
+                    profile.llm_settings.get("model_path", ""),
+                    template,
+                    profile.entity_types,
+                    chunk,
+                    generation
+                ))
+                chunk_tags[k] = cache.get(keys[k])
+
+        pending = [k for k, tags in enumerate(chunk_tags) if tags is None]
+        outputs = self._generate(
+            [self._prompt_suffix(chunks[k], profile) for k in pending],
+            profile.llm_settings,
+            prefix=prefix,
+            profile_id=profile.profile_id,
+            sources=[chunks[k] for k in pending],
+            entity_types=profile.entity_types
+        )
+        for k, tagged in zip(pending, outputs):
+            if self._output_mode(profile) == "spans":
+                chunk_tags[k] = self._parse_spans(tagged, profile.entity_types)
+            else:
+                chunk_tags[k] = self._parse_tags(tagged, profile.entity_types)
+            if cache is not None:
+                cache.put(keys[k], chunk_tags[k])
+
+        if cache is not None:
+            logger.info(f"Кэш LLM: из кэша {requested - len(pending)} из {requested} чанков, {cache.stats()}")
+
+        if prefilter is not None:
+            for k in range(len(chunks)):
+                counted = self._count_new_tags(k, chunk_docs, chunk_starts, chunks, chunk_tags)
+                if audited[k]:
+                    doc_stats[chunk_docs[k]].audited_tags += counted
+                else:
+                    doc_stats[chunk_docs[k]].generated_tags += counted
+            stats = PrefilterStats()
+            for doc_index, selected in enumerate(doc_stats):
+                stats.merge(selected)
+                if prefilter_stats is not None:
+                    prefilter_stats[doc_index].merge(selected)
+            logger.info(
+                f"LLM: предварительный отбор пропустил {stats.skipped} из {stats.chunks} чанков, "
+                f"оценка потери полноты: {stats.estimated_recall_loss}"
+            )
+
+        doc_results: List[List[Tuple[Optional[Tuple[int, int]], List[Tuple[str, str]]]]] = [[] for _ in texts]
+        for doc_index, start, chunk, tags in zip(chunk_docs, chunk_starts, chunks, chunk_tags):
+            doc_results[doc_index].append(((start, start + len(chunk)), tags))
+
+        return [
+            deduplicate_entities(self._locate_entities(results, text, profile))
+            for results, text in zip(doc_results, texts)
+        ]
+
+    @staticmethod
+    def _count_new_tags(
+        k: int,
+        chunk_docs: List[int],
+        chunk_starts: List[int],
+        chunks: List[str],
+        chunk_tags: List[List[Tuple[str, str]]]
+    ) -> int:
+        """
+        Число тегов модели в чанке без повторов из перекрытия с предыдущим чанком.
 
-        for chunk in self._chunk_text(text, max_tok, overlap):
-            prompt = self._generate_prompt(chunk, profile)
-            print(f"LLM prompt:\n{prompt}")
-            inputs = self.tokenizer(prompt, return_tensors="pt")
-            input_ids = inputs["input_ids"].to(self.device)
-            attn_mask = inputs.get("attention_mask")
-            if attn_mask is not None:
-                attn_mask = attn_mask.to(self.device)
-
-            with torch.no_grad():
-                out_ids = self.model.generate(
-                    input_ids=input_ids,
-                    attention_mask=attn_mask,
-                    max_new_tokens=max_new,
-                    temperature=temp,
-                    do_sample=True
-                )
-            tagged = self.tokenizer.decode(out_ids[0], skip_special_tokens=True).strip()
-            print(f"LLM raw output:\n{tagged}")
-
-            for et in profile.entity_types:
-                pattern = re.compile(f"<{et}>(.+?)</{et}>")
-                for m in pattern.finditer(tagged):
-                    ent_text = m.group(1)
-                    matched = False
-
-                    for mm in re.finditer(re.escape(ent_text), text):
-                        entities.append(Entity(ent_text, et, *mm.span()))
-                        matched = True
-
-                    if not matched and self.nlp:
-                        ent_doc = self.nlp(ent_text)
-                        if ent_doc:
-                            lemma = ent_doc[0].lemma_
-                            for tok in self.nlp(text):
-                                if tok.lemma_ == lemma:
-                                    entities.append(
-                                        Entity(tok.text, et, tok.idx, tok.idx + len(tok.text))
-                                    )
-                                    matched = True
-                                    break
-
-                    if not matched:
-                        L0 = len(ent_text)
-                        delta = max(1, int(0.2 * L0))
-                        for L in (L0 - delta, L0 + delta):
-                            if L < 1:
-                                continue
-                            for i in range(0, len(text) - L + 1):
-                                candidate = text[i : i + L]
-                                score = fuzz.ratio(ent_text.lower(), candidate.lower())
-                                if score >= fuzzy_thr:
-                                    entities.append(Entity(candidate, et, i, i + len(candidate)))
-                                    matched = True
-                                    break
-                            if matched:
-                                break
-
-        return EntityRecognizer()._deduplicate_entities(entities)
+        Считаются только теги из ответа модели для этого чанка (без вхождений,
+        найденных затем сканированием документа). Тег не считается, если модель
+        отметила ту же строку в предыдущем чанке документа и строка находится
+        в перекрытии чанков (chunk_overlap_tokens > 0).
+
+        Args:
+            k (int): Номер чанка.
+            chunk_docs (List[int]): Номер документа для каждого чанка.
+            chunk_starts (List[int]): Смещение каждого чанка в документе.
+            chunks (List[str]): Тексты чанков.
+            chunk_tags (List[List[Tuple[str, str]]]): Пары (тип, текст) для каждого чанка.
+
+        Returns:
+            int: Число тегов.
+        """
+        tags = chunk_tags[k]
+        if k == 0 or chunk_docs[k - 1] != chunk_docs[k]:
+            return len(tags)
+        previous = set(chunk_tags[k - 1])
+        overlap_end = chunk_starts[k - 1] + len(chunks[k - 1]) - chunk_starts[k]
+        counted = 0
+        for tag in tags:
+            pos = chunks[k].find(tag[1])
+            if tag in previous and 0 <= pos < overlap_end:
+                continue
+            counted += 1
+        return counted
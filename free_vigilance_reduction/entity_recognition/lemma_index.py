@@ -0,0 +1,94 @@
+"""
+Модуль индекса лемм документа для поиска сущностей по нормальной форме.
+
+Документ разбирается spaCy один раз, после чего для каждой леммы хранится
+список номеров токенов, где она встречается. Поиск последовательности лемм
+сводится к обращению к словарю по первой лемме и проверке следующих токенов.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+class LemmaIndex:
+    """
+    Индекс «лемма → номера токенов» с позициями токенов в исходном тексте.
+    """
+
+    def __init__(self, tokens: Iterable[Tuple[str, int, int]]):
+        """
+        Построение индекса.
+
+        Args:
+            tokens (Iterable[Tuple[str, int, int]]): Тройки (лемма, начало, конец)
+                токенов в порядке следования в тексте.
+        """
+        self.lemmas: List[str] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.positions: Dict[str, List[int]] = {}
+        for lemma, start, end in tokens:
+            self.positions.setdefault(lemma, []).append(len(self.lemmas))
+            self.lemmas.append(lemma)
+            self.starts.append(start)
+            self.ends.append(end)
+
+    @classmethod
+    def from_doc(cls, doc: Iterable[Any]) -> "LemmaIndex":
+        """
+        Построение индекса по разобранному документу spaCy.
+
+        Пробельные токены пропускаются, леммы приводятся к нижнему регистру.
+
+        Args:
+            doc (Iterable[Any]): Токены с атрибутами text, idx и lemma_.
+
+        Returns:
+            LemmaIndex: Индекс документа.
+        """
+        return cls(
+            (tok.lemma_.lower(), tok.idx, tok.idx + len(tok.text))
+            for tok in doc
+            if tok.text.strip()
+        )
+
+    def __len__(self) -> int:
+        return len(self.lemmas)
+
+    def find(
+        self,
+        lemmas: Sequence[str],
+        start: int = 0,
+        end: int = -1
+    ) -> List[Tuple[int, int]]:
+        """
+        Поиск последовательности лемм в заданном диапазоне текста.
+
+        Args:
+            lemmas (Sequence[str]): Леммы подряд идущих токенов.
+            start (int): Начало диапазона поиска в символах.
+            end (int): Конец диапазона поиска в символах (-1 — до конца текста).
+
+        Returns:
+            List[Tuple[int, int]]: Пары (начало, конец) найденных вхождений в символах.
+        """
+        if not lemmas:
+            return []
+        candidates = self.positions.get(lemmas[0])
+        if not candidates:
+            return []
+        if end < 0:
+            end = self.ends[-1]
+
+        n = len(lemmas)
+        first = bisect_left(self.starts, start)
+        found: List[Tuple[int, int]] = []
+        for i in candidates[bisect_left(candidates, first):]:
+            if self.starts[i] >= end:
+                break
+            last = i + n - 1
+            if last >= len(self.lemmas) or self.ends[last] > end:
+                continue
+            if all(self.lemmas[i + k] == lemmas[k] for k in range(1, n)):
+                found.append((self.starts[i], self.ends[last]))
+        return found
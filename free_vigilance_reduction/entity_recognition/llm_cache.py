@@ -0,0 +1,202 @@
+"""
+Модуль для постоянного кэша результатов LLM по чанкам.
+
+Кэш хранится в одном файле SQLite. Ключ — хэш всего, что влияет на ответ
+модели: путь к модели, шаблон промпта, типы сущностей, текст чанка и
+настройки генерации. Значение — список извлечённых из ответа тегов
+(тип сущности, текст). Кэш имеет смысл только для детерминированной
+(жадной) генерации, поэтому LanguageModel обращается к нему лишь в этом режиме.
+
+При превышении заданного размера вытесняются записи, к которым дольше всего
+не обращались. Суммарный размер ведётся счётчиком, а не пересчитывается по
+таблице при каждой записи; с таблицей он сверяется раз в RESYNC_EVERY
+записей, на случай если тот же файл пишет другой процесс.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+Tag = Tuple[str, str]
+
+# Число записей, после которого счётчик размера сверяется с таблицей.
+RESYNC_EVERY = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunk_results (
+    key TEXT PRIMARY KEY,
+    tags TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunk_results_last_access ON chunk_results (last_access);
+"""
+
+
+class LLMResultCache:
+    """
+    Кэш списков тегов, извлечённых LLM из чанков, в файле SQLite.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Открытие (или создание) кэша.
+
+        Args:
+            path (str): Путь к файлу базы SQLite.
+            max_bytes (int): Максимальный суммарный размер записей в байтах.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._total = self._sum_sizes()
+        self._puts = 0
+
+    @staticmethod
+    def make_key(
+        model_path: str,
+        prompt_template: str,
+        entity_types: Sequence[str],
+        chunk: str,
+        generation_settings: Dict[str, Any]
+    ) -> str:
+        """
+        Вычисление ключа кэша.
+
+        Args:
+            model_path (str): Путь к модели.
+            prompt_template (str): Шаблон промпта без текста чанка.
+            entity_types (Sequence[str]): Типы сущностей профиля.
+            chunk (str): Текст чанка.
+            generation_settings (dict): Параметры генерации, влияющие на ответ.
+
+        Returns:
+            str: Хэш SHA-256 в шестнадцатеричном виде.
+        """
+        payload = json.dumps(
+            [model_path, prompt_template, list(entity_types), chunk, generation_settings],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Tag]]:
+        """
+        Получение списка тегов по ключу.
+
+        Args:
+            key (str): Ключ кэша.
+
+        Returns:
+            List[Tuple[str, str]] | None: Теги или None при промахе.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tags FROM chunk_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE chunk_results SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return [(etype, text) for etype, text in json.loads(row[0])]
+
+    def put(self, key: str, tags: List[Tag]) -> None:
+        """
+        Сохранение списка тегов с вытеснением старых записей при переполнении.
+
+        Args:
+            key (str): Ключ кэша.
+            tags (List[Tuple[str, str]]): Теги (тип сущности, текст).
+        """
+        value = json.dumps(tags, ensure_ascii=False)
+        size = len(key) + len(value.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM chunk_results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunk_results (key, tags, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._total += size - (row[0] if row else 0)
+            self._puts += 1
+            if self._puts % RESYNC_EVERY == 0:
+                self._total = self._sum_sizes()
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _sum_sizes(self) -> int:
+        """
+        Точный суммарный размер записей по таблице.
+
+        Returns:
+            int: Размер в байтах.
+        """
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM chunk_results").fetchone()[0]
+
+    def _evict(self) -> None:
+        """
+        Удаление давно не использованных записей, пока размер кэша превышает лимит.
+
+        Записи выбираются небольшими порциями по индексу last_access.
+        """
+        evicted = 0
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM chunk_results ORDER BY last_access LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM chunk_results WHERE key = ?", (key,))
+                self._total -= size
+                evicted += 1
+        logger.debug(f"Кэш LLM {self.path}: вытеснено записей {evicted}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Статистика кэша.
+
+        Returns:
+            Dict[str, int]: Попадания, промахи, число записей и их суммарный размер.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunk_results"
+            ).fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "size_bytes": size}
+
+    def clear(self) -> None:
+        """
+        Удаление всех записей и сброс счётчиков.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_results")
+            self._conn.commit()
+            self._total = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """
+        Закрытие соединения с базой.
+        """
+        with self._lock:
+            self._conn.close()
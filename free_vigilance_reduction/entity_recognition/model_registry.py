@@ -0,0 +1,504 @@
+"""
+Модуль общего для процесса реестра загруженных языковых моделей.
+
+Модели хранятся по ключу (model_path, device, dtype) и загружаются лениво при
+первом обращении профиля. Реестр следит за суммарным объёмом весов: если
+новая модель не помещается в бюджет памяти, выгружаются модели, которые
+дольше всего не использовались и сейчас никем не заняты.
+
+Веса читаются из safetensors через отображение в память с
+low_cpu_mem_usage, поэтому при загрузке не создаётся промежуточная полная
+копия модели. Для CPU доступны веса bfloat16 и динамическое int8-квантование
+линейных слоёв (dtype="int8"), результат которого можно сохранить на диск.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import torch
+    from transformers import PreTrainedModel, PreTrainedTokenizerBase
+
+logger = get_logger(__name__)
+
+ModelKey = Tuple[str, str, str]
+
+
+class LoadedModel:
+    """
+    Загруженная модель с токенизатором и сведениями о её использовании.
+
+    Модель с ключом None не принадлежит реестру (например, подставлена в
+    тестах) и никогда не выгружается.
+    """
+
+    def __init__(
+        self,
+        key: Optional[ModelKey] = None,
+        tokenizer: Optional["PreTrainedTokenizerBase"] = None,
+        model: Optional["PreTrainedModel"] = None,
+        device: Optional["torch.device"] = None,
+        size_bytes: int = 0,
+        load_seconds: float = 0.0
+    ):
+        """
+        Args:
+            key (Tuple[str, str, str] | None): Ключ (model_path, device, dtype).
+            tokenizer: Токенизатор.
+            model: Модель.
+            device (torch.device): Устройство модели.
+            size_bytes (int): Объём параметров и буферов модели в байтах.
+            load_seconds (float): Время загрузки в секундах.
+        """
+        self.key = key
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def resident(self) -> bool:
+        """
+        Находится ли модель в памяти.
+
+        Returns:
+            bool: False после выгрузки.
+        """
+        return self.model is not None
+
+    def unload(self) -> None:
+        """
+        Освобождение ссылок на модель и токенизатор.
+        """
+        self.model = None
+        self.tokenizer = None
+
+
+class ModelRegistry:
+    """
+    Реестр моделей с LRU-выгрузкой в пределах бюджета памяти.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        loader: Optional[Callable[[ModelKey, Dict[str, Any]], "LoadedModel"]] = None
+    ):
+        """
+        Args:
+            max_bytes (int | None): Бюджет памяти на веса всех моделей в байтах
+                (None — без ограничения).
+            loader (Callable, optional): Функция загрузки (ключ, настройки) -> LoadedModel
+                (по умолчанию — модель transformers).
+        """
+        self.max_bytes = max_bytes
+        self._loader = loader or self._load
+        self._models: "OrderedDict[ModelKey, LoadedModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Блокировки загрузки по ключам: модель загружается вне общей
+        # блокировки, и ждут только вызовы с тем же ключом.
+        self._loading: Dict[ModelKey, threading.Lock] = {}
+
+    @staticmethod
+    def make_key(llm_settings: Dict[str, Any]) -> ModelKey:
+        """
+        Ключ модели по настройкам профиля.
+
+        Устройство cuda без доступного GPU приводится к cpu, чтобы такие
+        профили разделяли одну модель. int8 (динамическое квантование
+        линейных слоёв) всегда работает на cpu, а bfloat16 на процессоре без
+        инструкций bf16 заменяется на float32.
+
+        Args:
+            llm_settings (dict): Настройки LLM профиля.
+
+        Returns:
+            Tuple[str, str, str]: (model_path, device, dtype).
+        """
+        device = llm_settings.get("device", "cpu").lower()
+        if device.startswith("cuda"):
+            import torch
+
+            if torch.cuda.is_available():
+                device = device if device.startswith("cuda:") else "cuda:0"
+            else:
+                device = "cpu"
+        else:
+            device = "cpu"
+        dtype = llm_settings.get("dtype", "float32")
+        if dtype == "int8" and device != "cpu":
+            logger.warning("LLM: динамическое int8-квантование доступно только на CPU, модель будет загружена на cpu")
+            device = "cpu"
+        if dtype == "bfloat16" and device == "cpu" and not _cpu_supports_bf16():
+            logger.warning("LLM: процессор не поддерживает bf16, модель будет загружена в float32")
+            dtype = "float32"
+        return str(llm_settings.get("model_path", "")), device, dtype
+
+    @property
+    def resident_bytes(self) -> int:
+        """
+        Суммарный объём загруженных моделей.
+
+        Returns:
+            int: Байты.
+        """
+        with self._lock:
+            return sum(m.size_bytes for m in self._models.values())
+
+    def acquire(self, llm_settings: Dict[str, Any]) -> LoadedModel:
+        """
+        Получение модели для работы с загрузкой при необходимости.
+
+        Модель помечается занятой до вызова release и не выгружается.
+        Загрузка выполняется вне общей блокировки реестра: пока модель
+        загружается, другие модели выдаются и освобождаются без ожидания, а
+        вызовы с тем же ключом ждут окончания загрузки.
+
+        Args:
+            llm_settings (dict): Настройки LLM профиля.
+
+        Returns:
+            LoadedModel: Загруженная модель.
+
+        Raises:
+            ValueError: Если путь к модели не указан или не существует.
+        """
+        key = self.make_key(llm_settings)
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is not None:
+                return self._checkout(key, loaded)
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                loaded = self._models.get(key)
+                if loaded is not None:
+                    return self._checkout(key, loaded)
+                self._evict(self._estimate_size(key[0]))
+            loaded = self._loader(key, llm_settings)
+            with self._lock:
+                self._models[key] = loaded
+                return self._checkout(key, loaded)
+
+    def _checkout(self, key: ModelKey, loaded: LoadedModel) -> LoadedModel:
+        """
+        Отметка модели занятой; вызывается под блокировкой реестра.
+        """
+        self._models.move_to_end(key)
+        loaded.in_use += 1
+        loaded.last_used = time.monotonic()
+        # Фактический размер может превышать оценку по файлам весов.
+        self._evict(0)
+        return loaded
+
+    def release(self, loaded: LoadedModel) -> None:
+        """
+        Снятие отметки об использовании модели.
+
+        Args:
+            loaded (LoadedModel): Модель, полученная через acquire.
+        """
+        with self._lock:
+            loaded.in_use = max(0, loaded.in_use - 1)
+            loaded.last_used = time.monotonic()
+            self._evict(0)
+
+    def unload(self, key: ModelKey) -> bool:
+        """
+        Принудительная выгрузка незанятой модели.
+
+        Args:
+            key (Tuple[str, str, str]): Ключ модели.
+
+        Returns:
+            bool: True, если модель была выгружена.
+        """
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is None or loaded.in_use:
+                return False
+            self._unload(key)
+            return True
+
+    def clear(self) -> None:
+        """
+        Выгрузка всех незанятых моделей.
+        """
+        with self._lock:
+            for key in [k for k, m in self._models.items() if not m.in_use]:
+                self._unload(key)
+
+    def residency(self) -> List[Dict[str, Any]]:
+        """
+        Отчёт о загруженных моделях в порядке от давно не использованных к недавним.
+
+        Returns:
+            List[Dict[str, Any]]: Для каждой модели путь, устройство, тип весов,
+                объём, время загрузки, число пользователей и время простоя.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "model_path": key[0],
+                    "device": key[1],
+                    "dtype": key[2],
+                    "size_bytes": m.size_bytes,
+                    "load_seconds": round(m.load_seconds, 3),
+                    "in_use": m.in_use,
+                    "idle_seconds": round(now - m.last_used, 3),
+                }
+                for key, m in self._models.items()
+            ]
+
+    def _evict(self, incoming: int) -> None:
+        """
+        Выгрузка давно не использованных незанятых моделей, пока загруженные
+        модели и новая модель размера incoming не помещаются в бюджет.
+        """
+        if self.max_bytes is None:
+            return
+        total = sum(m.size_bytes for m in self._models.values())
+        for key in list(self._models):
+            if total + incoming <= self.max_bytes:
+                return
+            loaded = self._models[key]
+            if loaded.in_use:
+                continue
+            total -= loaded.size_bytes
+            self._unload(key)
+        if total + incoming > self.max_bytes:
+            logger.warning(
+                f"LLM: бюджет памяти {self.max_bytes} байт превышен ({total + incoming}), "
+                "все загруженные модели заняты"
+            )
+
+    def _unload(self, key: ModelKey) -> None:
+        loaded = self._models.pop(key)
+        loaded.unload()
+        logger.info(f"LLM выгружена: {key[0]} ({key[1]}, {key[2]}), освобождено {loaded.size_bytes} байт")
+
+    @staticmethod
+    def _estimate_size(model_path: str) -> int:
+        """
+        Оценка объёма модели до загрузки по размеру файлов весов.
+        """
+        path = Path(model_path)
+        if not path.is_dir():
+            return 0
+        files = list(path.glob("*.safetensors")) or list(path.glob("*.bin"))
+        return sum(f.stat().st_size for f in files)
+
+    @staticmethod
+    def _load(key: ModelKey, llm_settings: Dict[str, Any]) -> LoadedModel:
+        """
+        Загрузка модели и токенизатора с диска.
+        """
+        model_path, device, dtype = key
+        if not model_path:
+            msg = "LLM: не указан путь 'model_path' в настройках."
+            logger.error(msg)
+            raise ValueError(msg)
+        if not Path(model_path).exists():
+            msg = f"LLM: указанный путь до модели не найден: '{model_path}'"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        import torch
+        from transformers import AutoTokenizer
+
+        started = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            use_fast=True,
+            local_files_only=True
+        )
+        if dtype == "int8":
+            model = _load_int8(model_path, llm_settings.get("quantized_model_path"))
+        else:
+            model = _load_pretrained(model_path, getattr(torch, dtype))
+        # Для пакетной генерации decoder-only модели дополняются слева.
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        torch_device = torch.device(device)
+        model.to(torch_device)
+        size = model_size_bytes(model)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"LLM загружена на устройство {torch_device} из {model_path} "
+            f"({dtype}, {size} байт, {elapsed:.2f} с)"
+        )
+        return LoadedModel(key, tokenizer, model, torch_device, size, elapsed)
+
+
+def _cpu_supports_bf16() -> bool:
+    """
+    Есть ли у процессора инструкции bf16 (AVX512-BF16 или AMX).
+    """
+    import torch
+
+    for check in ("_is_avx512_bf16_supported", "_is_amx_tile_supported"):
+        supported = getattr(torch.cpu, check, None)
+        if supported is not None and supported():
+            return True
+    return False
+
+
+def _load_pretrained(model_path: str, dtype: "torch.dtype") -> "PreTrainedModel":
+    """
+    Загрузка весов из safetensors через отображение в память.
+    """
+    from transformers import AutoModelForCausalLM
+
+    return AutoModelForCausalLM.from_pretrained(
+        model_path,
+        local_files_only=True,
+        low_cpu_mem_usage=True,
+        dtype=dtype,
+    )
+
+
+def _quantize_dynamic(model: "PreTrainedModel") -> "PreTrainedModel":
+    """
+    Динамическое int8-квантование линейных слоёв модели.
+    """
+    import warnings
+
+    import torch
+
+    with warnings.catch_warnings():
+        # Модуль torch.ao.quantization помечен устаревшим, но остаётся штатным
+        # способом динамического квантования без дополнительных зависимостей.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.filterwarnings("ignore", message="torch.quantize_per_tensor")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _quantized_skeleton(model_path: str) -> "PreTrainedModel":
+    """
+    Квантованная модель той же архитектуры без загрузки исходных весов.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    try:
+        from transformers.initialization import no_init_weights
+    except ImportError:
+        from transformers.modeling_utils import no_init_weights
+
+    config = AutoConfig.from_pretrained(model_path, local_files_only=True)
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config, dtype=torch.float32)
+    return _quantize_dynamic(model)
+
+
+def _load_int8(model_path: str, quantized_path: Optional[str] = None) -> "PreTrainedModel":
+    """
+    Загрузка модели с динамическим int8-квантованием линейных слоёв.
+
+    Если указан quantized_path, файл новее весов модели и получен квантованием
+    той же модели (путь к исходной модели хранится в файле), из него читаются
+    квантованные веса: структура модели строится по её конфигурации и
+    квантуется заново, а веса загружаются в неё. Иначе модель квантуется и, при
+    указанном пути, её веса сохраняются туда для следующих загрузок. Файл
+    читается с torch.load(weights_only=True) и не может исполнить код, даже
+    если путь к нему задан через API профилей.
+
+    Args:
+        model_path (str): Путь к исходной модели.
+        quantized_path (str, optional): Файл с сохранёнными квантованными весами.
+
+    Returns:
+        PreTrainedModel: Квантованная модель.
+    """
+    import pickle
+    import warnings
+
+    import torch
+
+    source = os.path.realpath(model_path)
+    if quantized_path and Path(quantized_path).is_file():
+        weights_mtime = max((f.stat().st_mtime for f in Path(model_path).iterdir()), default=0.0)
+        if Path(quantized_path).stat().st_mtime >= weights_mtime:
+            try:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", message="TypedStorage is deprecated")
+                    saved = torch.load(quantized_path, weights_only=True)
+            except (pickle.UnpicklingError, RuntimeError) as e:
+                logger.warning(f"LLM: {quantized_path} не является файлом квантованных весов ({e}), квантование заново")
+                saved = None
+            if isinstance(saved, dict) and saved.get("source") == source:
+                logger.info(f"LLM: квантованные веса читаются из {quantized_path}")
+                model = _quantized_skeleton(model_path)
+                model.load_state_dict(saved["state_dict"])
+                return model.eval()
+            if saved is not None:
+                logger.info(f"LLM: {quantized_path} получен из другой модели, квантование заново")
+        else:
+            logger.info(f"LLM: сохранённая квантованная модель {quantized_path} старше весов, квантование заново")
+
+    model = _quantize_dynamic(_load_pretrained(model_path, torch.float32))
+    if quantized_path:
+        Path(quantized_path).parent.mkdir(parents=True, exist_ok=True)
+        torch.save({"source": source, "state_dict": model.state_dict()}, quantized_path)
+        logger.info(f"LLM: квантованные веса сохранены в {quantized_path}")
+    return model
+
+
+def model_size_bytes(model: Any) -> int:
+    """
+    Объём тензоров модели, включая упакованные веса квантованных слоёв.
+
+    Args:
+        model: Модель torch.
+
+    Returns:
+        int: Байты (общие тензоры учитываются один раз).
+    """
+    seen = set()
+    total = 0
+    stack = list(model.state_dict().values())
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (tuple, list)):
+            stack.extend(value)
+            continue
+        if not hasattr(value, "element_size"):
+            continue
+        try:
+            ident = value.data_ptr()
+        except RuntimeError:
+            ident = id(value)
+        if ident in seen:
+            continue
+        seen.add(ident)
+        total += value.numel() * value.element_size()
+    return total
+
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    """
+    Общий для процесса реестр моделей.
+
+    Бюджет памяти задаётся переменной окружения FVR_LLM_MEMORY_BUDGET_MB
+    (по умолчанию не ограничен).
+
+    Returns:
+        ModelRegistry: Реестр.
+    """
+    budget_mb = os.getenv("FVR_LLM_MEMORY_BUDGET_MB")
+    return ModelRegistry(int(budget_mb) * 1024 * 1024 if budget_mb else None)
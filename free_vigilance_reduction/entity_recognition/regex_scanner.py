@@ -0,0 +1,60 @@
+"""
+Модуль для поиска сущностей по набору регулярных выражений профиля.
+
+Шаблоны компилируются модулем regex один раз на набор типов сущностей и
+переиспользуются для всех документов. Каждый шаблон ищется отдельным
+проходом: regex быстро пропускает позиции, где шаблон не может начаться,
+тогда как общая альтернатива из всех шаблонов заставляет движок перебирать
+все ветви в каждой позиции текста и на практике работает медленнее.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import regex
+
+from .entity import Entity
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RegexScanner:
+    """
+    Скомпилированный набор регулярных выражений для списка типов сущностей.
+    """
+
+    def __init__(self, patterns: Dict[str, str], entity_types: Iterable[str]):
+        """
+        Компиляция шаблонов для заданных типов сущностей.
+
+        Типы без шаблона пропускаются, некорректные шаблоны логируются и пропускаются.
+
+        Args:
+            patterns (Dict[str, str]): Словарь {entity_type: regex_pattern}.
+            entity_types (Iterable[str]): Типы сущностей в порядке выдачи результатов.
+        """
+        self.compiled: List[Tuple[str, "regex.Pattern"]] = []
+        for etype in entity_types:
+            pattern = patterns.get(etype)
+            if not pattern:
+                continue
+            try:
+                self.compiled.append((etype, regex.compile(pattern)))
+            except regex.error as exc:
+                logger.error(f"Некорректный шаблон regex для '{etype}': {exc}")
+
+    def find_matches(self, text: str) -> List[Entity]:
+        """
+        Поиск сущностей всеми шаблонами.
+
+        Args:
+            text (str): Текст для поиска.
+
+        Returns:
+            List[Entity]: Найденные сущности, сгруппированные по типам.
+        """
+        found: List[Entity] = []
+        for etype, compiled in self.compiled:
+            for m in compiled.finditer(text):
+                found.append(Entity(m.group(), etype, m.start(), m.end()))
+        return found
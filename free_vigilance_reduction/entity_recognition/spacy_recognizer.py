@@ -0,0 +1,166 @@
+"""
+Модуль поиска сущностей моделью NER spaCy.
+
+Метки spaCy (для ru_core_news_sm — PER, LOC, ORG) переводятся в типы
+сущностей профиля по spacy_settings["label_map"]. В конвейере остаются
+только компоненты, нужные для NER, а тексты обрабатываются пакетами через
+nlp.pipe(batch_size, n_process). Длинные документы делятся по строкам на
+сегменты не длиннее segment_chars символов, поэтому и один документ
+обрабатывается пакетно, а ограничение nlp.max_length не достигается.
+"""
+
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .entity import Entity
+from ..config.configuration import ConfigurationProfile
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+logger = get_logger(__name__)
+
+# Компоненты конвейера, нужные для NER.
+_NER_PIPES = ("tok2vec", "transformer", "ner", "entity_ruler")
+
+_LINE_END = re.compile(r"\n")
+
+
+def _load_ner_pipeline(model: str) -> Optional["Language"]:
+    """
+    Загрузка конвейера spaCy с включёнными только компонентами NER.
+
+    Args:
+        model (str): Имя или путь модели spaCy.
+
+    Returns:
+        Language | None: Конвейер или None, если модель не установлена.
+    """
+    try:
+        import spacy
+        nlp = spacy.load(model)
+    except (ImportError, OSError):
+        logger.warning(f"spaCy модель '{model}' не найдена, попробуйте установить её через 'python -m spacy download {model}'")
+        return None
+    nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in _NER_PIPES])
+    logger.info(f"spaCy NER: загружена модель '{model}', компоненты {nlp.pipe_names}")
+    return nlp
+
+
+def split_segments(text: str, max_chars: int) -> List[Tuple[int, str]]:
+    """
+    Деление текста на сегменты по границам строк.
+
+    Строка длиннее max_chars образует отдельный сегмент.
+
+    Args:
+        text (str): Текст.
+        max_chars (int): Желаемая максимальная длина сегмента.
+
+    Returns:
+        List[Tuple[int, str]]: Пары (смещение сегмента в тексте, сегмент).
+    """
+    segments: List[Tuple[int, str]] = []
+    start = 0
+    cut = 0
+    for m in _LINE_END.finditer(text):
+        if m.end() - start > max_chars and cut > start:
+            segments.append((start, text[start:cut]))
+            start = cut
+        cut = m.end()
+    if len(text) - start > max_chars and start < cut < len(text):
+        segments.append((start, text[start:cut]))
+        start = cut
+    if start < len(text):
+        segments.append((start, text[start:]))
+    return segments
+
+
+class SpacyRecognizer:
+    """
+    Поиск сущностей моделью NER spaCy с пакетной обработкой.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Optional["Language"]]] = None):
+        """
+        Args:
+            loader (Callable, optional): Функция имя модели -> конвейер
+                (по умолчанию spacy.load с отключением компонентов, не нужных для NER).
+        """
+        self._loader = loader or _load_ner_pipeline
+        self._pipelines: Dict[str, Optional["Language"]] = {}
+        self._lock = threading.Lock()
+
+    def get_pipeline(self, model: str) -> Optional["Language"]:
+        """
+        Конвейер для модели, загружаемый при первом обращении.
+
+        Загрузка выполняется под блокировкой, поэтому параллельные задания
+        не загружают одну модель дважды.
+
+        Args:
+            model (str): Имя или путь модели spaCy.
+
+        Returns:
+            Language | None: Конвейер или None, если модель не установлена.
+        """
+        with self._lock:
+            if model not in self._pipelines:
+                self._pipelines[model] = self._loader(model)
+            return self._pipelines[model]
+
+    def find_entities(self, text: str, profile: ConfigurationProfile) -> List[Entity]:
+        """
+        Поиск сущностей в тексте.
+
+        Args:
+            text (str): Текст для поиска.
+            profile (ConfigurationProfile): Профиль со spacy_settings.
+
+        Returns:
+            List[Entity]: Найденные сущности типов профиля.
+        """
+        return self.find_entities_batch([text], profile)[0]
+
+    def find_entities_batch(self, texts: List[str], profile: ConfigurationProfile) -> List[List[Entity]]:
+        """
+        Поиск сущностей сразу в нескольких документах одним вызовом nlp.pipe.
+
+        Args:
+            texts (List[str]): Тексты документов.
+            profile (ConfigurationProfile): Профиль со spacy_settings:
+                model, label_map, batch_size, n_process, segment_chars.
+
+        Returns:
+            List[List[Entity]]: Найденные сущности для каждого документа.
+        """
+        results: List[List[Entity]] = [[] for _ in texts]
+        if not profile.use_spacy_ner:
+            return results
+        settings = profile.spacy_settings
+        label_map = {
+            label: etype
+            for label, etype in settings["label_map"].items()
+            if etype in profile.entity_types
+        }
+        nlp = self.get_pipeline(settings["model"])
+        if nlp is None or not label_map:
+            return results
+
+        owners: List[Tuple[int, int]] = []
+        segments: List[str] = []
+        for doc_index, text in enumerate(texts):
+            for offset, segment in split_segments(text, settings["segment_chars"]):
+                owners.append((doc_index, offset))
+                segments.append(segment)
+
+        docs = nlp.pipe(segments, batch_size=settings["batch_size"], n_process=settings["n_process"])
+        for (doc_index, offset), doc in zip(owners, docs):
+            for ent in doc.ents:
+                etype = label_map.get(ent.label_)
+                if etype is not None:
+                    start = offset + ent.start_char
+                    results[doc_index].append(Entity(ent.text, etype, start, offset + ent.end_char))
+        return results
@@ -0,0 +1,403 @@
+"""
+Локальный сервер вывода языковой модели с динамическим объединением запросов.
+
+Сервер владеет моделью (через бэкенды и реестр моделей) и обслуживает
+несколько процессов приложения: каждый LanguageModel с llm_settings["backend"]
+равным "server" отправляет ему свои чанки вместо загрузки собственной копии
+модели. Запросы, пришедшие в течение короткого окна, объединяются в один
+вызов generate_batch, если у них совпадают настройки генерации, префикс
+промпта и типы сущностей.
+
+Запуск:
+    python -m free_vigilance_reduction.inference_server --address unix:///tmp/fvr-llm.sock
+    python -m free_vigilance_reduction.inference_server --address http://127.0.0.1:8765
+
+Протокол — JSON по HTTP:
+    POST /generate  {"prompts", "llm_settings", "prefix", "cache_key", "sources", "entity_types"}
+                    -> {"outputs", "generated_tokens"}
+    POST /tokenize  {"text", "llm_settings"} -> {"ids", "offsets"}
+    GET  /health    -> {"status", "pending", "models"}
+"""
+
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .entity_recognition.backends import InferenceBackend, create_backend
+from .entity_recognition.model_registry import ModelRegistry, get_model_registry
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _GenerateRequest:
+    """
+    Запрос генерации, ожидающий объединения в пакет.
+    """
+
+    def __init__(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str,
+        cache_key: str,
+        sources: Optional[List[str]],
+        entity_types: Optional[List[str]]
+    ):
+        self.prompts = prompts
+        self.llm_settings = llm_settings
+        self.prefix = prefix
+        self.cache_key = cache_key
+        self.sources = sources
+        self.entity_types = entity_types
+        self.future: Future = Future()
+
+    def group_key(self) -> str:
+        """
+        Ключ совместимости: запросы с одинаковым ключом генерируются одним вызовом.
+        """
+        return json.dumps(
+            [self.llm_settings, self.prefix, self.cache_key, self.entity_types, self.sources is None],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+
+
+class DynamicBatcher:
+    """
+    Очередь запросов генерации с объединением в пакеты по времени.
+
+    Рабочий поток берёт первый запрос, ждёт ещё не дольше window_seconds
+    (или пока не наберётся max_prompts промптов), группирует накопленные
+    запросы по совместимости и выполняет каждую группу одним вызовом бэкенда.
+    Бэкенды общие для генерации и токенизации, поэтому работа с ними от
+    load до release выполняется под одной блокировкой.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        window_seconds: float = 0.01,
+        max_prompts: int = 64
+    ):
+        """
+        Args:
+            registry (ModelRegistry, optional): Реестр моделей для бэкенда transformers.
+            window_seconds (float): Окно ожидания запросов для объединения.
+            max_prompts (int): Число промптов, при котором пакет собирается без ожидания.
+        """
+        self.registry = registry if registry is not None else get_model_registry()
+        self.window_seconds = window_seconds
+        self.max_prompts = max_prompts
+        self.backends: Dict[str, InferenceBackend] = {}
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Optional[_GenerateRequest]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._backend_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="llm-batcher", daemon=True)
+        self._thread.start()
+
+    def backend(self, name: str) -> InferenceBackend:
+        """
+        Бэкенд сервера по имени (создаётся один раз).
+
+        Args:
+            name (str): Имя бэкенда.
+
+        Returns:
+            InferenceBackend: Бэкенд.
+
+        Raises:
+            ValueError: Если бэкенд неизвестен или сам является клиентом сервера.
+        """
+        if name == "server":
+            raise ValueError("Сервер вывода не может использовать backend 'server'")
+        with self._lock:
+            if name not in self.backends:
+                self.backends[name] = create_backend(name, self.registry)
+            return self.backends[name]
+
+    def tokenize(self, text: str, llm_settings: Dict[str, Any]) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        Токенизация текста бэкендом сервера.
+
+        Args:
+            text (str): Текст.
+            llm_settings (dict): Настройки LLM (backend, model_path).
+
+        Returns:
+            Tuple[List[int], List[Tuple[int, int]]]: Идентификаторы токенов и их границы в тексте.
+        """
+        backend = self.backend(llm_settings.get("backend", "transformers"))
+        with self._backend_lock:
+            backend.load(llm_settings)
+            try:
+                return backend.tokenize(text)
+            finally:
+                backend.release()
+
+    def pending(self) -> int:
+        """
+        Число запросов в очереди.
+
+        Returns:
+            int: Размер очереди.
+        """
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        prompts: List[str],
+        llm_settings: Dict[str, Any],
+        prefix: str = "",
+        cache_key: str = "",
+        sources: Optional[List[str]] = None,
+        entity_types: Optional[List[str]] = None
+    ) -> "Future[Tuple[List[str], int]]":
+        """
+        Постановка запроса в очередь.
+
+        Returns:
+            Future: Результат — ответы для промптов и число сгенерированных токенов.
+        """
+        request = _GenerateRequest(prompts, llm_settings, prefix, cache_key, sources, entity_types)
+        self._queue.put(request)
+        return request.future
+
+    def stop(self) -> None:
+        """
+        Остановка рабочего потока после обработки очереди.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            collected = [first]
+            size = len(first.prompts)
+            deadline = time.monotonic() + self.window_seconds
+            stop = False
+            while size < self.max_prompts:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                collected.append(request)
+                size += len(request.prompts)
+
+            groups: Dict[str, List[_GenerateRequest]] = {}
+            for request in collected:
+                groups.setdefault(request.group_key(), []).append(request)
+            for group in groups.values():
+                self._run(group)
+            if stop:
+                return
+
+    def _run(self, group: List[_GenerateRequest]) -> None:
+        """
+        Генерация для группы совместимых запросов одним вызовом бэкенда.
+        """
+        head = group[0]
+        prompts = [p for request in group for p in request.prompts]
+        sources = None if head.sources is None else [s for request in group for s in request.sources]
+        backend = self.backend(head.llm_settings.get("backend", "transformers"))
+        try:
+            with self._backend_lock:
+                backend.load(head.llm_settings)
+                try:
+                    outputs = backend.generate_batch(
+                        prompts, head.llm_settings, head.prefix, head.cache_key, sources, head.entity_types
+                    )
+                    counts = [backend.count_tokens(out) for out in outputs]
+                finally:
+                    backend.release()
+        except Exception as e:
+            logger.error(f"Сервер вывода: ошибка генерации: {e}")
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(group)
+        logger.debug(f"Сервер вывода: пакет из {len(group)} запросов, {len(prompts)} промптов")
+        pos = 0
+        for request in group:
+            n = len(request.prompts)
+            request.future.set_result((outputs[pos:pos + n], sum(counts[pos:pos + n])))
+            pos += n
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Обработчик HTTP-запросов сервера вывода.
+    """
+
+    server_version = "FVRInference/1.0"
+
+    @property
+    def batcher(self) -> DynamicBatcher:
+        return self.server.batcher
+
+    def address_string(self) -> str:
+        return str(self.client_address or "unix")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"Сервер вывода: {format % args}")
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._reply(404, {"error": f"Неизвестный путь: {self.path}"})
+            return
+        self._reply(200, {
+            "status": "ok",
+            "pending": self.batcher.pending(),
+            "batches": self.batcher.batches,
+            "requests": self.batcher.requests,
+            "models": self.batcher.registry.residency(),
+        })
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            settings = payload.get("llm_settings", {})
+            if self.path == "/generate":
+                outputs, tokens = self.batcher.submit(
+                    payload["prompts"],
+                    settings,
+                    payload.get("prefix", ""),
+                    payload.get("cache_key", ""),
+                    payload.get("sources"),
+                    payload.get("entity_types"),
+                ).result()
+                self._reply(200, {"outputs": outputs, "generated_tokens": tokens})
+            elif self.path == "/tokenize":
+                ids, offsets = self.batcher.tokenize(payload["text"], settings)
+                self._reply(200, {"ids": ids, "offsets": offsets})
+            else:
+                self._reply(404, {"error": f"Неизвестный путь: {self.path}"})
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InferenceServer:
+    """
+    Сервер вывода на Unix-сокете или TCP.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        window_ms: float = 10.0,
+        max_batch: int = 64,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """
+        Args:
+            address (str): "unix:///путь/к/сокету" или "http://хост:порт".
+            window_ms (float): Окно объединения запросов в миллисекундах.
+            max_batch (int): Число промптов, при котором пакет собирается без ожидания.
+            registry (ModelRegistry, optional): Реестр моделей.
+
+        Raises:
+            ValueError: Если адрес не поддерживается.
+        """
+        parsed = urlparse(address)
+        self.batcher = DynamicBatcher(registry, window_ms / 1000, max_batch)
+        if parsed.scheme == "unix":
+            path = parsed.path
+            if os.path.exists(path):
+                os.unlink(path)
+            self.httpd = _UnixHTTPServer(path, _Handler)
+        elif parsed.scheme == "http":
+            port = 8765 if parsed.port is None else parsed.port
+            self.httpd = ThreadingHTTPServer((parsed.hostname or "127.0.0.1", port), _Handler)
+        else:
+            raise ValueError(f"Неподдерживаемый адрес сервера вывода: {address}")
+        self.httpd.batcher = self.batcher
+        self.address = address
+        if parsed.scheme == "http" and parsed.port == 0:
+            self.address = f"http://{self.httpd.server_address[0]}:{self.httpd.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def serve_forever(self) -> None:
+        """
+        Обслуживание запросов в текущем потоке.
+        """
+        logger.info(f"Сервер вывода слушает {self.address}")
+        self.httpd.serve_forever()
+
+    def start(self) -> "InferenceServer":
+        """
+        Запуск обслуживания в фоновом потоке.
+
+        Returns:
+            InferenceServer: Этот сервер.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        """
+        Остановка сервера и освобождение сокета.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.stop()
+        parsed = urlparse(self.address)
+        if parsed.scheme == "unix" and os.path.exists(parsed.path):
+            os.unlink(parsed.path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Локальный сервер вывода языковой модели")
+    parser.add_argument("--address", default="unix:///tmp/fvr-llm.sock",
+                        help="unix:///путь/к/сокету или http://хост:порт")
+    parser.add_argument("--batch-window-ms", type=float, default=10.0,
+                        help="окно объединения запросов, мс")
+    parser.add_argument("--max-batch", type=int, default=64,
+                        help="число промптов, при котором пакет собирается без ожидания")
+    args = parser.parse_args(argv)
+
+    server = InferenceServer(args.address, args.batch_window_ms, args.max_batch)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
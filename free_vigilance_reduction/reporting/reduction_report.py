@@ -5,7 +5,7 @@
 import json
 import csv
 import os
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from ..entity_recognition.entity import Entity
 from ..utils.logging import get_logger
@@ -23,7 +23,8 @@ class ReductionReport:
         original_text: str,
         reduced_text: str,
         entities: List[Entity],
-        replacements: List[Dict]
+        replacements: List[Dict],
+        llm_prefilter: Optional[Dict] = None
     ) -> None:
         """
         Инициализация отчета.
@@ -33,12 +34,15 @@ class ReductionReport:
             reduced_text (str): Анонимизированный текст.
             entities (List[Entity]): Найденные сущности.
             replacements (List[Dict]): Список с информацией о произведенных заменах.
+            llm_prefilter (dict, optional): Статистика предварительного отбора чанков LLM
+                (доля пропущенных чанков и оценка потери полноты).
         """
         self.original_text = original_text
         self.reduced_text = reduced_text
         self.entities = entities
         self.replacements = replacements
         self.reduction_count = len(replacements)
+        self.llm_prefilter = llm_prefilter
 
         logger.info(f"Создан отчет: {self.reduction_count} замен")
 
@@ -49,15 +53,18 @@ class ReductionReport:
         Returns:
             dict: Представление отчета в виде словаря.
         """
+        summary = {
+            "original_length": len(self.original_text),
+            "reduced_length": len(self.reduced_text),
+            "entities_found": len(self.entities),
+            "replacements_made": self.reduction_count
+        }
+        if self.llm_prefilter is not None:
+            summary["llm_prefilter"] = self.llm_prefilter
         return {
             "original_text": self.original_text,
             "reduced_text": self.reduced_text,
-            "summary": {
-                "original_length": len(self.original_text),
-                "reduced_length": len(self.reduced_text),
-                "entities_found": len(self.entities),
-                "replacements_made": self.reduction_count
-            },
+            "summary": summary,
             "entities": [e.to_dict() for e in self.entities],
             "replacements": self.replacements
         }
@@ -0,0 +1,13 @@
+"""
+Общие настройки тестов производительности.
+
+Замеры времени зависят от машины и её загрузки, поэтому тесты со сравнением
+времени выполняются только при заданной переменной окружения FVR_BENCHMARKS=1.
+"""
+
+import os
+import unittest
+
+RUN_BENCHMARKS = os.environ.get("FVR_BENCHMARKS") == "1"
+
+benchmark = unittest.skipUnless(RUN_BENCHMARKS, "замер производительности: задайте FVR_BENCHMARKS=1")
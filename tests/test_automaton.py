@@ -0,0 +1,47 @@
+import unittest
+from free_vigilance_reduction.entity_recognition.automaton import (
+    AhoCorasickAutomaton,
+    fold_case,
+    select_leftmost_longest,
+)
+
+
+class TestAhoCorasickAutomaton(unittest.TestCase):
+    def setUp(self):
+        self.automaton = AhoCorasickAutomaton.build([
+            ("he", "A"),
+            ("she", "B"),
+            ("his", "C"),
+            ("hers", "D"),
+            ("he", "E"),
+        ])
+
+    def test_iter_matches_finds_all_overlapping(self):
+        found = sorted(
+            (start, end, self.automaton.payloads[node])
+            for start, end, node in self.automaton.iter_matches("ushers")
+        )
+        self.assertEqual(found, [
+            (1, 4, ("B",)),
+            (2, 4, ("A", "E")),
+            (2, 6, ("D",)),
+        ])
+
+    def test_empty_automaton(self):
+        automaton = AhoCorasickAutomaton.build([])
+        self.assertEqual(list(automaton.iter_matches("текст")), [])
+        self.assertEqual(automaton.node_count, 1)
+
+    def test_select_leftmost_longest_respects_boundaries(self):
+        text = "ab abc abcd"
+        selected = select_leftmost_longest(text, [(0, 2), (3, 5), (3, 6), (7, 10)])
+        self.assertEqual(selected, [(0, 2), (3, 6)])
+
+    def test_fold_case_keeps_length(self):
+        text = "İstanbul ИВАН"
+        self.assertEqual(len(fold_case(text)), len(text))
+        self.assertTrue(fold_case(text).endswith("иван"))
+
+
+if __name__ == '__main__':
+    unittest.main()
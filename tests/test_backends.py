@@ -0,0 +1,184 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import torch
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.backends import (
+    FakeBackend,
+    OnnxBackend,
+    TransformersBackend,
+    create_backend,
+)
+from free_vigilance_reduction.entity_recognition.backends.onnx_backend import _graph_size
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+from free_vigilance_reduction.entity_recognition.model_registry import ModelRegistry
+from tests.tiny_llm import tiny_model_path
+
+HAS_OPTIMUM = importlib.util.find_spec("optimum") is not None
+
+
+class _SlowTokenizer:
+    """Токенизатор по словам без поддержки return_offsets_mapping."""
+
+    def __call__(self, text, **kwargs):
+        raise NotImplementedError
+
+    def encode(self, text, add_special_tokens=False):
+        self.words = text.split()
+        return list(range(len(self.words)))
+
+    def decode(self, ids, **kwargs):
+        return " ".join(self.words[i] for i in ids)
+
+
+class _TrackingBackend(FakeBackend):
+    """Бэкенд, запоминающий наибольшее число одновременно занятых моделей."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+
+    def load(self, llm_settings):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+    def release(self):
+        self.active -= 1
+
+    def generate_batch(self, prompts, llm_settings, *args, **kwargs):
+        time.sleep(0.05)
+        return super().generate_batch(prompts, llm_settings, *args, **kwargs)
+
+
+class TestCreateBackend(unittest.TestCase):
+    def test_names(self):
+        self.assertIsInstance(create_backend("transformers"), TransformersBackend)
+        self.assertIsInstance(create_backend("onnx"), OnnxBackend)
+        self.assertIsInstance(create_backend("fake"), FakeBackend)
+        with self.assertRaises(ValueError):
+            create_backend("vllm")
+
+
+class TestFakeBackend(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeBackend()
+
+    def test_tokenize(self):
+        ids, offsets = self.backend.tokenize("Иван")
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(offsets[-1], (3, 4))
+        self.assertEqual(self.backend.count_tokens("Иван"), 4)
+
+    def test_deterministic_replies(self):
+        chunk = "вчера Иван уехал в Казань"
+        echo = self.backend.generate_batch(["p"], {}, sources=[chunk], entity_types=["PER"])
+        spans = self.backend.generate_batch(["p"], {"output_mode": "spans"}, sources=[chunk], entity_types=["PER"])
+
+        self.assertEqual(echo, ["вчера <PER>Иван</PER> уехал в <PER>Казань</PER>"])
+        self.assertEqual(spans, ["PER: Иван\nPER: Казань"])
+        self.assertEqual(self.backend.generated_tokens, len(echo[0]) + len(spans[0]))
+
+    def test_language_model_without_model(self):
+        profile = ConfigurationProfile(profile_id="fake", entity_types=["PER"])
+        profile.llm_settings.update({"backend": "fake", "max_input_tokens": 11, "batch_size": 2})
+        lm = LanguageModel()
+        lm.nlp = None
+
+        entities = lm.search_entities("Иван спит. Олег спит. иван", profile)
+
+        self.assertEqual([(e.text, e.start_pos) for e in entities], [("Иван", 0), ("Олег", 11)])
+        self.assertEqual(lm.backend.calls, [3])
+        self.assertGreater(lm.generated_tokens, 0)
+
+    def test_concurrent_calls_do_not_share_loaded_model(self):
+        lm = LanguageModel()
+        lm.nlp = None
+        lm.backend = _TrackingBackend()
+        profiles = []
+        for name in ("a", "b"):
+            profile = ConfigurationProfile(profile_id=name, entity_types=["PER"])
+            profile.llm_settings.update({"backend": "fake", "model_path": name})
+            profiles.append(profile)
+        results = {}
+
+        def run(profile):
+            results[profile.profile_id] = lm.search_entities("Иван спит", profile)
+
+        threads = [threading.Thread(target=run, args=(p,)) for p in profiles]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(lm.backend.max_active, 1)
+        self.assertEqual([e.text for e in results["a"]], ["Иван"])
+        self.assertEqual([e.text for e in results["b"]], ["Иван"])
+
+
+class TestTransformersBackend(unittest.TestCase):
+    def test_offsets_without_offset_mapping(self):
+        backend = TransformersBackend()
+        backend.tokenizer = _SlowTokenizer()
+        text = "Иван  Петров,  Казань"
+
+        ids, offsets = backend.tokenize(text)
+
+        self.assertEqual([text[a:b] for a, b in offsets], ["Иван", "Петров,", "Казань"])
+
+    def test_uses_registry_model(self):
+        registry = ModelRegistry()
+        backend = TransformersBackend(registry)
+        settings = {"model_path": tiny_model_path(), "max_new_tokens": 4, "temperature": 0.0}
+
+        backend.load(settings)
+        outputs = backend.generate_batch(["Иван", "x"], settings)
+        backend.release()
+
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual([r["in_use"] for r in registry.residency()], [0])
+        self.assertGreater(backend.generated_tokens, 0)
+
+
+class TestOnnxBackend(unittest.TestCase):
+    @unittest.skipIf(HAS_OPTIMUM, "optimum установлен")
+    def test_missing_runtime_reported(self):
+        backend = OnnxBackend(ModelRegistry(loader=OnnxBackend().registry._loader))
+        with self.assertRaises(ImportError):
+            backend.load({"model_path": tiny_model_path()})
+
+    @unittest.skipUnless(HAS_OPTIMUM, "требуется optimum[onnxruntime]")
+    def test_matches_transformers_greedy(self):
+        settings = {"model_path": tiny_model_path(), "max_new_tokens": 6, "temperature": 0.0, "batch_size": 2}
+        prompts = ["Иван", "Мария живёт в Казани"]
+        reference = TransformersBackend(ModelRegistry())
+        reference.load(settings)
+        onnx = OnnxBackend()
+        onnx.load(settings)
+
+        self.assertEqual(onnx.generate_batch(prompts, settings), reference.generate_batch(prompts, settings))
+        self.assertEqual(onnx.device, torch.device("cpu"))
+
+    def test_graph_size_without_onnx_path(self):
+        exported = SimpleNamespace(model_save_dir=tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, exported.model_save_dir, True)
+        with open(os.path.join(exported.model_save_dir, "model.onnx"), "wb") as f:
+            f.write(b"\0" * 128)
+
+        self.assertEqual(_graph_size(exported, None, tiny_model_path()), 128)
+        self.assertEqual(
+            _graph_size(SimpleNamespace(), None, tiny_model_path()),
+            ModelRegistry._estimate_size(tiny_model_path())
+        )
+        self.assertGreater(_graph_size(SimpleNamespace(), None, tiny_model_path()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
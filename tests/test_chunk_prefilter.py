@@ -0,0 +1,114 @@
+import unittest
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.chunk_prefilter import ChunkPrefilter, PrefilterStats
+from free_vigilance_reduction.entity_recognition.entity import Entity
+from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+from free_vigilance_reduction.reporting.reduction_report import ReductionReport
+
+
+class TestChunkPrefilter(unittest.TestCase):
+    def setUp(self):
+        self.prefilter = ChunkPrefilter(threshold=1.0, audit_rate=0)
+
+    def test_score(self):
+        self.assertEqual(self.prefilter.score("12 345,00 | 17 | 0,5\n8 | 9"), 0)
+        self.assertEqual(self.prefilter.score("Настоящий договор вступает в силу."), 0.5)
+        self.assertEqual(self.prefilter.score("договор с Ивановым"), 1)
+        self.assertEqual(self.prefilter.score("договор с ООО «ромашка»"), 2)
+        self.assertEqual(self.prefilter.score("телефон 8-800", known_hits=1), 2)
+
+    def test_select_uses_known_entities(self):
+        chunks = [(0, "сумма 100 руб. "), (15, "дата 01.02.2024"), (30, "подпись Петрова")]
+        known = [Entity("01.02.2024", "DATE", 20, 30)]
+
+        keep, audit, stats = self.prefilter.select(chunks, known)
+
+        self.assertEqual(keep, [False, True, True])
+        self.assertEqual(audit, [False, False, False])
+        self.assertEqual((stats.chunks, stats.skipped, stats.audited), (3, 1, 0))
+        self.assertAlmostEqual(stats.skip_rate, 1 / 3)
+        self.assertIsNone(stats.estimated_recall_loss)
+
+    def test_audit_sample(self):
+        chunks = [(i * 10, f"строка {i} 0") for i in range(200)]
+
+        keep, audit, stats = ChunkPrefilter(audit_rate=0.1).select(chunks)
+
+        self.assertEqual(keep, audit)
+        self.assertEqual(stats.audited + stats.skipped, 200)
+        self.assertTrue(5 <= stats.audited <= 40)
+
+    def test_recall_loss_estimate(self):
+        stats = PrefilterStats()
+        stats.chunks, stats.skipped, stats.audited = 12, 10, 2
+        stats.audited_tags, stats.generated_tags = 1, 15
+
+        self.assertEqual(stats.estimated_missed, 5)
+        self.assertAlmostEqual(stats.estimated_recall_loss, 5 / 21)
+        self.assertEqual(stats.to_dict()["skipped"], 10)
+
+
+class TestPrefilterCascade(unittest.TestCase):
+    def test_skips_chunks_without_candidates(self):
+        profile = ConfigurationProfile(profile_id="cascade", entity_types=["PER"], replacement_rules={"PER": "x"})
+        profile.use_regex = False
+        profile.use_dictionary = False
+        profile.llm_settings.update({
+            "backend": "fake",
+            "max_input_tokens": 11,
+            "batch_size": 4,
+            "prefilter": True,
+            "prefilter_audit_rate": 0,
+        })
+        recognizer = EntityRecognizer(regex_path="missing.json")
+        recognizer.language_model.nlp = None
+        text = "1 2 3 4 5 6 7 8 9 0 1 звонил Олег"
+
+        stats = PrefilterStats()
+        entities = recognizer.detect_entities(text, profile, stats)
+
+        self.assertEqual([e.text for e in entities], ["Олег"])
+        self.assertEqual(recognizer.language_model.backend.calls, [1])
+        self.assertEqual((stats.chunks, stats.skipped), (3, 2))
+
+        report = ReductionReport(text, text, entities, [], stats.to_dict())
+        self.assertAlmostEqual(report.to_dict()["summary"]["llm_prefilter"]["skip_rate"], 2 / 3)
+
+    def test_overlap_entities_counted_once(self):
+        profile = ConfigurationProfile(profile_id="overlap", entity_types=["PER"], replacement_rules={"PER": "x"})
+        profile.llm_settings.update({
+            "backend": "fake",
+            "max_input_tokens": 11,
+            "chunk_overlap_tokens": 5,
+            "prefilter": True,
+            "prefilter_audit_rate": 0,
+        })
+        lm = LanguageModel()
+        lm.nlp = None
+
+        stats = PrefilterStats()
+        entities = lm.search_entities("аааааа Олег ббббббббб", profile, prefilter_stats=stats)
+
+        self.assertEqual([e.text for e in entities], ["Олег"])
+        self.assertEqual(lm.backend.calls, [2])
+        self.assertEqual(stats.generated_tags, 1)
+
+    def test_disabled_by_default(self):
+        profile = ConfigurationProfile(profile_id="plain", entity_types=["PER"], replacement_rules={"PER": "x"})
+        profile.use_regex = False
+        profile.use_dictionary = False
+        profile.llm_settings.update({"backend": "fake", "max_input_tokens": 11})
+        recognizer = EntityRecognizer(regex_path="missing.json")
+        recognizer.language_model.nlp = None
+
+        stats = PrefilterStats()
+        recognizer.detect_entities("Иван спит. 1 2 3", profile, stats)
+
+        self.assertEqual(stats.chunks, 0)
+        self.assertIsNone(ReductionReport("a", "a", [], []).to_dict()["summary"].get("llm_prefilter"))
+
+
+if __name__ == "__main__":
+    unittest.main()
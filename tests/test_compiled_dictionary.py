@@ -0,0 +1,84 @@
+import unittest
+import tempfile
+import shutil
+import os
+from free_vigilance_reduction.entity_recognition.compiled_dictionary import (
+    StringTable,
+    compile_dictionary,
+    compiled_path_for,
+    load_compiled,
+)
+from free_vigilance_reduction.entity_recognition.dictionary import Dictionary
+from free_vigilance_reduction.entity_recognition.dictionary_manager import DictionaryManager
+
+
+class TestCompiledDictionary(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.txt_path = os.path.join(self.temp_dir, "cities.txt")
+        with open(self.txt_path, "w", encoding="utf-8") as f:
+            f.write("# Города\nМосква\nСанкт-Петербург\nОмск\nТомск\nЁлки\nМосква\n")
+        self.text = "Из Москвы в Москва, затем Санкт-Петербург, Томск и Ёлки; омск тоже."
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _set_mtime(self, path, offset):
+        stat = os.stat(self.txt_path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset))
+
+    def test_round_trip_gives_same_matches(self):
+        compiled = load_compiled(compile_dictionary(self.txt_path), "LOC")
+        plain = Dictionary("LOC").load_from_file(self.txt_path)
+
+        self.assertIsInstance(compiled.terms, StringTable)
+        self.assertEqual(list(compiled.terms), sorted(plain.terms))
+        self.assertEqual(compiled.find_matches(self.text), plain.find_matches(self.text))
+
+    def test_string_table_lookup(self):
+        table = load_compiled(compile_dictionary(self.txt_path), "LOC").terms
+        self.assertIn("Омск", table)
+        self.assertIn("Ёлки", table)
+        self.assertNotIn("Омс", table)
+        self.assertNotIn("Новосибирск", table)
+        self.assertEqual(table[-1], sorted(table)[-1])
+
+    def test_add_term_to_compiled_dictionary(self):
+        dictionary = load_compiled(compile_dictionary(self.txt_path), "LOC")
+        dictionary.add_term("Омск")
+        self.assertEqual(dictionary.version, 0)
+        dictionary.add_term("Тверь")
+        self.assertEqual(dictionary.find_matches("Тверь и Омск")[0].text, "Тверь")
+        self.assertEqual(len(dictionary.terms), 6)
+
+    def test_manager_uses_fresh_compiled_file(self):
+        compiled_path = compile_dictionary(self.txt_path)
+        self._set_mtime(compiled_path, 1_000_000)
+
+        manager = DictionaryManager()
+        self.assertTrue(manager.load_dictionary("cities", self.txt_path, "LOC"))
+        self.assertIsInstance(manager.get_dictionary("cities").terms, StringTable)
+
+    def test_manager_ignores_stale_compiled_file(self):
+        compiled_path = compile_dictionary(self.txt_path)
+        self._set_mtime(compiled_path, -1_000_000)
+
+        manager = DictionaryManager()
+        manager.load_dictionary("cities", self.txt_path, "LOC")
+        self.assertIsInstance(manager.get_dictionary("cities").terms, list)
+
+    def test_manager_falls_back_on_corrupted_file(self):
+        compiled_path = compiled_path_for(self.txt_path)
+        with open(compiled_path, "wb") as f:
+            f.write(b"FVDC garbage")
+        self._set_mtime(compiled_path, 1_000_000)
+
+        manager = DictionaryManager()
+        manager.load_dictionary("cities", self.txt_path, "LOC")
+        dictionary = manager.get_dictionary("cities")
+        self.assertIsInstance(dictionary.terms, list)
+        self.assertEqual(len(dictionary.find_matches(self.text)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
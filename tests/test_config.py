@@ -36,6 +36,29 @@ class TestConfigurationProfile(unittest.TestCase):
         self.assertEqual(restored.get_dictionary_path("ORG"), "/tmp/org_dict.txt")
         self.assertFalse(restored.use_language_model)
 
+    def test_dictionary_settings_from_paths(self):
+        self.assertEqual(
+            self.sample_profile.dictionary_settings["PER"],
+            {"path": "/tmp/per_dict.txt", "entity_type": "PER", "enabled": True}
+        )
+
+        profile = ConfigurationProfile(
+            profile_id="named",
+            dictionary_paths={"cities": {"path": "dictionaries/cities.txt", "entity_type": "LOC", "enabled": False}}
+        )
+        self.assertEqual(
+            profile.dictionary_settings,
+            {"cities": {"path": "dictionaries/cities.txt", "entity_type": "LOC", "enabled": False}}
+        )
+        self.assertEqual(profile.get_dictionary_path("cities"), "dictionaries/cities.txt")
+
+    def test_dictionary_settings_changes_are_kept(self):
+        self.sample_profile.dictionary_settings["PER"]["enabled"] = False
+        self.assertFalse(self.sample_profile.dictionary_settings["PER"]["enabled"])
+
+        self.sample_profile.dictionary_paths = {"LOC": "/tmp/loc_dict.txt"}
+        self.assertEqual(list(self.sample_profile.dictionary_settings), ["LOC"])
+
     def test_save_and_load_profile(self):
         with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix=".json") as temp_file:
             temp_path = temp_file.name
@@ -58,6 +81,32 @@ class TestConfigurationProfile(unittest.TestCase):
         with self.assertRaises(ValueError):
             profile.validate()
 
+    def test_validate_llm_settings(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            profile = ConfigurationProfile(
+                profile_id="llm_profile",
+                use_language_model=True,
+                llm_settings={"model_path": model_dir, "output_mode": "spans", "batch_size": 4}
+            )
+            profile.validate()
+
+            profile.llm_settings["output_mode"] = "json"
+            with self.assertRaises(ValueError):
+                profile.validate()
+
+            profile.llm_settings["output_mode"] = "echo"
+            profile.llm_settings["batch_size"] = 0
+            with self.assertRaises(ValueError):
+                profile.validate()
+
+            profile.llm_settings["batch_size"] = 1
+            profile.llm_settings["backend"] = "vllm"
+            with self.assertRaises(ValueError):
+                profile.validate()
+
+            profile.llm_settings.update({"backend": "fake", "model_path": ""})
+            profile.validate()
+
 
 if __name__ == '__main__':
     unittest.main()
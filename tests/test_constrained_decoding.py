@@ -0,0 +1,114 @@
+import unittest
+
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.backends import FakeBackend
+from free_vigilance_reduction.entity_recognition.constrained_decoding import (
+    CopyOrTagDecoder,
+    CopyOrTagLogitsProcessor,
+    SourceReproducedCriteria,
+)
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+
+# Токены: 1..3 — текст, 10 — "<", 11 — "PER", 12 — ">", 13 — "</", 0 — конец.
+TAGS = {("open", "PER"): [10, 11, 12], ("close", "PER"): [13, 11, 12]}
+END = 0
+PROMPT = [7, 7]
+
+
+def _metaspace_tokenizer():
+    """Токенизатор со словами вида "▁Иван", как у SentencePiece-моделей."""
+    vocab = ["<pad>", "<eos>", "<unk>", "Привет", "▁Иван", "<PER>", "</PER>"]
+    tokenizer = Tokenizer(models.WordLevel(vocab={t: i for i, t in enumerate(vocab)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace(replacement="▁", prepend_scheme="never")
+    tokenizer.decoder = decoders.Metaspace(replacement="▁", prepend_scheme="never")
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="<pad>", eos_token="<eos>", unk_token="<unk>"
+    )
+
+
+def _feed(decoder, tokens):
+    ids = torch.tensor([PROMPT + list(tokens)])
+    decoder.sync(ids)
+    return ids
+
+
+class TestCopyOrTagDecoder(unittest.TestCase):
+    def test_allows_copy_or_opening_tag(self):
+        decoder = CopyOrTagDecoder([[1, 2, 3]], TAGS, len(PROMPT), END)
+        self.assertEqual(decoder.allowed_tokens(0), {1, 10})
+
+        _feed(decoder, [10, 11])
+        self.assertEqual(decoder.allowed_tokens(0), {12})
+
+    def test_close_requires_content(self):
+        decoder = CopyOrTagDecoder([[1, 2, 3]], TAGS, len(PROMPT), END)
+        _feed(decoder, [10, 11, 12])
+        self.assertEqual(decoder.allowed_tokens(0), {1})
+
+        _feed(decoder, [10, 11, 12, 1])
+        self.assertEqual(decoder.allowed_tokens(0), {2, 13})
+
+    def test_finishes_after_source_and_closing_tag(self):
+        decoder = CopyOrTagDecoder([[1, 2]], TAGS, len(PROMPT), END)
+        _feed(decoder, [1, 10, 11, 12, 2])
+        self.assertFalse(decoder.finished[0])
+        self.assertEqual(decoder.allowed_tokens(0), {13})
+
+        _feed(decoder, [1, 10, 11, 12, 2, 13, 11, 12])
+        self.assertTrue(decoder.finished[0])
+        self.assertEqual(decoder.allowed_tokens(0), {END})
+
+    def test_source_token_equal_to_tag_start(self):
+        decoder = CopyOrTagDecoder([[10, 3]], TAGS, len(PROMPT), END)
+        _feed(decoder, [10])
+        # "<" мог быть как копией текста, так и началом тега.
+        self.assertEqual(decoder.allowed_tokens(0), {3, 10, 11})
+
+    def test_tags_only_on_boundaries(self):
+        decoder = CopyOrTagDecoder([[1, 2, 3]], TAGS, len(PROMPT), END, [frozenset({0, 2, 3})])
+        _feed(decoder, [1])
+        self.assertEqual(decoder.allowed_tokens(0), {2})
+        _feed(decoder, [1, 2])
+        self.assertEqual(decoder.allowed_tokens(0), {3, 10})
+
+    def test_processor_and_criteria(self):
+        decoder = CopyOrTagDecoder([[1, 2], [3]], TAGS, len(PROMPT), END)
+        processor = CopyOrTagLogitsProcessor(decoder)
+        criteria = SourceReproducedCriteria(decoder)
+
+        ids = torch.tensor([PROMPT, PROMPT])
+        scores = processor(ids, torch.zeros(2, 14))
+        self.assertEqual(torch.isfinite(scores[0]).nonzero().flatten().tolist(), [1, 10])
+        self.assertEqual(torch.isfinite(scores[1]).nonzero().flatten().tolist(), [3, 10])
+
+        ids = torch.tensor([PROMPT + [1], PROMPT + [3]])
+        self.assertEqual(criteria(ids, None).tolist(), [False, True])
+
+    def test_metaspace_tag_before_leading_space(self):
+        tokenizer = _metaspace_tokenizer()
+        text = "Привет Иван"
+        decoder = CopyOrTagDecoder.from_tokenizer(tokenizer, [text], ["PER"], len(PROMPT))
+        privet, ivan, open_tag, close_tag = tokenizer.convert_tokens_to_ids(["Привет", "▁Иван", "<PER>", "</PER>"])
+
+        _feed(decoder, [privet])
+        self.assertEqual(decoder.allowed_tokens(0), {ivan, open_tag})
+        # Тег может открыться только перед "▁Иван", то есть перед пробелом.
+        output = tokenizer.decode([privet, open_tag, ivan, close_tag])
+        self.assertEqual(output, "Привет<PER> Иван</PER>")
+        self.assertEqual(LanguageModel._parse_tags(output, ["PER"]), [("PER", "Иван")])
+
+        profile = ConfigurationProfile(profile_id="metaspace", entity_types=["PER"])
+        profile.llm_settings.update({"backend": "fake"})
+        lm = LanguageModel()
+        lm.nlp = None
+        lm.backend = FakeBackend(reply=lambda source, entity_types, settings: output)
+        entities = lm.search_entities(text, profile)
+        self.assertEqual([(e.text, e.start_pos, e.end_pos) for e in entities], [("Иван", 7, 11)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,10 @@ import unittest
 from free_vigilance_reduction.core import FreeVigilanceReduction
 from free_vigilance_reduction.config.configuration import ConfigurationProfile
 import tempfile
+import shutil
 import os
 import json
+from pathlib import Path
 
 
 class TestFreeVigilanceReduction(unittest.TestCase):
@@ -52,6 +54,144 @@ class TestFreeVigilanceReduction(unittest.TestCase):
         finally:
             os.remove(tmp_path)
 
+    def test_prefilter_summary_per_call(self):
+        llm_profile = ConfigurationProfile(profile_id="llm_profile", entity_types=["PER"])
+        llm_profile.replacement_rules = {"PER": {"type": "template", "template": "[PERSON]"}}
+        llm_profile.use_regex = False
+        llm_profile.use_dictionary = False
+        llm_profile.llm_settings.update({"backend": "fake", "max_input_tokens": 11, "prefilter": True})
+        self.engine.config_manager.profiles["llm_profile"] = llm_profile
+        self.engine.entity_recognizer.language_model.nlp = None
+
+        with_llm = self.engine.reduce_text("1 2 3 4 5 6 7 8 9 0 1 звонил Олег", "llm_profile")
+        without_llm = self.engine.reduce_text("Иван Иванович", "test_profile")
+
+        self.assertEqual(with_llm.to_dict()["summary"]["llm_prefilter"]["chunks"], 3)
+        self.assertIsNone(without_llm.to_dict()["summary"].get("llm_prefilter"))
+
+    def test_reduce_texts_batches_documents(self):
+        llm_profile = ConfigurationProfile(profile_id="llm_profile", entity_types=["PER"])
+        llm_profile.replacement_rules = {"PER": {"type": "template", "template": "[PERSON]"}}
+        llm_profile.use_regex = False
+        llm_profile.use_dictionary = False
+        llm_profile.llm_settings.update({"backend": "fake", "max_input_tokens": 11, "prefilter": True})
+        self.engine.config_manager.profiles["llm_profile"] = llm_profile
+        self.engine.entity_recognizer.language_model.nlp = None
+
+        reports = self.engine.reduce_texts(["1 2 3 4 5 6 7 8 9 0 1 звонил Олег", "эй Олег"], "llm_profile")
+
+        self.assertEqual([r.reduced_text for r in reports], ["1 2 3 4 5 6 7 8 9 0 1 звонил [PERSON]", "эй [PERSON]"])
+        self.assertEqual([r.to_dict()["summary"]["llm_prefilter"]["chunks"] for r in reports], [3, 1])
+        self.assertEqual(self.engine.entity_recognizer.language_model.backend.calls, [2])
+
+
+class TestFreeVigilanceReductionDictionaries(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "dictionaries"))
+        with open(os.path.join(self.temp_dir, "dictionaries", "cities.txt"), "w", encoding="utf-8") as f:
+            f.write("Москва\nОмск\n")
+        with open(os.path.join(self.temp_dir, "dictionaries", "orgs.txt"), "w", encoding="utf-8") as f:
+            f.write("Газпром\n")
+
+        def profile(profile_id, orgs_enabled):
+            return {
+                "profile_id": profile_id,
+                "use_regex": False,
+                "use_dictionary": True,
+                "use_language_model": False,
+                "enabled_entity_types": ["LOC", "ORG"],
+                "replacement_rules": {
+                    "LOC": {"type": "template", "template": "[CITY]"},
+                    "ORG": {"type": "template", "template": "[ORG]"}
+                },
+                "dictionary_paths": {
+                    "cities": {"path": "dictionaries/cities.txt", "entity_type": "LOC", "enabled": True},
+                    "orgs": {"path": "dictionaries/orgs.txt", "entity_type": "ORG", "enabled": orgs_enabled}
+                }
+            }
+
+        self.config_path = os.path.join(self.temp_dir, "profiles.json")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "profiles": [profile("all", True), profile("cities_only", False)],
+                "default_profile_id": "all"
+            }, f)
+
+        self.engine = FreeVigilanceReduction(config_path=self.config_path, regex_path="missing.json")
+        self.text = "Офис Газпром в Москва и Омск."
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_profile_dictionaries_loaded_relative_to_config(self):
+        manager = self.engine.entity_recognizer.dictionary_manager
+        self.assertEqual(set(manager.dictionaries), {"cities", "orgs"})
+        self.assertEqual(
+            manager.sources["cities"],
+            os.path.join(os.path.realpath(self.temp_dir), "dictionaries", "cities.txt")
+        )
+
+        profile = self.engine.config_manager.get_profile("all")
+        entities = self.engine.entity_recognizer.detect_entities(self.text, profile)
+        self.assertEqual([e.text for e in entities], ["Газпром", "Москва", "Омск"])
+
+    def test_only_enabled_dictionaries_are_scanned(self):
+        profile = self.engine.config_manager.get_profile("cities_only")
+        entities = self.engine.entity_recognizer.detect_entities(self.text, profile)
+        self.assertEqual([e.entity_type for e in entities], ["LOC", "LOC"])
+
+    def test_engines_share_dictionary_instances(self):
+        other = FreeVigilanceReduction(config_path=self.config_path, regex_path="missing.json")
+        self.assertIs(
+            other.entity_recognizer.dictionary_manager.get_dictionary("cities"),
+            self.engine.entity_recognizer.dictionary_manager.get_dictionary("cities")
+        )
+
+    def test_same_dictionary_name_in_different_profiles(self):
+        with open(os.path.join(self.temp_dir, "dictionaries", "a.txt"), "w", encoding="utf-8") as f:
+            f.write("Москва\n")
+        with open(os.path.join(self.temp_dir, "dictionaries", "b.txt"), "w", encoding="utf-8") as f:
+            f.write("Газпром\n")
+
+        def profile(profile_id, path, entity_type):
+            return ConfigurationProfile(
+                profile_id=profile_id,
+                entity_types=["LOC", "ORG"],
+                dictionary_paths={"d": {"path": path, "entity_type": entity_type}},
+                use_regex=False,
+                use_language_model=False,
+            )
+
+        first = profile("a", "dictionaries/a.txt", "LOC")
+        second = profile("b", "dictionaries/b.txt", "ORG")
+        self.engine._prepare_dictionaries(first)
+        self.engine._prepare_dictionaries(second)
+        recognizer = self.engine.entity_recognizer
+
+        self.assertEqual([(e.text, e.entity_type) for e in recognizer.detect_entities("Москва и Газпром", first)],
+                         [("Москва", "LOC")])
+        self.assertEqual([(e.text, e.entity_type) for e in recognizer.detect_entities("Москва и Газпром", second)],
+                         [("Газпром", "ORG")])
+
+
+class TestShippedProfiles(unittest.TestCase):
+    def test_profile_dictionaries_exist(self):
+        root = Path(__file__).resolve().parent.parent
+        for config_dir in ("api/config", "examples/config"):
+            engine = FreeVigilanceReduction(
+                config_path=str(root / config_dir / "profiles.json"),
+                regex_path=str(root / config_dir / "regex_patterns.json")
+            )
+            manager = engine.entity_recognizer.dictionary_manager
+            for profile_id, profile in engine.config_manager.profiles.items():
+                if not profile.use_dictionary:
+                    continue
+                for name, settings in profile.dictionary_settings.items():
+                    if settings.get("enabled", True):
+                        with self.subTest(config=config_dir, profile=profile_id, dictionary=name):
+                            self.assertIsNotNone(manager.get_dictionary(name, profile_id))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,11 +1,15 @@
 
+import random
+import time
 import unittest
 import os
 import shutil
 from pathlib import Path
+from free_vigilance_reduction.entity_recognition.entity import Entity
 from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer
 from free_vigilance_reduction.data_replacement.data_replacer import DataReplacer
 from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from tests.benchmark import benchmark
 
 class TestDataReplacerIntegrated(unittest.TestCase):
     def setUp(self):
@@ -71,5 +75,130 @@ class TestDataReplacerIntegrated(unittest.TestCase):
         self.assertNotIn("+7", reduced_text)
         self.assertTrue(reduced_text.endswith("."))
 
+
+def _reference_reduce_text(text, entities, profile):
+    """Прежняя реализация: замена с конца текста со склейкой строк."""
+    replacements = []
+    for entity in sorted(entities, key=lambda e: e.start_pos, reverse=True):
+        rule = profile.replacement_rules.get(entity.entity_type)
+        if not rule:
+            continue
+        rule_type = rule.get("type")
+        if rule_type == "template":
+            replacement = rule.get("template", f"[{entity.entity_type}]")
+        elif rule_type == "stars":
+            replacement = "*" * len(entity.text)
+        elif rule_type == "remove":
+            replacement = ""
+        else:
+            continue
+        space = ""
+        if entity.end_pos < len(text) and text[entity.end_pos] != ' ' and replacement:
+            space = " "
+        text = text[:entity.start_pos] + replacement + space + text[entity.end_pos:]
+        replacements.append((entity.entity_type, entity.start_pos, entity.end_pos, replacement))
+    return text, replacements
+
+
+class TestDataReplacerSinglePass(unittest.TestCase):
+    def setUp(self):
+        self.profile = ConfigurationProfile(
+            profile_id="test",
+            entity_types=["PER", "ORG", "PHONE", "LOC"]
+        )
+        self.profile.replacement_rules = {
+            "PER": {"type": "template", "template": "[PERSON]"},
+            "ORG": {"type": "stars"},
+            "PHONE": {"type": "remove"},
+            "LOC": {"type": "unknown"}
+        }
+        self.replacer = DataReplacer()
+
+    def _random_case(self, rng):
+        text = "".join(rng.choice("аб вг. ,") for _ in range(rng.randint(0, 60)))
+        entities = []
+        pos = 0
+        while pos < len(text):
+            start = pos + rng.randint(0, 5)
+            if entities and start == entities[-1].start_pos:
+                start += 1
+            end = start + rng.randint(0, 6)
+            if end > len(text):
+                break
+            etype = rng.choice(["PER", "ORG", "PHONE", "LOC", "MISC"])
+            entities.append(Entity(text[start:end], etype, start, end))
+            pos = end
+        rng.shuffle(entities)
+        return text, entities
+
+    def test_matches_reference_on_random_inputs(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            text, entities = self._random_case(rng)
+            expected_text, expected = _reference_reduce_text(text, entities, self.profile)
+            reduced_text, replacements = self.replacer.reduce_text(text, entities, self.profile)
+            self.assertEqual(reduced_text, expected_text)
+            self.assertEqual(
+                [(r["entity_type"], r["start_pos"], r["end_pos"], r["replacement"]) for r in replacements],
+                expected
+            )
+
+    def test_output_offsets_point_to_replacements(self):
+        rng = random.Random(11)
+        for _ in range(500):
+            text, entities = self._random_case(rng)
+            reduced_text, replacements = self.replacer.reduce_text(text, entities, self.profile)
+            for r in replacements:
+                self.assertEqual(
+                    reduced_text[r["output_start_pos"]:r["output_end_pos"]],
+                    r["replacement"]
+                )
+
+    def test_space_inserted_after_replacement(self):
+        text = "Иван,Газпром"
+        entities = [Entity("Иван", "PER", 0, 4), Entity("Газпром", "ORG", 5, 12)]
+        reduced_text, replacements = self.replacer.reduce_text(text, entities, self.profile)
+        self.assertEqual(reduced_text, "[PERSON] ,*******")
+        self.assertEqual(replacements[0]["output_start_pos"], 10)
+        self.assertEqual(replacements[1]["output_end_pos"], 8)
+
+    def test_overlapping_entity_skipped(self):
+        text = "Иван Иванович"
+        entities = [Entity("Иван Иванович", "PER", 0, 13), Entity("Иванович", "ORG", 5, 13)]
+        reduced_text, replacements = self.replacer.reduce_text(text, entities, self.profile)
+        self.assertEqual(reduced_text, "[PERSON]")
+        self.assertEqual(len(replacements), 1)
+
+    def test_longest_entity_wins_at_same_start(self):
+        text = "Иван Иванович пришёл"
+        entities = [Entity("Иван", "PER", 0, 4), Entity("Иван Иванович", "PER", 0, 13)]
+        reduced_text, replacements = self.replacer.reduce_text(text, entities, self.profile)
+        self.assertEqual(reduced_text, "[PERSON] пришёл")
+        self.assertEqual([r["original"] for r in replacements], ["Иван Иванович"])
+
+
+class TestDataReplacerBenchmark(unittest.TestCase):
+    @benchmark
+    def test_scales_linearly(self):
+        """Время замены растёт линейно с размером текста при постоянной плотности сущностей."""
+        profile = ConfigurationProfile(profile_id="bench", entity_types=["PER"])
+        profile.replacement_rules = {"PER": {"type": "template", "template": "[PERSON]"}}
+        replacer = DataReplacer()
+        unit = "Иван пишет письмо. "
+
+        timings = {}
+        for repeats in (10000, 20000, 40000):
+            text = unit * repeats
+            entities = [
+                Entity("Иван", "PER", i * len(unit), i * len(unit) + 4) for i in range(repeats)
+            ]
+            started = time.perf_counter()
+            replacer.reduce_text(text, entities, profile)
+            timings[repeats] = time.perf_counter() - started
+
+        # При квадратичной сложности четырёхкратный рост текста дал бы ~16x.
+        self.assertLess(timings[40000], timings[10000] * 8)
+
+
 if __name__ == "__main__":
     unittest.main()
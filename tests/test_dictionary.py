@@ -1,5 +1,6 @@
 import unittest
 import tempfile
+import random
 import os
 from free_vigilance_reduction.entity_recognition.dictionary import Dictionary
 from free_vigilance_reduction.entity_recognition.entity import Entity
@@ -45,6 +46,66 @@ class TestDictionary(unittest.TestCase):
         finally:
             os.remove(temp_path)
 
+    def test_longest_match_wins_regardless_of_order(self):
+        dictionary = Dictionary("PER")
+        dictionary.add_term("Петр")
+        dictionary.add_term("Петр Петров")
+        matches = dictionary.find_matches("Петр Петров пришёл, Петр ушёл.")
+        self.assertEqual(
+            [(m.text, m.start_pos, m.end_pos) for m in matches],
+            [("Петр Петров", 0, 11), ("Петр", 20, 24)]
+        )
+
+    def test_case_insensitive_match_keeps_original_text(self):
+        matches = self.dict.find_matches("ПЕТР ПЕТРОВ и петр петров")
+        self.assertEqual([m.text for m in matches], ["ПЕТР ПЕТРОВ", "петр петров"])
+
+    def test_same_output_as_linear_scanner(self):
+        rng = random.Random(42)
+        alphabet = "абв гд-.Аб1"
+        for _ in range(300):
+            terms = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+                     for _ in range(rng.randint(1, 8))]
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+
+            dictionary = Dictionary("PER")
+            for term in terms:
+                dictionary.add_term(term)
+            expected = _reference_find_matches(dictionary.terms, text)
+            self.assertEqual(dictionary.find_matches(text), expected, (terms, text))
+
+
+def _reference_find_matches(terms, text):
+    """
+    Прежний посимвольный поиск по индексу первых букв.
+
+    Термины перебираются от длинных к коротким, что соответствует правилу
+    «самое левое, самое длинное».
+    """
+    index = {}
+    for term in sorted(terms, key=len, reverse=True):
+        index.setdefault(term[0].lower(), []).append(term)
+
+    matches = []
+    text_lower = text.lower()
+    i = 0
+    while i < len(text):
+        char = text_lower[i]
+        if char in index:
+            for term in index[char]:
+                term_len = len(term)
+                if i + term_len <= len(text):
+                    fragment = text_lower[i:i + term_len]
+                    if fragment == term.lower():
+                        before_ok = i == 0 or not text_lower[i - 1].isalnum()
+                        after_ok = i + term_len == len(text) or not text_lower[i + term_len].isalnum()
+                        if before_ok and after_ok:
+                            matches.append(Entity(text[i:i + term_len], "PER", i, i + term_len))
+                            i += term_len - 1
+                            break
+        i += 1
+    return matches
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -44,5 +44,75 @@ class TestDictionaryManager(unittest.TestCase):
         self.assertEqual(matches[0].text, "Иван Иванович")
 
 
+class TestDictionaryManagerCombinedIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = DictionaryManager()
+        self.temp_paths = []
+        self._load("names", "PER", "Иван\nИван Петров\nМария\n")
+        self._load("cities", "LOC", "Москва\nИван\nСанкт-Петербург\n")
+        self._load("orgs", "ORG", "Газпром\nМосква Сити\n")
+
+        self.profile = ConfigurationProfile(profile_id="p1", entity_types=["PER", "LOC", "ORG"])
+        self.profile.dictionary_settings = {
+            "names": {"enabled": True},
+            "cities": {"enabled": True},
+            "orgs": {"enabled": True},
+        }
+        self.text = "Иван Петров из Москва Сити, Мария из Санкт-Петербург и Иван из Газпром."
+
+    def tearDown(self):
+        for path in self.temp_paths:
+            os.remove(path)
+
+    def _load(self, name, entity_type, content):
+        fd, path = tempfile.mkstemp(suffix=".txt", text=True)
+        os.close(fd)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.temp_paths.append(path)
+        self.manager.load_dictionary(name, path, entity_type)
+
+    def test_single_pass_equals_per_dictionary_scans(self):
+        expected = []
+        for name in ("names", "cities", "orgs"):
+            expected.extend(self.manager.get_dictionary(name).find_matches(self.text))
+        self.assertEqual(self.manager.find_matches(self.text, self.profile), expected)
+
+    def test_index_is_shared_between_profiles(self):
+        other = ConfigurationProfile(profile_id="p2", entity_types=["PER", "LOC", "ORG"])
+        other.dictionary_settings = dict(self.profile.dictionary_settings)
+
+        self.manager.find_matches(self.text, self.profile)
+        self.manager.find_matches(self.text, other)
+        self.assertEqual(len(self.manager._indexes), 1)
+
+    def test_index_rebuilt_when_enabled_set_changes(self):
+        self.manager.find_matches(self.text, self.profile)
+        self.profile.dictionary_settings["orgs"]["enabled"] = False
+        matches = self.manager.find_matches(self.text, self.profile)
+
+        self.assertFalse(any(m.entity_type == "ORG" for m in matches))
+        self.assertEqual(len(self.manager._indexes), 2)
+
+    def test_index_rebuilt_when_dictionary_changes(self):
+        self.manager.find_matches(self.text, self.profile)
+        self._load("orgs", "ORG", "Мария\n")
+        matches = self.manager.find_matches(self.text, self.profile)
+
+        self.assertTrue(any(m.entity_type == "ORG" and m.text == "Мария" for m in matches))
+        self.assertEqual(len(self.manager._indexes), 1)
+
+        self.manager.get_dictionary("names").add_term("Газпром")
+        matches = self.manager.find_matches(self.text, self.profile)
+        self.assertTrue(any(m.entity_type == "PER" and m.text == "Газпром" for m in matches))
+        self.assertEqual(len(self.manager._indexes), 1)
+
+    def test_disabled_entity_type_is_not_scanned(self):
+        self.profile.entity_types = ["PER"]
+        matches = self.manager.find_matches(self.text, self.profile)
+        self.assertTrue(matches)
+        self.assertTrue(all(m.entity_type == "PER" for m in matches))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest
+import tempfile
+import shutil
+import os
+from free_vigilance_reduction.entity_recognition.dictionary_registry import DictionaryRegistry
+from free_vigilance_reduction.entity_recognition.dictionary_manager import DictionaryManager
+
+
+class TestDictionaryRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "names.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("Иван\nМария\n")
+        self.registry = DictionaryRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_same_file_gives_same_instance(self):
+        first = self.registry.get(self.path, "PER")
+        second = self.registry.get(os.path.join(self.temp_dir, ".", "names.txt"), "PER")
+        self.assertIs(first, second)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_managers_share_instances(self):
+        manager_a = DictionaryManager(self.registry)
+        manager_b = DictionaryManager(self.registry)
+        manager_a.load_dictionary("a", self.path, "PER")
+        manager_b.load_dictionary("b", self.path, "PER")
+        self.assertIs(manager_a.get_dictionary("a"), manager_b.get_dictionary("b"))
+
+    def test_modified_file_is_reloaded(self):
+        first = self.registry.get(self.path, "PER")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("Пётр\n")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = self.registry.get(self.path, "PER")
+        self.assertIsNot(first, second)
+        self.assertIn("Пётр", second.terms)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get(os.path.join(self.temp_dir, "missing.txt"), "PER")
+        self.assertFalse(DictionaryManager(self.registry).load_dictionary(
+            "missing", os.path.join(self.temp_dir, "missing.txt"), "PER"
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from free_vigilance_reduction.entity_recognition.entity_recognizer import Entity
 from free_vigilance_reduction.config.configuration import ConfigurationProfile
 from free_vigilance_reduction.entity_recognition.entity import Entity
 import tempfile
+import random
 import json
 import os
 
@@ -38,5 +39,62 @@ class TestEntityRecognizer(unittest.TestCase):
         self.assertTrue(any(e.text == "12/04/2023" and e.entity_type == "DATE" for e in entities))
 
 
+def _reference_deduplicate(entities):
+    """
+    Прежний квадратичный алгоритм дедупликации.
+    """
+    sorted_ents = sorted(entities, key=lambda e: (e.start_pos, -(e.end_pos - e.start_pos)))
+    result = []
+    for ent in sorted_ents:
+        if not any(EntityRecognizer._overlaps(ent, ex) for ex in result):
+            result.append(ent)
+    return result
+
+
+class TestDeduplicateEntities(unittest.TestCase):
+    def setUp(self):
+        self.recognizer = EntityRecognizer(regex_path="missing.json")
+
+    def _random_entities(self, rng, count, text_len, max_len):
+        entities = []
+        for i in range(count):
+            start = rng.randint(0, text_len)
+            end = min(text_len, start + rng.randint(0, max_len))
+            entities.append(Entity(f"e{i}", rng.choice(["PER", "LOC", "ORG"]), start, end))
+        return entities
+
+    def test_longest_first_at_same_start(self):
+        entities = [
+            Entity("Иван", "PER", 0, 4),
+            Entity("Иван Иванович", "PER", 0, 13),
+            Entity("Иванович", "PER", 5, 13),
+            Entity("Москва", "LOC", 13, 19),
+        ]
+        result = self.recognizer._deduplicate_entities(entities)
+        self.assertEqual([e.text for e in result], ["Иван Иванович", "Москва"])
+
+    def test_matches_reference_on_random_inputs(self):
+        rng = random.Random(2024)
+        for _ in range(500):
+            entities = self._random_entities(rng, rng.randint(0, 40), rng.randint(1, 60), rng.randint(0, 12))
+            self.assertEqual(
+                self.recognizer._deduplicate_entities(entities),
+                _reference_deduplicate(entities),
+                entities
+            )
+
+    def test_matches_reference_with_duplicates_and_empty_spans(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            entities = self._random_entities(rng, rng.randint(1, 25), 10, 3)
+            entities += [Entity(e.text + "'", e.entity_type, e.start_pos, e.end_pos) for e in entities[:5]]
+            rng.shuffle(entities)
+            self.assertEqual(
+                self.recognizer._deduplicate_entities(entities),
+                _reference_deduplicate(entities),
+                entities
+            )
+
+
 if __name__ == '__main__':
     unittest.main()
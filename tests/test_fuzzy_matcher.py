@@ -0,0 +1,76 @@
+import random
+import time
+import unittest
+
+from rapidfuzz import fuzz
+
+from free_vigilance_reduction.entity_recognition.fuzzy_matcher import fuzzy_locate
+
+
+def _reference_fuzzy(ent_text, text, threshold=85):
+    """Прежний перебор всех смещений для двух длин окна."""
+    L0 = len(ent_text)
+    delta = max(1, int(0.2 * L0))
+    for L in (L0 - delta, L0 + delta):
+        if L < 1:
+            continue
+        for i in range(0, len(text) - L + 1):
+            if fuzz.ratio(ent_text.lower(), text[i:i + L].lower()) >= threshold:
+                return i, i + L
+    return None
+
+
+class TestFuzzyLocate(unittest.TestCase):
+    text = "Вчера Иоан Петрoв и Мария Сидорова пришли в офис."
+
+    def _located(self, queries, **kwargs):
+        return [
+            self.text[span[0]:span[1]] if span else None
+            for span in fuzzy_locate(queries, self.text, threshold=80, **kwargs)
+        ]
+
+    def test_candidates_on_word_boundaries(self):
+        self.assertEqual(
+            self._located(["Иван Петров", "МАРИЯ", "Сидоровой", "Казань"]),
+            ["Иоан Петрoв", "Мария", "Сидорова", None]
+        )
+
+    def test_window(self):
+        self.assertEqual(self._located(["Мария", "Иван Петров"], start=18), ["Мария", None])
+        self.assertEqual(self._located(["Сидоровой"], end=30), [None])
+
+    def test_leftmost_on_tie(self):
+        self.assertEqual(fuzzy_locate(["Анна"], "Анна и Анна"), [(0, 4)])
+
+    def test_empty(self):
+        self.assertEqual(fuzzy_locate([], self.text), [])
+        self.assertEqual(fuzzy_locate(["Анна"], "  ,  "), [None])
+
+
+class TestFuzzyLocateBenchmark(unittest.TestCase):
+    def test_faster_than_sliding_window_on_1mb(self):
+        random.seed(0)
+        words = ["дом", "улица", "город", "Москва", "пришёл", "сегодня", "документ", "договор"]
+        parts = []
+        size = 0
+        while size < 1_000_000:
+            parts.append(random.choice(words))
+            size += len(parts[-1]) + 1
+        text = " ".join(parts) + " Иоан Петрoв"
+
+        started = time.perf_counter()
+        expected = _reference_fuzzy("Иван Петров", text, threshold=80)
+        reference_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        [span] = fuzzy_locate(["Иван Петров"], text, threshold=80)
+        indexed_time = time.perf_counter() - started
+
+        print(f"\n{len(text)} символов: перебор {reference_time:.2f} с, индекс {indexed_time:.2f} с")
+        self.assertEqual(text[span[0]:span[1]], "Иоан Петрoв")
+        self.assertEqual(expected[0], span[0])
+        self.assertLess(indexed_time * 3, reference_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "transformers", "spacy")
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(PROJECT_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+
+
+def _parse_importtime(stderr: str) -> dict:
+    """Разбор вывода -X importtime в словарь {модуль: накопленное время, мкс}."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative
+
+
+class TestImportTime(unittest.TestCase):
+    def test_core_import_skips_heavy_modules(self):
+        result = _run_python("-X", "importtime", "-c", "import free_vigilance_reduction.core")
+        cumulative = _parse_importtime(result.stderr)
+
+        self.assertIn("free_vigilance_reduction.core", cumulative)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, cumulative)
+
+    def test_regex_profile_does_not_load_heavy_modules(self):
+        script = (
+            "import sys\n"
+            "from free_vigilance_reduction.config.configuration import ConfigurationProfile\n"
+            "from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer\n"
+            "profile = ConfigurationProfile(profile_id='p', entity_types=['PER'])\n"
+            "profile.use_language_model = False\n"
+            "recognizer = EntityRecognizer(regex_path='missing_regex_patterns.json')\n"
+            "recognizer.regex_patterns = {'PER': 'Иван'}\n"
+            "assert len(recognizer.detect_entities('Иван пришёл', profile)) == 1\n"
+            f"print('loaded:', [m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        result = _run_python("-c", script)
+        self.assertIn("loaded: []", result.stdout.splitlines())
+
+
+if __name__ == "__main__":
+    unittest.main()
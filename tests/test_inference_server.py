@@ -0,0 +1,197 @@
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.backends import FakeBackend, ServerBackend, create_backend
+from free_vigilance_reduction.entity_recognition.backends.server_backend import _UnixHTTPConnection
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+from free_vigilance_reduction.inference_server import InferenceServer
+
+
+class _TrackingBackend(FakeBackend):
+    """Бэкенд, запоминающий наибольшее число одновременных load без release."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+
+    def load(self, llm_settings):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+
+    def release(self):
+        self.active -= 1
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = f"unix://{self.tmp.name}/llm.sock"
+        self.server = InferenceServer(self.address, window_ms=200).start()
+        self.settings = {"backend": "server", "server_backend": "fake", "server_address": self.address}
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.tmp.cleanup()
+
+    def _client(self, settings=None):
+        backend = create_backend("server")
+        backend.load(settings or self.settings)
+        return backend
+
+    def _concurrent(self, requests):
+        barrier = threading.Barrier(len(requests))
+        results = [None] * len(requests)
+
+        def run(i, chunks, entity_types):
+            client = self._client()
+            barrier.wait()
+            results[i] = client.generate_batch(chunks, self.settings, sources=chunks, entity_types=entity_types)
+
+        threads = [threading.Thread(target=run, args=(i, *req)) for i, req in enumerate(requests)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_requests_share_batch(self):
+        requests = [([f"Иван {i}", f"дом {i}"], ["PER"]) for i in range(4)]
+
+        results = self._concurrent(requests)
+
+        for i, outputs in enumerate(results):
+            self.assertEqual(outputs, [f"<PER>Иван</PER> {i}", f"дом {i}"])
+        fake = self.server.batcher.backend("fake")
+        self.assertEqual(sum(fake.calls), 8)
+        self.assertLess(len(fake.calls), 4)
+
+    def test_incompatible_requests_not_merged(self):
+        results = self._concurrent([(["Иван"], ["PER"]), (["Иван"], ["LOC"])])
+
+        self.assertEqual(sorted(r[0] for r in results), ["<LOC>Иван</LOC>", "<PER>Иван</PER>"])
+        self.assertEqual(self.server.batcher.backend("fake").calls, [1, 1])
+
+    def test_tokenize_and_token_count(self):
+        client = self._client()
+
+        ids, offsets = client.tokenize("Иван")
+        client.generate_batch(["Иван"], self.settings, sources=["Иван"], entity_types=["PER"])
+
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(offsets[-1], (3, 4))
+        self.assertEqual(client.generated_tokens, len("<PER>Иван</PER>"))
+
+    def test_tokenize_and_generate_serialized(self):
+        tracking = _TrackingBackend()
+        self.server.batcher.backends["fake"] = tracking
+        barrier = threading.Barrier(6)
+
+        def run(i):
+            client = self._client()
+            barrier.wait()
+            if i % 2:
+                client.tokenize("Иван")
+            else:
+                client.generate_batch(["Иван"], self.settings, sources=["Иван"], entity_types=[f"T{i}"])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(tracking.max_active, 1)
+        self.assertEqual(tracking.active, 0)
+
+    def test_language_model_client_mode(self):
+        profile = ConfigurationProfile(profile_id="srv", entity_types=["PER"], replacement_rules={"PER": "template"})
+        profile.llm_settings.update(dict(self.settings, max_input_tokens=11, batch_size=2))
+        profile.llm_settings["model_path"] = ""
+        profile.validate()
+        lm = LanguageModel()
+        lm.nlp = None
+
+        entities = lm.search_entities("Иван спит. Олег спит. иван", profile)
+
+        self.assertIsInstance(lm.backend, ServerBackend)
+        self.assertEqual([(e.text, e.start_pos) for e in entities], [("Иван", 0), ("Олег", 11)])
+        self.assertGreater(lm.generated_tokens, 0)
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            self._client(dict(self.settings, server_backend="vllm")).tokenize("Иван")
+        with self.assertRaises(ConnectionError):
+            self._client(dict(self.settings, server_address=f"unix://{self.tmp.name}/none.sock")).tokenize("Иван")
+
+    def test_malformed_reply(self):
+        replies = iter([(502, b"<html>Bad Gateway</html>"), (200, b'{"ids": [1, 2')])
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                status, body = next(replies)
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = self._client(dict(self.settings, server_address=f"http://127.0.0.1:{server.server_port}"))
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    client.tokenize("Иван")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_http_address(self):
+        server = InferenceServer("http://127.0.0.1:0").start()
+        try:
+            client = self._client(dict(self.settings, server_address=server.address))
+            self.assertEqual(client.generate_batch(["Иван"], self.settings, entity_types=["PER"]), ["<PER>Иван</PER>"])
+        finally:
+            server.shutdown()
+
+
+class TestInferenceServerCli(unittest.TestCase):
+    def test_health(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "llm.sock")
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "free_vigilance_reduction.inference_server", "--address", f"unix://{path}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                deadline = time.monotonic() + 60
+                while not os.path.exists(path) and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                conn = _UnixHTTPConnection(path, timeout=10)
+                conn.request("GET", "/health")
+                health = json.loads(conn.getresponse().read())
+                conn.close()
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,18 @@
+import os
+import re
+import shutil
+import tempfile
+import time
 import unittest
+from unittest import mock
+
+import torch
+
+from free_vigilance_reduction.entity_recognition.backends import FakeBackend, TransformersBackend
+from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer
 from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
 from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from tests.benchmark import benchmark
 
 
 class TestLanguageModel(unittest.TestCase):
@@ -38,5 +50,350 @@ class TestLanguageModel(unittest.TestCase):
         )
 
 
+class _FakeToken:
+    def __init__(self, text, idx):
+        self.text = text
+        self.idx = idx
+        self.lemma_ = text.lower()
+
+
+def _fake_nlp(text):
+    return [_FakeToken(m.group(), m.start()) for m in re.finditer(r"\w+|[^\w\s]", text)]
+
+
+class _FakeTokenizer:
+    """Токенизатор, который кодирует текст посимвольно и дополняет пакеты слева."""
+
+    pad_token_id = 0
+
+    def encode(self, text, add_special_tokens=False):
+        return [ord(c) for c in text]
+
+    def decode(self, ids, skip_special_tokens=False, **kwargs):
+        return "".join(chr(int(i)) for i in ids if int(i) != self.pad_token_id)
+
+    def __call__(self, texts, return_tensors=None, padding=False, add_special_tokens=True,
+                 return_offsets_mapping=False):
+        if return_offsets_mapping:
+            return {"input_ids": self.encode(texts), "offset_mapping": [(i, i + 1) for i in range(len(texts))]}
+        if isinstance(texts, str):
+            texts = [texts]
+        encoded = [self.encode(t) for t in texts]
+        width = max(len(ids) for ids in encoded)
+        input_ids = [[self.pad_token_id] * (width - len(ids)) + ids for ids in encoded]
+        mask = [[0] * (width - len(ids)) + [1] * len(ids) for ids in encoded]
+        return {"input_ids": torch.tensor(input_ids), "attention_mask": torch.tensor(mask)}
+
+
+class _FakeModel:
+    """Модель, которая дописывает к каждому промпту ответ reply(prompt)."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.batch_sizes = []
+
+    def generate(self, input_ids, attention_mask=None, **kwargs):
+        self.batch_sizes.append(input_ids.shape[0])
+        tokenizer = _FakeTokenizer()
+        replies = [tokenizer.encode(self.reply(tokenizer.decode(row))) for row in input_ids]
+        width = max(len(r) for r in replies)
+        rows = [
+            row.tolist() + r + [tokenizer.pad_token_id] * (width - len(r))
+            for row, r in zip(input_ids, replies)
+        ]
+        return torch.tensor(rows)
+
+
+def _prompt_chunk(prompt):
+    """Текст чанка, вставленный в промпт."""
+    return prompt.split("Текст для анализа:\n\n", 1)[1].rsplit("\n\nРазмеченный текст", 1)[0]
+
+
+def _use_fakes(lm, reply):
+    """Подставляет поддельные токенизатор и модель. Профили с ними должны отключать cache_prompt_prefix."""
+    backend = TransformersBackend()
+    backend.tokenizer = _FakeTokenizer()
+    backend.model = _FakeModel(reply)
+    backend.device = torch.device("cpu")
+    lm.backend = backend
+    return backend.model
+
+
+class TestLanguageModelSpacyLoad(unittest.TestCase):
+    def test_spacy_loaded_once_for_many_documents(self):
+        profile = ConfigurationProfile(profile_id="test_profile", entity_types=["PER"])
+        profile.use_dictionary = False
+        profile.use_regex = False
+        profile.use_language_model = True
+        profile.llm_settings["cache_prompt_prefix"] = False
+
+        with mock.patch("spacy.load", return_value=_fake_nlp) as spacy_load:
+            recognizer = EntityRecognizer(regex_path="missing_regex_patterns.json")
+            _use_fakes(recognizer.language_model, lambda prompt: "<PER>Иван</PER> и <PER>ПЕТРОВ</PER>")
+
+            for i in range(100):
+                text = f"Документ {i}: Иван встретил петров у входа."
+                entities = recognizer.detect_entities(text, profile)
+                self.assertEqual([e.text for e in entities], ["Иван", "петров"])
+
+        self.assertEqual(spacy_load.call_count, 1)
+
+
+class TestLanguageModelBatching(unittest.TestCase):
+    def setUp(self):
+        self.profile = ConfigurationProfile(profile_id="test_profile", entity_types=["PER"])
+        # Каждое предложение текстов ниже занимает ровно один чанк.
+        self.profile.llm_settings.update(
+            {"max_input_tokens": 11, "batch_size": 4, "cache_prompt_prefix": False}
+        )
+        self.lm = LanguageModel()
+        self.lm.nlp = None
+
+    def test_outputs_map_back_to_documents(self):
+        # Модель размечает первое слово своего чанка.
+        model = _use_fakes(self.lm, lambda p: f"<PER>{_prompt_chunk(p).split()[0]}</PER>")
+        texts = [
+            "Анна спит. Олег спит. Вера спит.",
+            "Глеб спит.",
+            "Инна спит. Егор спит.",
+        ]
+        results = self.lm.search_entities_batch(texts, self.profile)
+
+        self.assertEqual([e.text for e in results[0]], ["Анна", "Олег", "Вера"])
+        self.assertEqual([e.text for e in results[1]], ["Глеб"])
+        self.assertEqual([e.text for e in results[2]], ["Инна", "Егор"])
+        self.assertEqual(sum(model.batch_sizes), 6)
+        self.assertTrue(all(size <= 4 for size in model.batch_sizes))
+
+    def test_chunks_carry_source_offsets(self):
+        _use_fakes(self.lm, lambda p: "")
+        text = "Анна спит. Олег спит. Анна спит."
+        self.assertEqual(
+            [(c, text[s:s + len(c)]) for s, c in self.lm._chunk_text(text, 11, 0)],
+            [("Анна спит. ", "Анна спит. "), ("Олег спит. ", "Олег спит. "), ("Анна спит.", "Анна спит.")]
+        )
+
+    def test_exact_strings_found_in_untagged_chunks(self):
+        # Модель размечает "Анна" только во втором чанке, но повторы находятся во всём документе.
+        _use_fakes(self.lm, lambda p: "<PER>Анна</PER>" if _prompt_chunk(p).startswith("Олег") else "")
+        entities = self.lm.search_entities("Анна спит. Олег спит. Анна спит.", self.profile)
+        self.assertEqual([(e.text, e.start_pos, e.end_pos) for e in entities], [("Анна", 0, 4), ("Анна", 22, 26)])
+
+    def test_residue_resolved_inside_chunk_window(self):
+        # "АННА" не встречается точно и ищется по лемме только в чанке, где её вернула модель.
+        self.lm.nlp = _fake_nlp
+        _use_fakes(self.lm, lambda p: "<PER>АННА</PER>" if _prompt_chunk(p).startswith("Олег") else "")
+        entities = self.lm.search_entities("Анна спит. Олег и Анна. Анна спит.", self.profile)
+        self.assertEqual([(e.text, e.start_pos) for e in entities], [("Анна", 18)])
+
+    def test_residue_matched_on_lemma_sequences_with_one_parse(self):
+        parsed = []
+        self.lm.nlp = lambda text: parsed.append(text) or _fake_nlp(text)
+        tags = "".join(f"<PER>ИВАН ПЕТРОВ{i}</PER>" for i in range(20))
+        _use_fakes(self.lm, lambda p: tags + "<PER>ОЛЕГ ИВАНОВ</PER>")
+        self.profile.llm_settings["max_input_tokens"] = 2000
+        text = "Вчера Олег  Иванов и Иван Петров5 пришли."
+
+        entities = self.lm.search_entities(text, self.profile)
+
+        self.assertEqual([(e.text, e.start_pos) for e in entities], [("Олег  Иванов", 6), ("Иван Петров5", 21)])
+        self.assertEqual(parsed.count(text), 1)
+
+    def test_prompt_tags_not_parsed_as_entities(self):
+        _use_fakes(self.lm, lambda p: "")
+        self.assertEqual(self.lm.search_entities("Анна спит.", self.profile), [])
+
+
+class TestLanguageModelSpansMode(unittest.TestCase):
+    def setUp(self):
+        self.profile = ConfigurationProfile(profile_id="test_profile", entity_types=["PER", "LOC"])
+        self.profile.llm_settings.update({"output_mode": "spans", "cache_prompt_prefix": False})
+        self.lm = LanguageModel()
+        self.lm.nlp = None
+
+    def test_parse_spans(self):
+        output = "PER: Иван Петров\n- LOC: «Казань»\nORG: Газпром\n2. PER: Иван Петров\nпросто текст"
+        self.assertEqual(
+            self.lm._parse_spans(output, self.profile.entity_types),
+            [("PER", "Иван Петров"), ("LOC", "Казань")]
+        )
+
+    def test_prompt_requests_span_list(self):
+        prompt = self.lm._generate_prompt("Иван спит.", self.profile)
+        self.assertIn("ТИП: фрагмент", prompt)
+        self.assertNotIn("<PER>", prompt)
+
+    def test_spans_located_in_text(self):
+        _use_fakes(self.lm, lambda p: "PER: Иван\nLOC: Казань")
+        entities = self.lm.search_entities("Иван уехал в Казань, Иван вернулся.", self.profile)
+        self.assertEqual(
+            [(e.text, e.entity_type, e.start_pos) for e in entities],
+            [("Иван", "PER", 0), ("Казань", "LOC", 13), ("Иван", "PER", 21)]
+        )
+
+    def test_spans_generate_fewer_tokens_than_echo(self):
+        text = "Вчера Иван переехал из Москвы в Казань, где Иван работает в Газпроме."
+        measured = {}
+        for mode in ("echo", "spans"):
+            profile = ConfigurationProfile(profile_id=mode, entity_types=["PER"])
+            profile.llm_settings.update({"backend": "fake", "output_mode": mode, "max_new_tokens": 256})
+            lm = LanguageModel()
+            lm.nlp = None
+
+            entities = lm.search_entities(text, profile)
+
+            measured[mode] = (lm.backend.generated_tokens, [(e.text, e.start_pos) for e in entities])
+
+        self.assertEqual(measured["spans"][1], measured["echo"][1])
+        self.assertLess(measured["spans"][0], measured["echo"][0])
+
+
+class TestLanguageModelResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.profile = ConfigurationProfile(profile_id="test_profile", entity_types=["PER"])
+        self.profile.llm_settings.update({
+            "cache_prompt_prefix": False,
+            "deterministic": True,
+            "result_cache_path": os.path.join(self.temp_dir, "llm_cache.sqlite"),
+        })
+        self.lm = LanguageModel()
+        self.lm.nlp = None
+        self.model = _use_fakes(self.lm, lambda p: f"<PER>{_prompt_chunk(p).split()[0]}</PER>")
+
+    def tearDown(self):
+        for cache in self.lm._result_caches.values():
+            cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cache_hit_skips_generation(self):
+        first = self.lm.search_entities("Анна спит.", self.profile)
+        second = self.lm.search_entities("Анна спит.", self.profile)
+
+        self.assertEqual(len(self.model.batch_sizes), 1)
+        self.assertEqual([e.text for e in second], [e.text for e in first])
+        stats = self.lm._get_result_cache(self.profile.llm_settings).stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_only_missing_chunks_are_generated(self):
+        self.profile.llm_settings["max_input_tokens"] = 11
+        self.lm.search_entities("Анна спит. ", self.profile)
+        entities = self.lm.search_entities("Анна спит. Олег спит.", self.profile)
+
+        self.assertEqual(self.model.batch_sizes, [1, 1])
+        self.assertEqual([e.text for e in entities], ["Анна", "Олег"])
+
+    def test_cache_keyed_on_precision(self):
+        self.lm.search_entities("Анна спит.", self.profile)
+        self.profile.llm_settings["dtype"] = "float16"
+        self.lm.search_entities("Анна спит.", self.profile)
+
+        self.assertEqual(len(self.model.batch_sizes), 2)
+
+    def test_cache_keyed_on_backend(self):
+        self.lm.search_entities("Анна спит.", self.profile)
+        self.lm.backend = FakeBackend()
+        self.profile.llm_settings["backend"] = "fake"
+        entities = self.lm.search_entities("Анна спит.", self.profile)
+
+        self.assertEqual(len(self.model.batch_sizes), 1)
+        self.assertEqual(self.lm.backend.calls, [1])
+        self.assertEqual([e.text for e in entities], ["Анна"])
+
+    def test_cache_unused_when_sampling(self):
+        self.profile.llm_settings["deterministic"] = False
+        self.profile.llm_settings["temperature"] = 0.5
+        self.lm.search_entities("Анна спит.", self.profile)
+        self.lm.search_entities("Анна спит.", self.profile)
+
+        self.assertEqual(len(self.model.batch_sizes), 2)
+        self.assertEqual(self.lm._result_caches, {})
+
+
+class TestLanguageModelTinyModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from tests.tiny_llm import tiny_model_path
+        cls.settings = {
+            "model_path": tiny_model_path(),
+            "max_new_tokens": 8,
+            "temperature": 0.0,
+        }
+        cls.lm = LanguageModel()
+        cls.lm._initialize(cls.settings)
+
+    def test_batched_generation_matches_single(self):
+        prompts = ["Иван", "Мария Петровна живёт здесь", "Москва, ул. Ленина, д. 1", "x"]
+        single = self.lm._generate(prompts, dict(self.settings, batch_size=1))
+        batched = self.lm._generate(prompts, dict(self.settings, batch_size=4))
+        self.assertEqual(batched, single)
+
+    def test_prefix_cache_matches_full_prompt(self):
+        profile = ConfigurationProfile(profile_id="prefix", entity_types=["PER", "LOC"])
+        prefix = self.lm._prompt_prefix(profile)
+        suffixes = [self.lm._prompt_suffix(t, profile) for t in ("Иван", "Мария живёт в Москве", "Казань")]
+
+        for batch_size in (1, 3):
+            settings = dict(self.settings, batch_size=batch_size)
+            full = self.lm._generate(suffixes, dict(settings, cache_prompt_prefix=False), prefix=prefix)
+            cached = self.lm._generate(suffixes, settings, prefix=prefix, profile_id="prefix")
+            self.assertEqual(cached, full)
+
+        self.assertEqual(
+            [key[:2] for key in self.lm.backend._prefix_cache],
+            [("prefix", self.settings["model_path"])]
+        )
+
+    def test_chunks_are_slices_of_source(self):
+        text = "Иван Петров переехал в Казань. " * 20 + "Конец."
+        chunks = self.lm._chunk_text(text, 40, 8)
+
+        self.assertGreater(len(chunks), 1)
+        for start, chunk in chunks:
+            self.assertEqual(text[start:start + len(chunk)], chunk)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertTrue(text.endswith(chunks[-1][1]))
+
+    def test_constrained_decoding_reproduces_chunk(self):
+        profile = ConfigurationProfile(profile_id="constrained", entity_types=["PER", "LOC"])
+        chunks = ["Иван Петров переехал в Казань.", "Мария <b> живёт здесь", "x"]
+        settings = dict(self.settings, max_new_tokens=600, batch_size=2, constrained_decoding=True,
+                        cache_prompt_prefix=False)
+
+        tokens_before = self.lm.generated_tokens
+        outputs = self.lm._generate(
+            [self.lm._prompt_suffix(chunk, profile) for chunk in chunks],
+            settings,
+            prefix=self.lm._prompt_prefix(profile),
+            sources=chunks,
+            entity_types=profile.entity_types
+        )
+
+        for output, chunk in zip(outputs, chunks):
+            self.assertEqual(re.sub(r"</?(PER|LOC)>", "", output), chunk)
+            self.assertEqual(output.count("<PER>") + output.count("<LOC>"), output.count("</"))
+        # Генерация останавливается, как только чанк воспроизведён.
+        self.assertLess(self.lm.generated_tokens - tokens_before, 600 * len(chunks))
+
+    @benchmark
+    def test_benchmark_tokens_per_second(self):
+        """Пропускная способность генерации при размерах пакета 1, 4 и 8."""
+        profile = ConfigurationProfile(profile_id="bench", entity_types=["PER", "LOC"])
+        chunks = [f"Документ {i}: Иван Петров переехал в Казань в {2000 + i} году." for i in range(8)]
+        prompts = [self.lm._generate_prompt(chunk, profile) for chunk in chunks]
+
+        throughput = {}
+        for batch_size in (1, 4, 8):
+            settings = dict(self.settings, batch_size=batch_size, max_new_tokens=32)
+            tokens_before = self.lm.generated_tokens
+            started = time.perf_counter()
+            self.lm._generate(prompts, settings)
+            elapsed = time.perf_counter() - started
+            tokens = self.lm.generated_tokens - tokens_before
+            throughput[batch_size] = tokens / elapsed
+
+        self.assertGreater(throughput[8], throughput[1])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import unittest
+
+from free_vigilance_reduction.entity_recognition.lemma_index import LemmaIndex
+
+
+class _Token:
+    def __init__(self, text, idx, lemma):
+        self.text = text
+        self.idx = idx
+        self.lemma_ = lemma
+
+
+class TestLemmaIndex(unittest.TestCase):
+    def setUp(self):
+        # "Ивана Петрова видели в Москве, Иван Петров уехал."
+        self.index = LemmaIndex.from_doc([
+            _Token("Ивана", 0, "Иван"),
+            _Token("Петрова", 6, "петров"),
+            _Token("видели", 14, "видеть"),
+            _Token(" ", 20, " "),
+            _Token("в", 21, "в"),
+            _Token("Москве", 23, "москва"),
+            _Token(",", 29, ","),
+            _Token("Иван", 31, "иван"),
+            _Token("Петров", 36, "петров"),
+            _Token("уехал", 43, "уехать"),
+            _Token(".", 48, "."),
+        ])
+
+    def test_whitespace_tokens_skipped(self):
+        self.assertEqual(len(self.index), 10)
+
+    def test_find_sequence(self):
+        self.assertEqual(self.index.find(["иван", "петров"]), [(0, 13), (31, 42)])
+        self.assertEqual(self.index.find(["москва"]), [(23, 29)])
+
+    def test_find_in_range(self):
+        self.assertEqual(self.index.find(["иван", "петров"], 14), [(31, 42)])
+        self.assertEqual(self.index.find(["иван", "петров"], 0, 40), [(0, 13)])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.find(["иван", "москва"]), [])
+        self.assertEqual(self.index.find(["казань"]), [])
+        self.assertEqual(self.index.find(["уехать", ".", "иван"]), [])
+        self.assertEqual(self.index.find([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
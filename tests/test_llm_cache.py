@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from free_vigilance_reduction.entity_recognition.llm_cache import LLMResultCache
+
+
+class TestLLMResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "llm_cache.sqlite")
+        self.cache = LLMResultCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _key(self, chunk, **overrides):
+        args = {
+            "model_path": "/models/tiny",
+            "prompt_template": "Промпт",
+            "entity_types": ["PER"],
+            "generation_settings": {"max_new_tokens": 16, "greedy": True},
+        }
+        args.update(overrides)
+        return LLMResultCache.make_key(chunk=chunk, **args)
+
+    def test_get_and_put(self):
+        key = self._key("Иван пришёл.")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, [("PER", "Иван")])
+        self.assertEqual(self.cache.get(key), [("PER", "Иван")])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_persists_between_instances(self):
+        key = self._key("Иван пришёл.")
+        self.cache.put(key, [("PER", "Иван")])
+        self.cache.close()
+
+        self.cache = LLMResultCache(self.path)
+        self.assertEqual(self.cache.get(key), [("PER", "Иван")])
+
+    def test_key_depends_on_all_inputs(self):
+        base = self._key("Текст")
+        self.assertNotEqual(base, self._key("Текст!"))
+        self.assertNotEqual(base, self._key("Текст", model_path="/models/other"))
+        self.assertNotEqual(base, self._key("Текст", prompt_template="Другой промпт"))
+        self.assertNotEqual(base, self._key("Текст", entity_types=["PER", "LOC"]))
+        self.assertNotEqual(
+            base, self._key("Текст", generation_settings={"max_new_tokens": 32, "greedy": True})
+        )
+        self.assertEqual(base, self._key("Текст"))
+
+    def test_evicts_least_recently_used(self):
+        keys = [self._key(f"чанк {i}") for i in range(3)]
+        self.cache.put(keys[0], [("PER", "а" * 50)])
+        entry_size = self.cache.stats()["size_bytes"]
+        self.cache.max_bytes = 2 * entry_size
+
+        self.cache.put(keys[1], [("PER", "б" * 50)])
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], [("PER", "в" * 50)])
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertLessEqual(self.cache.stats()["size_bytes"], self.cache.max_bytes)
+
+    def test_size_counter_tracks_replacements(self):
+        key = self._key("Иван пришёл.")
+        self.cache.put(key, [("PER", "Иван")])
+        self.cache.put(key, [("PER", "Иван"), ("PER", "Пётр")])
+        self.cache.put(self._key("Пётр ушёл."), [])
+
+        self.assertEqual(self.cache._total, self.cache.stats()["size_bytes"])
+        self.cache.close()
+        self.cache = LLMResultCache(self.path)
+        self.assertEqual(self.cache._total, self.cache.stats()["size_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
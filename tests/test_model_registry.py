@@ -0,0 +1,145 @@
+import shutil
+import tempfile
+import threading
+import unittest
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+from free_vigilance_reduction.entity_recognition.model_registry import LoadedModel, ModelRegistry
+from tests.tiny_llm import build_tiny_model
+
+
+class TestModelRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.paths = [build_tiny_model(f"{cls.temp_dir}/m{i}", seed=i) for i in range(3)]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def _settings(self, i, **extra):
+        return dict({"model_path": self.paths[i], "device": "cpu"}, **extra)
+
+    def test_same_key_shares_model(self):
+        registry = ModelRegistry()
+        first = registry.acquire(self._settings(0))
+        second = registry.acquire(self._settings(0, device="CPU"))
+        other = registry.acquire(self._settings(1))
+
+        self.assertIs(first, second)
+        self.assertIsNot(first.model, other.model)
+        self.assertEqual(first.in_use, 2)
+
+    def test_dtype_is_part_of_key(self):
+        registry = ModelRegistry()
+        full = registry.acquire(self._settings(0))
+        half = registry.acquire(self._settings(0, dtype="bfloat16"))
+
+        self.assertEqual(str(half.model.dtype), "torch.bfloat16")
+        self.assertLess(half.size_bytes, full.size_bytes * 0.6)
+
+    def test_lru_unload_under_budget(self):
+        probe = ModelRegistry()
+        size = probe.acquire(self._settings(0)).size_bytes
+        registry = ModelRegistry(max_bytes=int(size * 2.5))
+
+        loaded = [registry.acquire(self._settings(i)) for i in range(2)]
+        for m in loaded:
+            registry.release(m)
+        registry.release(registry.acquire(self._settings(0)))
+        third = registry.acquire(self._settings(2))
+
+        # Модель 1 использовалась давнее всех и выгружена.
+        self.assertEqual([r["model_path"] for r in registry.residency()], [self.paths[0], self.paths[2]])
+        self.assertFalse(loaded[1].resident)
+        self.assertTrue(loaded[0].resident and third.resident)
+        self.assertLessEqual(registry.resident_bytes, registry.max_bytes)
+
+    def test_models_in_use_are_not_unloaded(self):
+        probe = ModelRegistry()
+        size = probe.acquire(self._settings(0)).size_bytes
+        registry = ModelRegistry(max_bytes=size)
+
+        busy = registry.acquire(self._settings(0))
+        registry.acquire(self._settings(1))
+
+        self.assertTrue(busy.resident)
+        self.assertEqual(len(registry.residency()), 2)
+        registry.release(busy)
+        self.assertFalse(busy.resident)
+        self.assertEqual(
+            [(r["model_path"], r["in_use"]) for r in registry.residency()],
+            [(self.paths[1], 1)]
+        )
+
+    def test_load_does_not_block_other_models(self):
+        started = threading.Event()
+        finish = threading.Event()
+        loads = []
+
+        def loader(key, settings):
+            loads.append(key[0])
+            if key[0] == "slow":
+                started.set()
+                self.assertTrue(finish.wait(10))
+            return LoadedModel(key, None, object(), None, 1)
+
+        registry = ModelRegistry(loader=loader)
+        fast = registry.acquire({"model_path": "fast"})
+        registry.release(fast)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.acquire({"model_path": "slow"})))
+            for _ in range(2)
+        ]
+        for t in threads:
+            t.start()
+        self.assertTrue(started.wait(10))
+
+        # Пока "slow" загружается, готовая модель и отчёт доступны без ожидания.
+        ready = []
+        probe = threading.Thread(
+            target=lambda: ready.append((registry.acquire({"model_path": "fast"}), registry.residency()))
+        )
+        probe.start()
+        probe.join(5)
+        blocked = probe.is_alive()
+        finish.set()
+        probe.join()
+        self.assertFalse(blocked)
+        self.assertIs(ready[0][0], fast)
+        self.assertEqual(len(ready[0][1]), 1)
+
+        for t in threads:
+            t.join()
+        self.assertIs(results[0], results[1])
+        self.assertEqual(loads, ["fast", "slow"])
+
+    def test_missing_path(self):
+        with self.assertRaises(ValueError):
+            ModelRegistry().acquire({"model_path": f"{self.temp_dir}/missing"})
+
+    def test_language_model_follows_profile_model(self):
+        registry = ModelRegistry()
+        lm = LanguageModel(registry=registry)
+        lm.nlp = None
+        profiles = []
+        for i in range(2):
+            profile = ConfigurationProfile(profile_id=f"p{i}", entity_types=["PER"])
+            profile.llm_settings.update(self._settings(i, max_new_tokens=2))
+            profiles.append(profile)
+
+        models = []
+        for profile in profiles + profiles[:1]:
+            lm.search_entities("Иван", profile)
+            models.append(lm.backend.model)
+
+        self.assertIsNot(models[0], models[1])
+        self.assertIs(models[0], models[2])
+        self.assertEqual([r["in_use"] for r in registry.residency()], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import torch
+
+from free_vigilance_reduction.entity_recognition import model_registry
+from free_vigilance_reduction.entity_recognition.model_registry import ModelRegistry
+from tests.tiny_llm import build_tiny_model, tiny_model_path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+CORPUS = [
+    "Иван Петров переехал в Казань в 2019 году.",
+    "Договор подписала Мария Сидорова, паспорт 4510 123456.",
+    "Звоните Олегу по телефону +7 912 345-67-89 или пишите на oleg@example.com.",
+    "Анна Смирнова работает в ООО «Ромашка» в Москве.",
+]
+
+# Загрузка модели, поиск по корпусу и замеры в отдельном процессе, чтобы пиковый RSS
+# каждого варианта измерялся независимо.
+_BENCH_SCRIPT = """
+import json, resource, sys, time
+import torch, transformers
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.language_model import LanguageModel
+from free_vigilance_reduction.entity_recognition.model_registry import ModelRegistry
+
+model_path, dtype, quantized_path, corpus = sys.argv[1], sys.argv[2], sys.argv[3], json.loads(sys.argv[4])
+profile = ConfigurationProfile(profile_id="bench", entity_types=["PER", "LOC"])
+profile.llm_settings.update({
+    "model_path": model_path, "dtype": dtype, "quantized_model_path": quantized_path,
+    "max_new_tokens": 64, "batch_size": 4, "deterministic": True,
+})
+registry = ModelRegistry()
+lm = LanguageModel(registry=registry)
+lm.nlp = None
+
+started = time.perf_counter()
+registry.release(registry.acquire(profile.llm_settings))
+load_seconds = time.perf_counter() - started
+started = time.perf_counter()
+results = lm.search_entities_batch(corpus, profile)
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tokens_per_sec": lm.generated_tokens / elapsed,
+    "size_bytes": registry.residency()[0]["size_bytes"],
+    "entities": [[[e.start_pos, e.end_pos, e.entity_type] for e in doc] for doc in results],
+}))
+"""
+
+
+def _agreement(reference, candidate):
+    """F1 совпадения сущностей (начало, конец, тип) с эталоном; 1.0, если обе стороны пусты."""
+    ref = {(d, *e) for d, doc in enumerate(reference) for e in doc}
+    got = {(d, *e) for d, doc in enumerate(candidate) for e in doc}
+    if not ref and not got:
+        return 1.0
+    return 2 * len(ref & got) / (len(ref) + len(got))
+
+
+class _Payload:
+    """Объект, отмечающий, что его распаковали из pickle."""
+
+    unpickled = False
+
+    def __reduce__(self):
+        return (_mark_unpickled, ())
+
+
+def _mark_unpickled():
+    _Payload.unpickled = True
+    return {}
+
+
+class TestInt8Quantization(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = build_tiny_model(os.path.join(self.temp_dir, "model"))
+        self.quantized_path = os.path.join(self.temp_dir, "q", "model.int8.pt")
+        self.settings = {
+            "model_path": self.model_path,
+            "dtype": "int8",
+            "quantized_model_path": self.quantized_path,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_linear_layers_quantized(self):
+        fp32 = ModelRegistry().acquire({"model_path": self.model_path})
+        int8 = ModelRegistry().acquire(self.settings)
+
+        q_proj = int8.model.model.layers[0].self_attn.q_proj
+        self.assertIsInstance(q_proj, torch.ao.nn.quantized.dynamic.Linear)
+        self.assertLess(int8.size_bytes, fp32.size_bytes)
+
+        ids = torch.tensor([[5, 6, 7, 8]])
+        fp32_logits = fp32.model(ids).logits
+        int8_logits = int8.model(ids).logits
+        self.assertLess((fp32_logits - int8_logits).abs().max().item(), 0.1)
+
+    def test_saved_quantization_reused(self):
+        first = ModelRegistry().acquire(self.settings)
+        self.assertTrue(os.path.isfile(self.quantized_path))
+
+        # Исходные веса не читаются: структура строится по конфигурации.
+        with mock.patch.object(model_registry, "_load_pretrained", side_effect=AssertionError):
+            second = ModelRegistry().acquire(self.settings)
+
+        ids = torch.tensor([[5, 6, 7]])
+        self.assertTrue(torch.equal(first.model(ids).logits, second.model(ids).logits))
+
+    def test_stale_quantization_redone(self):
+        ModelRegistry().acquire(self.settings)
+        weights = Path(self.model_path, "model.safetensors")
+        os.utime(weights, (time.time() + 10, time.time() + 10))
+
+        with mock.patch(
+            "torch.ao.quantization.quantize_dynamic", wraps=torch.ao.quantization.quantize_dynamic
+        ) as quantize:
+            ModelRegistry().acquire(self.settings)
+        self.assertEqual(quantize.call_count, 1)
+
+    def test_pickled_module_not_loaded(self):
+        os.makedirs(os.path.dirname(self.quantized_path))
+        torch.save(_Payload(), self.quantized_path)
+
+        with mock.patch(
+            "torch.ao.quantization.quantize_dynamic", wraps=torch.ao.quantization.quantize_dynamic
+        ) as quantize:
+            ModelRegistry().acquire(self.settings)
+        self.assertEqual(quantize.call_count, 1)
+        self.assertFalse(_Payload.unpickled)
+
+    def test_quantization_of_other_model_redone(self):
+        ModelRegistry().acquire(self.settings)
+        other_path = build_tiny_model(os.path.join(self.temp_dir, "other"), seed=1)
+        os.utime(self.quantized_path, (time.time() + 10, time.time() + 10))
+
+        with mock.patch(
+            "torch.ao.quantization.quantize_dynamic", wraps=torch.ao.quantization.quantize_dynamic
+        ) as quantize:
+            ModelRegistry().acquire(dict(self.settings, model_path=other_path))
+        self.assertEqual(quantize.call_count, 1)
+
+    def test_key_precision(self):
+        self.assertEqual(ModelRegistry.make_key({"model_path": "m", "device": "cuda", "dtype": "int8"})[1:], ("cpu", "int8"))
+        with mock.patch.object(model_registry, "_cpu_supports_bf16", return_value=False):
+            self.assertEqual(ModelRegistry.make_key({"model_path": "m", "dtype": "bfloat16"})[2], "float32")
+
+
+class TestQuantizationBenchmark(unittest.TestCase):
+    def test_benchmark_precisions(self):
+        """Время загрузки, пиковый RSS, токены/с и согласие с float32 на фиксированном корпусе.
+
+        По умолчанию используется крошечная модель; для настоящей укажите FVR_BENCH_MODEL_PATH.
+        """
+        model_path = os.getenv("FVR_BENCH_MODEL_PATH") or tiny_model_path()
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        quantized_path = os.path.join(temp_dir, "model.int8.pt")
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+        runs = {}
+        for name, dtype in (("float32", "float32"), ("bfloat16", "bfloat16"), ("int8", "int8"), ("int8 (с диска)", "int8")):
+            result = subprocess.run(
+                [sys.executable, "-c", _BENCH_SCRIPT, model_path, dtype, quantized_path, json.dumps(CORPUS)],
+                cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=1800, check=True,
+            )
+            runs[name] = json.loads(result.stdout.strip().splitlines()[-1])
+
+        print(f"\n{'вариант':<16}{'загрузка, с':>12}{'RSS, МБ':>10}{'токен/с':>10}{'веса, МБ':>10}{'согласие':>10}")
+        for name, run in runs.items():
+            run["agreement"] = _agreement(runs["float32"]["entities"], run["entities"])
+            print(
+                f"{name:<16}{run['load_seconds']:>12.2f}{run['peak_rss_mb']:>10.0f}{run['tokens_per_sec']:>10.0f}"
+                f"{run['size_bytes'] / 2 ** 20:>10.2f}{run['agreement']:>10.2f}"
+            )
+
+        self.assertLess(runs["bfloat16"]["size_bytes"], runs["float32"]["size_bytes"])
+        self.assertLess(runs["int8"]["size_bytes"], runs["float32"]["size_bytes"])
+        self.assertEqual(runs["int8"]["entities"], runs["int8 (с диска)"]["entities"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import random
+import re
+import time
+import tempfile
+import json
+import os
+from free_vigilance_reduction.entity_recognition.regex_scanner import RegexScanner
+from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer
+from free_vigilance_reduction.entity_recognition.entity import Entity
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from tests.benchmark import benchmark
+
+
+BASE_PATTERNS = {
+    "PHONE": r"\+7 \([0-9]{3}\) [0-9]{3}-[0-9]{2}-[0-9]{2}",
+    "EMAIL": r"[\w.-]+@[\w.-]+\.[a-z]{2,4}",
+    "DATE": r"\b\d{1,2}[./-]\d{1,2}[./-]\d{2,4}\b",
+    "INN": r"\b\d{10}\b",
+    "SNILS": r"\b\d{3}-\d{3}-\d{3} \d{2}\b",
+}
+
+
+def _make_patterns(count):
+    patterns = dict(BASE_PATTERNS)
+    i = 0
+    while len(patterns) < count:
+        patterns[f"CODE{i}"] = rf"\bКОД{i}-\d{{4,8}}\b"
+        i += 1
+    return dict(list(patterns.items())[:count])
+
+
+def _make_text(size, seed=0):
+    rng = random.Random(seed)
+    words = ["договор", "поставки", "Иван", "Москва", "сумма", "руб.", "от", "и", "в", "2023"]
+    parts, length = [], 0
+    while length < size:
+        r = rng.random()
+        if r < 0.02:
+            part = f"+7 ({rng.randint(100, 999)}) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}"
+        elif r < 0.04:
+            part = f"user{rng.randint(1, 99)}@mail.ru"
+        elif r < 0.06:
+            part = f"{rng.randint(1, 28)}.{rng.randint(1, 12)}.20{rng.randint(10, 30)}"
+        elif r < 0.07:
+            part = f"КОД{rng.randint(0, 60)}-{rng.randint(1000, 99999)}"
+        else:
+            part = rng.choice(words)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def _legacy_apply_regex(text, patterns, entity_types):
+    """
+    Прежний вариант: re.finditer по каждому шаблону без кэширования.
+    """
+    found = []
+    for etype in entity_types:
+        pattern = patterns.get(etype)
+        if not pattern:
+            continue
+        for m in re.finditer(pattern, text):
+            found.append(Entity(m.group(), etype, m.start(), m.end()))
+    return found
+
+
+class TestRegexScanner(unittest.TestCase):
+    def test_same_output_as_legacy_loop(self):
+        patterns = _make_patterns(20)
+        text = _make_text(20_000)
+        scanner = RegexScanner(patterns, list(patterns))
+        self.assertEqual(
+            scanner.find_matches(text),
+            _legacy_apply_regex(text, patterns, list(patterns))
+        )
+
+    def test_invalid_and_missing_patterns_are_skipped(self):
+        scanner = RegexScanner({"BAD": "(", "EMAIL": BASE_PATTERNS["EMAIL"]}, ["BAD", "EMAIL", "PHONE"])
+        self.assertEqual([etype for etype, _ in scanner.compiled], ["EMAIL"])
+        self.assertEqual(scanner.find_matches("почта: a@b.ru")[0].text, "a@b.ru")
+
+    def test_recognizer_caches_scanner_per_entity_types(self):
+        regex_file = tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json")
+        json.dump(BASE_PATTERNS, regex_file)
+        regex_file.close()
+        try:
+            recognizer = EntityRecognizer(regex_path=regex_file.name)
+            first = ConfigurationProfile(profile_id="a", entity_types=["EMAIL", "DATE"])
+            second = ConfigurationProfile(profile_id="b", entity_types=["EMAIL", "DATE"])
+            recognizer._apply_regex("a@b.ru 01.02.2023", first)
+            recognizer._apply_regex("a@b.ru 01.02.2023", second)
+            self.assertEqual(len(recognizer._regex_scanners), 1)
+        finally:
+            os.unlink(regex_file.name)
+
+
+class TestRegexScannerBenchmark(unittest.TestCase):
+    """
+    Сравнение времени поиска на мегабайт текста для 5, 20 и 50 шаблонов.
+    """
+
+    TEXT_SIZE = 256 * 1024
+
+    def _per_mb(self, func):
+        start = time.perf_counter()
+        result = func()
+        return (time.perf_counter() - start) * (1024 * 1024) / self.TEXT_SIZE, result
+
+    def test_matches_legacy_loop(self):
+        text = _make_text(self.TEXT_SIZE // 8, seed=1)
+        for count in (5, 20, 50):
+            patterns = _make_patterns(count)
+            types = list(patterns)
+            scanner = RegexScanner(patterns, types)
+
+            self.assertEqual(scanner.find_matches(text), _legacy_apply_regex(text, patterns, types))
+
+    @benchmark
+    def test_scan_time_per_mb(self):
+        text = _make_text(self.TEXT_SIZE, seed=1)
+        for count in (20, 50):
+            patterns = _make_patterns(count)
+            types = list(patterns)
+            scanner = RegexScanner(patterns, types)
+
+            legacy_time, _ = self._per_mb(lambda: _legacy_apply_regex(text, patterns, types))
+            scanner_time, _ = self._per_mb(lambda: scanner.find_matches(text))
+
+            self.assertLess(scanner_time, legacy_time, f"шаблонов={count}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import spacy
+
+from free_vigilance_reduction.config.configuration import ConfigurationProfile
+from free_vigilance_reduction.entity_recognition.entity_recognizer import EntityRecognizer
+from free_vigilance_reduction.entity_recognition.spacy_recognizer import SpacyRecognizer, split_segments
+
+
+def _ruler_pipeline(model):
+    nlp = spacy.blank("ru")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "PER", "pattern": "Иван"},
+        {"label": "LOC", "pattern": "Омск"},
+        {"label": "ORG", "pattern": "Яндекс"},
+        {"label": "MISC", "pattern": "Рубль"},
+    ])
+    return nlp
+
+
+class TestSplitSegments(unittest.TestCase):
+    def test_segments_cover_text(self):
+        text = "строка один\nдва\n\nочень длинная строка без переноса\nконец"
+        for max_chars in (1, 5, 16, 100):
+            segments = split_segments(text, max_chars)
+            self.assertEqual("".join(seg for _, seg in segments), text)
+            for offset, seg in segments:
+                self.assertEqual(text[offset:offset + len(seg)], seg)
+        self.assertEqual(len(split_segments(text, 100)), 1)
+        self.assertEqual(split_segments(text, 16)[0], (0, "строка один\nдва\n"))
+
+
+class TestSpacyRecognizer(unittest.TestCase):
+    def setUp(self):
+        self.recognizer = SpacyRecognizer(loader=_ruler_pipeline)
+        self.profile = ConfigurationProfile(
+            profile_id="spacy",
+            entity_types=["PER", "CITY"],
+            replacement_rules={"PER": "x", "CITY": "x"},
+            use_language_model=False,
+            use_spacy_ner=True,
+            spacy_settings={"label_map": {"PER": "PER", "LOC": "CITY", "ORG": "ORG"}, "segment_chars": 10},
+        )
+        self.profile.validate()
+
+    def test_maps_labels_to_profile_types(self):
+        text = "Иван живёт\nв Омск,\nработает в Яндекс за Рубль"
+
+        entities = self.recognizer.find_entities(text, self.profile)
+
+        self.assertEqual(
+            [(e.text, e.entity_type, e.start_pos, e.end_pos) for e in entities],
+            [("Иван", "PER", 0, 4), ("Омск", "CITY", 13, 17)],
+        )
+
+    def test_batch_matches_single_documents(self):
+        texts = ["Иван\nи Омск", "ничего", "Омск\nОмск\nИван"]
+        self.profile.spacy_settings.update({"batch_size": 2, "n_process": 2})
+
+        batch = self.recognizer.find_entities_batch(texts, self.profile)
+
+        self.profile.spacy_settings["n_process"] = 1
+        self.assertEqual(
+            [[e.to_dict() for e in doc] for doc in batch],
+            [[e.to_dict() for e in self.recognizer.find_entities(t, self.profile)] for t in texts],
+        )
+        self.assertEqual([len(doc) for doc in batch], [2, 0, 3])
+
+    def test_pipeline_loaded_once_for_concurrent_calls(self):
+        calls = []
+
+        def slow_loader(model):
+            calls.append(model)
+            time.sleep(0.05)
+            return _ruler_pipeline(model)
+
+        recognizer = SpacyRecognizer(loader=slow_loader)
+        threads = [threading.Thread(target=recognizer.get_pipeline, args=("ru",)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(calls, ["ru"])
+
+    def test_missing_model(self):
+        recognizer = SpacyRecognizer()
+        self.profile.spacy_settings["model"] = "xx_missing_model"
+
+        self.assertEqual(recognizer.find_entities("Иван", self.profile), [])
+
+    def test_unused_components_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            nlp = _ruler_pipeline("ru")
+            nlp.add_pipe("sentencizer")
+            nlp.to_disk(tmp)
+            recognizer = SpacyRecognizer()
+            self.profile.spacy_settings["model"] = tmp
+
+            entities = recognizer.find_entities("Иван из Омск", self.profile)
+
+            self.assertEqual(recognizer.get_pipeline(tmp).pipe_names, ["entity_ruler"])
+            self.assertEqual(len(entities), 2)
+
+    def test_validate(self):
+        self.profile.spacy_settings["n_process"] = 0
+        with self.assertRaises(ValueError):
+            self.profile.validate()
+
+    def test_profile_round_trip(self):
+        restored = ConfigurationProfile.from_dict(self.profile.to_dict())
+
+        self.assertTrue(restored.use_spacy_ner)
+        self.assertEqual(restored.spacy_settings, self.profile.spacy_settings)
+        self.assertFalse(ConfigurationProfile.from_dict({"profile_id": "old"}).use_spacy_ner)
+
+    def test_entity_recognizer_tier(self):
+        self.profile.use_regex = False
+        self.profile.use_dictionary = False
+        recognizer = EntityRecognizer(regex_path="missing.json")
+        recognizer.spacy_recognizer = self.recognizer
+
+        entities = recognizer.detect_entities("Иван из Омск", self.profile)
+
+        self.assertEqual([(e.text, e.entity_type) for e in entities], [("Иван", "PER"), ("Омск", "CITY")])
+
+    def test_entity_recognizer_batch_uses_one_pipe_call(self):
+        self.profile.use_regex = False
+        self.profile.use_dictionary = False
+        recognizer = EntityRecognizer(regex_path="missing.json")
+        recognizer.spacy_recognizer = self.recognizer
+        nlp = self.recognizer.get_pipeline(self.profile.spacy_settings["model"])
+        texts = ["Иван\nи Омск", "ничего", "Омск"]
+
+        with mock.patch.object(nlp, "pipe", wraps=nlp.pipe) as pipe:
+            batch = recognizer.detect_entities_batch(texts, self.profile)
+
+        self.assertEqual(pipe.call_count, 1)
+        self.assertEqual(
+            [[(e.text, e.start_pos) for e in doc] for doc in batch],
+            [[("Иван", 0), ("Омск", 7)], [], [("Омск", 0)]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Крошечная локальная causal LM для тестов и бенчмарков LanguageModel.
+
+Модель со случайными весами и побайтовый BPE-токенизатор создаются во
+временной директории и загружаются тем же путём, что и настоящая модель:
+через AutoTokenizer/AutoModelForCausalLM с local_files_only.
+"""
+
+import atexit
+import shutil
+import tempfile
+from functools import lru_cache
+
+SPECIAL_TOKENS = ["<pad>", "<eos>"]
+
+
+def build_tiny_model(directory: str, seed: int = 0) -> str:
+    """
+    Сохраняет крошечную модель и токенизатор в директорию.
+
+    Args:
+        directory (str): Директория для сохранения.
+        seed (int): Зерно генератора случайных весов.
+
+    Returns:
+        str: Путь к модели.
+    """
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    alphabet = pre_tokenizers.ByteLevel.alphabet()
+    vocab = {token: i for i, token in enumerate(SPECIAL_TOKENS + sorted(alphabet))}
+    backend = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False, use_regex=False)
+    backend.decoder = decoders.ByteLevel()
+
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        pad_token="<pad>",
+        eos_token="<eos>",
+    )
+    tokenizer.save_pretrained(directory)
+
+    torch.manual_seed(seed)
+    config = LlamaConfig(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=8192,
+        pad_token_id=vocab["<pad>"],
+        eos_token_id=vocab["<eos>"],
+        bos_token_id=None,
+    )
+    LlamaForCausalLM(config).save_pretrained(directory)
+    return directory
+
+
+@lru_cache()
+def tiny_model_path() -> str:
+    """
+    Путь к общей для процесса крошечной модели (создаётся один раз).
+
+    Returns:
+        str: Путь к модели.
+    """
+    directory = tempfile.mkdtemp(prefix="tiny_llm_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return build_tiny_model(directory)